@@ -1,4 +1,5 @@
 import asyncio
+import sys
 import nest_asyncio
 
 nest_asyncio.apply()
@@ -8,11 +9,12 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Coroutine, Dict, Optional
 from enum import Enum
+import time
 import uuid
 import models
 
-from python.helpers import extract_tools, files, errors, history, tokens
-from python.helpers import dirty_json
+from python.helpers import extract_tools, files, errors, history, settings, tokens
+from python.helpers import dirty_json, state_monitor
 from python.helpers.print_style import PrintStyle
 from langchain_core.prompts import (
     ChatPromptTemplate,
@@ -33,6 +35,14 @@ class AgentContextType(Enum):
     BACKGROUND = "background"
 
 
+def drop_document_store(ctxid: str):
+    # documents indexed by document_query in a chat, only if the module was loaded,
+    # importing it loads the document parsers
+    document_query = sys.modules.get("python.helpers.document_query")
+    if document_query:
+        document_query.DocumentQueryStore.remove(ctxid)
+
+
 class AgentContext:
 
     _contexts: dict[str, "AgentContext"] = {}
@@ -67,20 +77,32 @@ class AgentContext:
         self.no = AgentContext._counter
         # set to start of unix epoch
         self.last_message = last_message or datetime.now(timezone.utc)
+        # idle contexts are unloaded from memory, see persist_chat.unload_idle_chats
+        self.last_access = time.time()
 
         existing = self._contexts.get(self.id, None)
         if existing:
             AgentContext.remove(self.id)
         self._contexts[self.id] = self
+        state_monitor.notify()
 
     @staticmethod
-    def get(id: str):
-        return AgentContext._contexts.get(id, None)
+    def get(id: str, load: bool = True):
+        context = AgentContext._contexts.get(id, None)
+        if context is None and load:
+            # saved chats are restored on first access
+            from python.helpers import persist_chat
+            context = persist_chat.load_chat(id)
+        if context:
+            context.last_access = time.time()
+        return context
 
     @staticmethod
     def first():
         if not AgentContext._contexts:
-            return None
+            from python.helpers import persist_chat
+            ids = persist_chat.get_unloaded_chat_ids()
+            return AgentContext.get(ids[0]) if ids else None
         return list(AgentContext._contexts.values())[0]
 
     @staticmethod
@@ -99,6 +121,7 @@ class AgentContext:
         context = AgentContext._contexts.pop(id, None)
         if context and context.task:
             context.task.kill()
+        state_monitor.notify()
         return context
 
     def serialize(self):
@@ -112,7 +135,7 @@ class AgentContext:
             ),
             "no": self.no,
             "log_guid": self.log.guid,
-            "log_version": len(self.log.updates),
+            "log_version": self.log.version,
             "log_length": len(self.log.logs),
             "paused": self.paused,
             "last_message": (
@@ -150,13 +173,16 @@ class AgentContext:
     def reset(self):
         self.kill_process()
         self.log.reset()
+        drop_document_store(self.id)
         self.agent0 = Agent(0, self.config, self)
         self.streaming_agent = None
         self.paused = False
+        state_monitor.notify()
 
     def nudge(self):
         self.kill_process()
         self.paused = False
+        state_monitor.notify()
         self.task = self.run_task(self.get_agent().monologue)
         return self.task
 
@@ -165,6 +191,7 @@ class AgentContext:
 
     def communicate(self, msg: "UserMessage", broadcast_level: int = 1):
         self.paused = False  # unpause if paused
+        state_monitor.notify()
 
         current_agent = self.get_agent()
 
@@ -347,18 +374,26 @@ class Agent:
                         # call before_main_llm_call extensions
                         await self.call_extensions("before_main_llm_call", loop_data=self.loop_data)
 
+                        # parsing and logging the whole stream on every chunk grows with its length
+                        # so the stream handlers run at a limited frame rate
+                        stream_fps = settings.get_settings()["chat_model_stream_fps"]
+                        reasoning_throttle = Log.StreamThrottle(stream_fps)
+                        response_throttle = Log.StreamThrottle(stream_fps)
+
                         async def reasoning_callback(chunk: str, full: str):
                             if chunk == full:
                                 printer.print("Reasoning: ")  # start of reasoning
                             printer.stream(chunk)
-                            await self.handle_reasoning_stream(full)
+                            if reasoning_throttle.ready():
+                                await self.handle_reasoning_stream(full)
 
                         async def stream_callback(chunk: str, full: str):
                             # output the agent response stream
                             if chunk == full:
                                 printer.print("Response: ")  # start of response
                             printer.stream(chunk)
-                            await self.handle_response_stream(full)
+                            if response_throttle.ready():
+                                await self.handle_response_stream(full)
 
                         # call main LLM
                         agent_response, _reasoning = await self.call_chat_model(
@@ -367,6 +402,12 @@ class Agent:
                             reasoning_callback=reasoning_callback,
                         )
 
+                        # flush the final state of streams cut off by the frame rate
+                        if reasoning_throttle.pending:
+                            await self.handle_reasoning_stream(_reasoning)
+                        if response_throttle.pending:
+                            await self.handle_response_stream(agent_response)
+
                         await self.handle_intervention(agent_response)
 
                         if (
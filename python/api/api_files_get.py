@@ -7,6 +7,8 @@ import json
 
 
 class ApiFilesGet(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return False
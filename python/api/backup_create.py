@@ -4,6 +4,8 @@ from python.helpers.persist_chat import save_tmp_chats
 
 
 class BackupCreate(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
@@ -4,6 +4,8 @@ from werkzeug.datastructures import FileStorage
 
 
 class BackupInspect(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
@@ -4,6 +4,8 @@ from typing import Dict, Any
 
 
 class BackupPreviewGrouped(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
@@ -6,6 +6,8 @@ import json
 
 
 class BackupRestore(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
@@ -5,6 +5,8 @@ import json
 
 
 class BackupRestorePreview(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
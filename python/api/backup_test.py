@@ -3,6 +3,8 @@ from python.helpers.backup import BackupService
 
 
 class BackupTest(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
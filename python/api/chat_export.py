@@ -3,15 +3,33 @@ from python.helpers.api import ApiHandler, Input, Output, Request, Response
 from python.helpers import persist_chat
 
 class ExportChat(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
     async def process(self, input: Input, request: Request) -> Output:
+        # GET downloads a compressed export streamed in chunks, POST returns the JSON inline
+        if request.method == "GET":
+            input = request.args
         ctxid = input.get("ctxid", "")
         if not ctxid:
             raise Exception("No context id provided")
 
         context = self.get_context(ctxid)
+
+        if request.method == "GET":
+            return Response(
+                persist_chat.export_chat_stream(context),
+                mimetype="application/gzip",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{context.id}.json.gz"'
+                },
+            )
+
         content = persist_chat.export_json_chat(context)
         return {
             "message": "Chats exported.",
             "ctxid": context.id,
             "content": content,
-        }
\ No newline at end of file
+        }
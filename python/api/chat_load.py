@@ -4,12 +4,18 @@ from python.helpers.api import ApiHandler, Input, Output, Request, Response
 from python.helpers import persist_chat
 
 class LoadChats(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
+        # uploaded export files are parsed from their stream, JSON strings in the body still work
+        files = request.files.getlist("chats[]")
         chats = input.get("chats", [])
-        if not chats:
+        if not files and not chats:
             raise Exception("No chats provided")
 
-        ctxids = persist_chat.load_json_chats(chats)
+        ctxids = [persist_chat.import_chat_stream(file.stream) for file in files]
+        if chats:
+            ctxids += persist_chat.load_json_chats(chats)
 
         return {
             "message": "Chats loaded.",
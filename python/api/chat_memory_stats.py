@@ -0,0 +1,14 @@
+from python.helpers.api import ApiHandler, Input, Output, Request, Response
+
+from python.helpers import persist_chat
+
+
+class ChatMemoryStats(ApiHandler):
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET", "POST"]
+
+    async def process(self, input: Input, request: Request) -> Output:
+        # loaded chats against the eviction limits, evictions and reloads since start
+        return persist_chat.get_memory_stats()
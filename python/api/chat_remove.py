@@ -1,5 +1,5 @@
 from python.helpers.api import ApiHandler, Input, Output, Request, Response
-from agent import AgentContext
+from agent import AgentContext, drop_document_store
 from python.helpers import persist_chat
 from python.helpers.task_scheduler import TaskScheduler
 
@@ -8,7 +8,7 @@ class RemoveChat(ApiHandler):
     async def process(self, input: Input, request: Request) -> Output:
         ctxid = input.get("context", "")
 
-        context = AgentContext.get(ctxid)
+        context = AgentContext.get(ctxid, load=False)
         if context:
             # stop processing any tasks
             context.reset()
@@ -16,6 +16,9 @@ class RemoveChat(ApiHandler):
         AgentContext.remove(ctxid)
         persist_chat.remove_chat(ctxid)
 
+        # drop documents indexed by document_query in this chat
+        drop_document_store(ctxid)
+
         scheduler = TaskScheduler.get()
         await scheduler.reload()
 
@@ -0,0 +1,38 @@
+import time
+
+from python.helpers.api import ApiHandler, Input, Output, Request, Response
+
+from agent import AgentContext
+from python.helpers import persist_chat
+from python.helpers.chat_search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
+
+
+class ChatSearch(ApiHandler):
+    blocking = True
+
+    async def process(self, input: Input, request: Request) -> Output:
+        query = input.get("query", "")
+        try:
+            limit = int(input.get("limit", SEARCH_LIMIT))
+        except (TypeError, ValueError):
+            return Response(
+                '{"error": "limit must be a number"}',
+                status=400,
+                mimetype="application/json",
+            )
+        limit = min(max(limit, 1), MAX_SEARCH_LIMIT)
+        # optional, limits the search to one chat
+        ctxid = input.get("context", "")
+
+        start = time.perf_counter()
+        results = persist_chat.search_chats(query, limit, ctxid)
+
+        names = {chat["id"]: chat["name"] for chat in persist_chat.get_unloaded_chats()}
+        for result in results:
+            context = AgentContext.get(result["ctxid"], load=False)
+            result["name"] = context.name if context else names.get(result["ctxid"])
+
+        return {
+            "results": results,
+            "time_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
@@ -7,6 +7,8 @@ from python.api import get_work_dir_files
 
 
 class DeleteWorkDirFile(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         file_path = input.get("path", "")
         if not file_path.startswith("/"):
@@ -76,6 +76,8 @@ def stream_file_download(file_source, download_name, chunk_size=8192):
 
 class DownloadFile(ApiHandler):
 
+    blocking = True
+
     @classmethod
     def get_methods(cls):
         return ["GET"]
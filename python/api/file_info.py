@@ -4,6 +4,8 @@ from python.helpers import files, runtime
 from typing import TypedDict
 
 class FileInfoApi(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         path = input.get("path", "")
         info = await runtime.call_development_function(get_file_info, path)
@@ -4,6 +4,8 @@ from python.helpers import runtime
 
 class GetWorkDirFiles(ApiHandler):
 
+    blocking = True
+
     @classmethod
     def get_methods(cls):
         return ["GET"]
@@ -19,11 +21,19 @@ class GetWorkDirFiles(ApiHandler):
 
         # browser = FileBrowser()
         # result = browser.get_files(current_path)
-        result = await runtime.call_development_function(get_files, current_path)
+        result = await runtime.call_development_function(
+            get_files,
+            current_path,
+            sort_by=request.args.get("sort", "name"),
+            direction=request.args.get("direction", "asc"),
+            filter=request.args.get("filter", ""),
+            cursor=request.args.get("cursor", ""),
+            limit=request.args.get("limit", FileBrowser.PAGE_SIZE, type=int),
+        )
 
         return {"data": result}
 
 
-async def get_files(path):
+async def get_files(path, **kwargs):
     browser = FileBrowser()
-    return browser.get_files(path)
+    return browser.get_files(path, **kwargs)
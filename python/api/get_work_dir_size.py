@@ -0,0 +1,22 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers.file_browser import FileBrowser
+from python.helpers import runtime
+
+
+class GetWorkDirSize(ApiHandler):
+
+    blocking = True
+
+    @classmethod
+    def get_methods(cls):
+        return ["GET"]
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        dir_path = request.args.get("path", "")
+        result = await runtime.call_development_function(get_dir_size, dir_path)
+        return {"data": result}
+
+
+async def get_dir_size(path):
+    browser = FileBrowser()
+    return browser.get_dir_size(path)
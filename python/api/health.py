@@ -3,6 +3,8 @@ from python.helpers import errors, git
 
 class HealthCheck(ApiHandler):
 
+    blocking = True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return False
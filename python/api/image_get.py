@@ -8,6 +8,8 @@ from mimetypes import guess_type
 
 class ImageGet(ApiHandler):
 
+    blocking = True
+
     @classmethod
     def get_methods(cls) -> list[str]:
         return ["GET"]
@@ -5,6 +5,8 @@ from werkzeug.utils import secure_filename
 
 
 class ImportKnowledge(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         if "files[]" not in request.files:
             raise Exception("No files part")
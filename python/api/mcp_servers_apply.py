@@ -8,6 +8,8 @@ from python.helpers.settings import set_settings_delta
 
 
 class McpServersApply(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict[Any, Any], request: Request) -> dict[Any, Any] | Response:
         mcp_servers = input["mcp_servers"]
         try:
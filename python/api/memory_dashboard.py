@@ -0,0 +1,83 @@
+import os
+import time
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import files
+from python.helpers.memory import Memory
+
+# export files are only written to and read from this folder
+EXPORT_FOLDER = "tmp/memory_exports"
+
+
+class MemoryDashboard(ApiHandler):
+    blocking = True
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        action = input.get("action", "")
+        ctxid = input.get("context", "")
+
+        context = self.get_context(ctxid)
+        db = await Memory.get(context.agent0)
+        result = {}
+
+        start = time.perf_counter()
+        if action == "cache_stats":
+            result["cache"] = db.get_cache_stats()
+        elif action in ("export", "import"):
+            path = self._get_export_path(input.get("file", ""))
+            if action == "export":
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                result["count"] = await db.export_columnar(path)
+            else:
+                if not os.path.isfile(path):
+                    raise Exception(f"Export file '{input.get('file')}' not found")
+                result["count"], result["vectors_reused"] = await db.import_columnar(path)
+            result["file"] = os.path.basename(path)
+        else:
+            filter = self._get_filter(input)
+            if action == "bulk_delete":
+                result["count"] = await db.delete_documents_by_filter(filter)
+            elif action == "bulk_update":
+                metadata = input.get("metadata", {})
+                if not isinstance(metadata, dict) or not metadata:
+                    raise Exception("No metadata provided")
+                result["count"] = await db.update_documents_by_filter(filter, metadata)
+            elif action == "count":
+                result["count"] = len(db.get_ids_by_filter(filter))
+            else:
+                raise Exception(f"Unknown action '{action}'")
+
+        return {
+            "action": action,
+            "memory_subdir": db.memory_subdir,
+            **result,
+            "time_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _get_export_path(self, name: str) -> str:
+        # a bare file name in EXPORT_FOLDER, no paths
+        if not name:
+            raise Exception("No file name provided")
+        if name != os.path.basename(name) or name in (".", "..") or "\\" in name:
+            raise Exception("Invalid file name, expected a name without folders")
+        folder = os.path.realpath(files.get_abs_path(EXPORT_FOLDER))
+        path = os.path.realpath(os.path.join(folder, name))
+        if os.path.dirname(path) != folder:
+            raise Exception("Invalid file name, expected a name without folders")
+        return path
+
+    def _get_filter(self, input: dict) -> str:
+        filter = input.get("filter", "")
+
+        # optional shortcut for age based cleanups, timestamps compare as strings
+        older_than_days = input.get("older_than_days")
+        if older_than_days:
+            cutoff = time.strftime(
+                "%Y-%m-%d %H:%M:%S",
+                time.localtime(time.time() - float(older_than_days) * 86400),
+            )
+            age_filter = f"timestamp < '{cutoff}'"
+            filter = f"({filter}) and {age_filter}" if filter else age_filter
+
+        if not filter:
+            raise Exception("No filter provided")
+        return filter
@@ -9,6 +9,8 @@ from python.helpers.print_style import PrintStyle
 
 
 class Message(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         task, context = await self.communicate(input=input, request=request)
         return await self.respond(task, context)
@@ -1,4 +1,5 @@
 from python.helpers.api import ApiHandler, Request, Response
+from python.helpers import state_monitor
 
 
 class Pause(ApiHandler):
@@ -11,6 +12,7 @@ class Pause(ApiHandler):
             context = self.get_context(ctxid)
 
             context.paused = paused
+            state_monitor.notify()
 
             return {
                 "message": "Agent paused." if paused else "Agent unpaused.",
@@ -1,3 +1,5 @@
+import asyncio
+
 from python.helpers.api import ApiHandler, Request, Response
 
 from agent import AgentContext, AgentContextType
@@ -5,9 +7,12 @@ from agent import AgentContext, AgentContextType
 from python.helpers.task_scheduler import TaskScheduler
 from python.helpers.localization import Localization
 from python.helpers.dotenv import get_dotenv_value
+from python.helpers import persist_chat, state_monitor
 
 
 class Poll(ApiHandler):
+    # (state version, timezone), contexts, tasks
+    _lists_cache: tuple[tuple[int, str], list, list] | None = None
 
     async def process(self, input: dict, request: Request) -> dict | Response:
         ctxid = input.get("context", "")
@@ -18,17 +23,58 @@ class Poll(ApiHandler):
         timezone = input.get("timezone", get_dotenv_value("DEFAULT_USER_TIMEZONE", "UTC"))
         Localization.get().set_timezone(timezone)
 
-        # context instance - get or create
-        context = self.get_context(ctxid)
+        # context instance - get or create, loading a saved chat decodes its files
+        context = await asyncio.to_thread(self.get_context, ctxid)
+
+        # nothing shown in the UI changed since the client's last poll
+        state_version = state_monitor.get_seq()
+        if ctxid and input.get("state_version") == state_version:
+            return {"not_modified": True, "state_version": state_version}
+
+        return self.get_output(context, from_no, notifications_from)
 
-        logs = context.log.output(start=from_no)
+    def get_output(self, context: AgentContext, from_no: int, notifications_from: int) -> dict:
+        # read first, anything changed meanwhile makes the next poll a full one
+        state_version = state_monitor.get_seq()
+
+        # items changed later are sent with the next poll
+        log_version = context.log.version
+        logs = context.log.output(start=from_no, end=log_version)
 
         # Get notifications from global notification manager
         notification_manager = AgentContext.get_notification_manager()
         notifications = notification_manager.output(start=notifications_from)
 
-        # loop AgentContext._contexts
+        ctxs, tasks = self.get_lists(state_version)
+
+        # data from this server
+        return {
+            "context": context.id,
+            "contexts": ctxs,
+            "tasks": tasks,
+            "logs": logs,
+            "log_guid": context.log.guid,
+            "log_version": log_version,
+            "log_progress": context.log.progress,
+            "log_progress_active": context.log.progress_active,
+            "paused": context.paused,
+            "notifications": notifications,
+            "notifications_guid": notification_manager.guid,
+            "notifications_version": len(notification_manager.updates),
+            "state_version": state_version,
+        }
 
+    def get_lists(self, state_version: int) -> tuple[list, list]:
+        # shared by all clients, serialized once per change
+        key = (state_version, Localization.get().get_timezone())
+        cached = Poll._lists_cache
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+        ctxs, tasks = self._build_lists()
+        Poll._lists_cache = (key, ctxs, tasks)
+        return ctxs, tasks
+
+    def _build_lists(self) -> tuple[list, list]:
         # Get a task scheduler instance
         scheduler = TaskScheduler.get()
 
@@ -41,32 +87,31 @@ class Poll(ApiHandler):
         tasks = []
         processed_contexts = set()  # Track processed context IDs
 
-        all_ctxs = list(AgentContext._contexts.values())
+        # saved chats not loaded yet are listed from their index entries
+        all_ctxs = [
+            ctx.serialize()
+            for ctx in AgentContext._contexts.values()
+            # Skip BACKGROUND contexts as they should be invisible to users
+            if ctx.type != AgentContextType.BACKGROUND
+        ] + persist_chat.get_unloaded_chats()
         # First, identify all tasks
-        for ctx in all_ctxs:
+        for context_data in all_ctxs:
+            ctx_id = context_data["id"]
             # Skip if already processed
-            if ctx.id in processed_contexts:
+            if ctx_id in processed_contexts:
                 continue
 
-            # Skip BACKGROUND contexts as they should be invisible to users
-            if ctx.type == AgentContextType.BACKGROUND:
-                processed_contexts.add(ctx.id)
-                continue
-
-            # Create the base context data that will be returned
-            context_data = ctx.serialize()
-
-            context_task = scheduler.get_task_by_uuid(ctx.id)
+            context_task = scheduler.get_task_by_uuid(ctx_id)
             # Determine if this is a task-dedicated context by checking if a task with this UUID exists
             is_task_context = (
-                context_task is not None and context_task.context_id == ctx.id
+                context_task is not None and context_task.context_id == ctx_id
             )
 
             if not is_task_context:
                 ctxs.append(context_data)
             else:
                 # If this is a task, get task details from the scheduler
-                task_details = scheduler.serialize_task(ctx.id)
+                task_details = scheduler.serialize_task(ctx_id)
                 if task_details:
                     # Add task details to context_data with the same field names
                     # as used in scheduler endpoints to maintain UI compatibility
@@ -94,24 +139,10 @@ class Poll(ApiHandler):
                 tasks.append(context_data)
 
             # Mark as processed
-            processed_contexts.add(ctx.id)
+            processed_contexts.add(ctx_id)
 
         # Sort tasks and chats by their creation date, descending
         ctxs.sort(key=lambda x: x["created_at"], reverse=True)
         tasks.sort(key=lambda x: x["created_at"], reverse=True)
 
-        # data from this server
-        return {
-            "context": context.id,
-            "contexts": ctxs,
-            "tasks": tasks,
-            "logs": logs,
-            "log_guid": context.log.guid,
-            "log_version": len(context.log.updates),
-            "log_progress": context.log.progress,
-            "log_progress_active": context.log.progress_active,
-            "paused": context.paused,
-            "notifications": notifications,
-            "notifications_guid": notification_manager.guid,
-            "notifications_version": len(notification_manager.updates),
-        }
+        return ctxs, tasks
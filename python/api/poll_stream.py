@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+from python.helpers.api import Request, Response
+from python.helpers.dotenv import get_dotenv_value
+from python.helpers.localization import Localization
+from python.helpers import state_monitor
+from python.api.poll import Poll
+
+# seconds between keepalive comments, proxies drop silent connections
+HEARTBEAT_INTERVAL = 15
+# changes that do not signal (e.g. agents unpausing) are picked up this often
+REFRESH_INTERVAL = 5
+# min. seconds between two events, changes in between are sent together
+MIN_EVENT_INTERVAL = 0.05
+# the browser reconnects after this, so threads of closed tabs are not held forever
+MAX_CONNECTION_TIME = 300
+
+
+class PollStream(Poll):
+    """Server-sent events version of /poll, pushes the same payload when something changes.
+    Clients without EventSource keep using /poll."""
+
+    @classmethod
+    def get_methods(cls) -> list[str]:
+        return ["GET"]
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        args = request.args
+        ctxid = args.get("context", "")
+        log_guid = args.get("log_guid", "")
+        log_from = int(args.get("log_from", 0) or 0)
+        notifications_from = int(args.get("notifications_from", 0) or 0)
+
+        timezone = args.get("timezone", get_dotenv_value("DEFAULT_USER_TIMEZONE", "UTC"))
+        Localization.get().set_timezone(timezone)
+
+        # loading a saved chat decodes its files, kept off the event loop
+        context = await asyncio.to_thread(self.get_context, ctxid)
+
+        return Response(
+            self._stream(context, log_guid, log_from, notifications_from),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def _stream(self, context, log_guid: str, log_from: int, notifications_from: int):
+        started = last_write = time.monotonic()
+        notifications_guid = None
+        last_state = None
+
+        while True:
+            # read before building, changes made meanwhile wake the wait below right away
+            seq = state_monitor.get_seq()
+
+            # a reset chat or restarted notifications are sent again from the start
+            log_reset = context.log.guid != log_guid
+            if log_reset:
+                log_from = 0
+            output = self.get_output(context, log_from, notifications_from)
+            if notifications_guid not in (None, output["notifications_guid"]):
+                output = self.get_output(context, log_from, 0)
+            output["log_reset"] = log_reset
+
+            # unchanged lists and progress are not sent again
+            state = json.dumps(
+                {
+                    k: v
+                    for k, v in output.items()
+                    if k not in ("logs", "notifications", "log_reset", "state_version")
+                }
+            )
+            if output["logs"] or output["notifications"] or state != last_state:
+                yield f"data: {json.dumps(output)}\n\n"
+                last_write = time.monotonic()
+                last_state = state
+            elif time.monotonic() - last_write >= HEARTBEAT_INTERVAL:
+                yield ": keepalive\n\n"
+                last_write = time.monotonic()
+
+            log_guid = output["log_guid"]
+            log_from = output["log_version"]
+            notifications_guid = output["notifications_guid"]
+            notifications_from = output["notifications_version"]
+
+            if time.monotonic() - started > MAX_CONNECTION_TIME:
+                yield "event: close\ndata: {}\n\n"
+                return
+
+            # activity in other chats does not wake this stream
+            if state_monitor.wait_for(seq, context.log, REFRESH_INTERVAL):
+                # coalesce bursts, e.g. streamed responses, into one event
+                time.sleep(MIN_EVENT_INTERVAL)
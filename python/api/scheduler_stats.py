@@ -0,0 +1,11 @@
+from python.helpers.api import ApiHandler, Input, Output, Request
+
+from python.helpers.task_scheduler import TaskScheduler
+
+
+class SchedulerStats(ApiHandler):
+    blocking = True
+
+    async def process(self, input: Input, request: Request) -> Output:
+        # running and queued task runs and how long they waited for a worker
+        return {"stats": TaskScheduler.get().get_stats()}
@@ -1,7 +1,7 @@
 from python.helpers.api import ApiHandler, Input, Output, Request
 from python.helpers.task_scheduler import (
     TaskScheduler, ScheduledTask, AdHocTask, PlannedTask, TaskSchedule,
-    serialize_task, parse_task_schedule, parse_task_plan, TaskType
+    serialize_task, parse_task_schedule, parse_task_plan, TaskType, TaskConcurrency
 )
 from python.helpers.localization import Localization
 from python.helpers.print_style import PrintStyle
@@ -9,6 +9,8 @@ import random
 
 
 class SchedulerTaskCreate(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         """
         Create a new task in the scheduler
@@ -111,6 +113,18 @@ class SchedulerTaskCreate(ApiHandler):
             if isinstance(task, AdHocTask):
                 printer.print(f"AdHocTask created with token: '{task.token}'")
 
+        # runs of this task when all workers are busy or it is still running
+        if "priority" in input:
+            try:
+                task.priority = int(input.get("priority", 0))
+            except (TypeError, ValueError):
+                return {"error": f"Invalid priority: {input.get('priority')}"}
+        if "concurrency" in input:
+            try:
+                task.concurrency = TaskConcurrency(input.get("concurrency", TaskConcurrency.SKIP))
+            except ValueError:
+                return {"error": f"Invalid concurrency: {input.get('concurrency')}"}
+
         # Add the task to the scheduler
         await scheduler.add_task(task)
 
@@ -6,6 +6,8 @@ from python.helpers import persist_chat
 
 
 class SchedulerTaskDelete(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         """
         Delete a task from the scheduler by ID
@@ -1,10 +1,12 @@
 from python.helpers.api import ApiHandler, Input, Output, Request
 from python.helpers.task_scheduler import TaskScheduler, TaskState
+from python.helpers import worker_pool
 from python.helpers.print_style import PrintStyle
 from python.helpers.localization import Localization
 
 
 class SchedulerTaskRun(ApiHandler):
+    blocking = True
 
     _printer: PrintStyle = PrintStyle(italic=True, font_color="green", padding=False)
 
@@ -45,18 +47,24 @@ class SchedulerTaskRun(ApiHandler):
 
         # Run the task, which now includes atomic state checks and updates
         try:
-            await scheduler.run_task_by_uuid(task_id)
-            self._printer.print(f"SchedulerTaskRun: Task '{task_id}' started successfully")
+            result = await scheduler.run_task_by_uuid(task_id)
+            if result == worker_pool.STARTED:
+                message = f"Task '{task_id}' started successfully"
+            else:
+                # queued, or replaces the running one when it stops
+                message = f"Task '{task_id}' {result}, waiting for a free worker"
+            self._printer.print(f"SchedulerTaskRun: {message}")
             # Get updated task after run starts
             serialized_task = scheduler.serialize_task(task_id)
             if serialized_task:
                 return {
                     "success": True,
-                    "message": f"Task '{task_id}' started successfully",
+                    "status": result,
+                    "message": message,
                     "task": serialized_task
                 }
             else:
-                return {"success": True, "message": f"Task '{task_id}' started successfully"}
+                return {"success": True, "status": result, "message": message}
         except ValueError as e:
             self._printer.error(f"SchedulerTaskRun: Task '{task_id}' failed to start: {str(e)}")
             return {"error": str(e)}
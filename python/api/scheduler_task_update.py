@@ -1,12 +1,14 @@
 from python.helpers.api import ApiHandler, Input, Output, Request
 from python.helpers.task_scheduler import (
-    TaskScheduler, ScheduledTask, AdHocTask, PlannedTask, TaskState,
+    TaskScheduler, ScheduledTask, AdHocTask, PlannedTask, TaskState, TaskConcurrency,
     serialize_task, parse_task_schedule, parse_task_plan
 )
 from python.helpers.localization import Localization
 
 
 class SchedulerTaskUpdate(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         """
         Update an existing task in the scheduler
@@ -48,6 +50,18 @@ class SchedulerTaskUpdate(ApiHandler):
         if "attachments" in input:
             update_params["attachments"] = input.get("attachments", [])
 
+        if "priority" in input:
+            try:
+                update_params["priority"] = int(input.get("priority", 0))
+            except (TypeError, ValueError):
+                return {"error": f"Invalid priority: {input.get('priority')}"}
+
+        if "concurrency" in input:
+            try:
+                update_params["concurrency"] = TaskConcurrency(input.get("concurrency", TaskConcurrency.SKIP))
+            except ValueError:
+                return {"error": f"Invalid concurrency: {input.get('concurrency')}"}
+
         # Update schedule if this is a scheduled task and schedule is provided
         if isinstance(task, ScheduledTask) and "schedule" in input:
             schedule_data = input.get("schedule", {})
@@ -6,6 +6,8 @@ from python.helpers.localization import Localization
 
 
 class SchedulerTasksList(ApiHandler):
+    blocking = True
+
     async def process(self, input: Input, request: Request) -> Output:
         """
         List all tasks in the scheduler with their types
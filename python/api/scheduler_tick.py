@@ -7,6 +7,8 @@ from python.helpers.localization import Localization
 
 
 class SchedulerTick(ApiHandler):
+    blocking = True
+
     @classmethod
     def requires_loopback(cls) -> bool:
         return True
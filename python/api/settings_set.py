@@ -6,6 +6,8 @@ from typing import Any
 
 
 class SetSettings(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict[Any, Any], request: Request) -> dict[Any, Any] | Response:
         set = settings.convert_in(input)
         set = settings.set_settings(set)
@@ -5,6 +5,8 @@ from python.helpers.api import ApiHandler, Request, Response
 from python.helpers import runtime, settings, kokoro_tts
 
 class Synthesize(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         text = input.get("text", "")
         # ctxid = input.get("ctxid", "")
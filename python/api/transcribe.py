@@ -3,6 +3,8 @@ from python.helpers.api import ApiHandler, Request, Response
 from python.helpers import runtime, settings, whisper
 
 class Transcribe(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         audio = input.get("audio")
         # ctxid = input.get("ctxid", "")
@@ -3,6 +3,8 @@ from python.helpers import runtime
 from python.helpers.tunnel_manager import TunnelManager
 
 class Tunnel(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         action = input.get("action", "get")
         
@@ -5,6 +5,8 @@ import requests
 
 
 class TunnelProxy(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         # Get configuration from environment
         tunnel_api_port = (
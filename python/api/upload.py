@@ -4,6 +4,8 @@ from werkzeug.utils import secure_filename
 
 
 class UploadFile(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         if "file" not in request.files:
             raise Exception("No file part")
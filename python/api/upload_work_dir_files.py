@@ -8,6 +8,8 @@ import os
 
 
 class UploadWorkDirFiles(ApiHandler):
+    blocking = True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         if "files[]" not in request.files:
             raise Exception("No files uploaded")
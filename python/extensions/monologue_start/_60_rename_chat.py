@@ -1,4 +1,4 @@
-from python.helpers import persist_chat, tokens
+from python.helpers import persist_chat, state_monitor, tokens
 from python.helpers.extension import Extension
 from agent import LoopData
 import asyncio
@@ -34,6 +34,7 @@ class RenameChat(Extension):
                     new_name = new_name[:40] + "..."
                 # apply to context and save
                 self.agent.context.name = new_name
+                state_monitor.notify()
                 persist_chat.save_tmp_chat(self.agent.context)
         except Exception as e:
             pass  # non-critical
@@ -15,6 +15,10 @@ Output = Union[Dict[str, Any], Response, TypedDict]  # type: ignore
 
 
 class ApiHandler:
+    # handlers doing long sync work (files, archives, models) run in a thread pool
+    # when served over ASGI, the others share one event loop
+    blocking = False
+
     def __init__(self, app: Flask, thread_lock: threading.Lock):
         self.app = app
         self.thread_lock = thread_lock
@@ -39,6 +43,10 @@ class ApiHandler:
     def requires_csrf(cls) -> bool:
         return cls.requires_auth()
 
+    @classmethod
+    def is_blocking(cls) -> bool:
+        return cls.blocking
+
     @abstractmethod
     async def process(self, input: Input, request: Request) -> Output:
         pass
@@ -56,6 +64,9 @@ class ApiHandler:
                     # Just log the error and continue with empty input
                     PrintStyle().print(f"Error parsing JSON: {str(e)}")
                     input_data = {}
+            elif request.mimetype == "multipart/form-data":
+                # uploads are read from request.files, buffering the body would hold them in memory
+                input_data = {}
             else:
                 input_data = {"data": request.get_data(as_text=True)}
 
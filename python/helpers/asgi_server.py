@@ -0,0 +1,236 @@
+import asyncio
+import inspect
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+from flask import Flask, Response
+from werkzeug.exceptions import HTTPException
+
+from python.helpers.print_style import PrintStyle
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+AsgiApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# threads for blocking handlers and sync views (static files, errors)
+BLOCKING_WORKERS = 16
+# threads reading sync response bodies, event streams hold one while the client listens
+STREAM_WORKERS = 64
+# larger request bodies are spooled to a temp file, so uploads do not stay in memory
+MAX_MEMORY_BODY = 1024 * 1024
+
+
+class FlaskAsgi:
+    """Serves a Flask app from one event loop.
+    Async views are awaited on the loop, sync views and blocking endpoints run in a bounded
+    thread pool, mounted ASGI apps (MCP, A2A) are called directly without a WSGI bridge."""
+
+    def __init__(
+        self,
+        app: Flask,
+        mounts: dict[str, AsgiApp] | None = None,
+        blocking: set[str] | None = None,
+    ):
+        self.app = app
+        self.mounts = mounts or {}
+        # endpoints that block, awaited in the thread pool instead of the loop
+        self.blocking = blocking or set()
+        self._blocking_pool = ThreadPoolExecutor(BLOCKING_WORKERS, "asgi_blocking")
+        self._stream_pool = ThreadPoolExecutor(STREAM_WORKERS, "asgi_stream")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        for prefix, mount in self.mounts.items():
+            path = scope["path"]
+            if path == prefix or path.startswith(prefix + "/"):
+                # same paths as under the WSGI DispatcherMiddleware
+                scope = {
+                    **scope,
+                    "root_path": scope.get("root_path", "") + prefix,
+                    "path": path[len(prefix):] or "/",
+                }
+                await mount(scope, receive, send)
+                return
+        if scope["type"] != "http":
+            return  # no websockets in the web UI
+        body = await _read_body(receive)
+        try:
+            environ = _build_environ(scope, body)
+            view = self._match_async_view(environ)
+            loop = asyncio.get_running_loop()
+            if view:
+                response = await self._dispatch(environ, *view)
+            else:
+                response = await loop.run_in_executor(
+                    self._blocking_pool, self._dispatch_sync, environ
+                )
+            await self._send_response(response, receive, send)
+        finally:
+            body.close()
+
+    def shutdown(self):
+        self._blocking_pool.shutdown(wait=False, cancel_futures=True)
+        self._stream_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _match_async_view(self, environ: dict[str, Any]):
+        # only plain matches of async views, everything else goes through full Flask dispatch
+        if environ["REQUEST_METHOD"] == "OPTIONS":
+            return None
+        try:
+            endpoint, args = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+        view = self.app.view_functions.get(endpoint)
+        if endpoint in self.blocking or not inspect.iscoroutinefunction(view):
+            return None
+        return view, args
+
+    async def _dispatch(self, environ: dict[str, Any], view, args: dict[str, Any]) -> Response:
+        # request context lives in the task's context vars, concurrent requests do not share it
+        with self.app.request_context(environ):
+            try:
+                response = self.app.make_response(await view(**args))
+            except Exception as e:
+                response = self._handle_exception(e)
+            return self.app.process_response(response)
+
+    def _dispatch_sync(self, environ: dict[str, Any]) -> Response:
+        with self.app.request_context(environ):
+            try:
+                # async views run on their own loop in this thread, see Flask.ensure_sync
+                return self.app.full_dispatch_request()
+            except Exception as e:
+                return self.app.process_response(self._handle_exception(e))
+
+    def _handle_exception(self, e: Exception) -> Response:
+        try:
+            return self.app.make_response(self.app.handle_user_exception(e))
+        except Exception as e:
+            return self.app.make_response(self.app.handle_exception(e))
+
+    async def _send_response(self, response: Response, receive: Receive, send: Send):
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in response.headers.items()
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        if not response.is_streamed:
+            await send({"type": "http.response.body", "body": response.get_data()})
+            response.close()
+            return
+
+        # the body was read already, the next message is the disconnect
+        disconnected = asyncio.ensure_future(receive())
+        loop = asyncio.get_running_loop()
+        chunks = response.iter_encoded()
+        try:
+            while not disconnected.done():
+                chunk = await loop.run_in_executor(self._stream_pool, next, chunks, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            if not disconnected.done():
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+            await loop.run_in_executor(self._stream_pool, response.close)
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+class AsgiServer:
+    """uvicorn server with the shutdown() of werkzeug servers, see process.stop_server"""
+
+    def __init__(self, app: FlaskAsgi, host: str, port: int):
+        import uvicorn
+
+        self.config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            # agent code applies nest_asyncio, which does not patch uvloop
+            loop="asyncio",
+            lifespan="on",
+            access_log=False,
+            log_level="warning",
+        )
+        self.server = uvicorn.Server(self.config)
+
+    def log_startup(self):
+        PrintStyle().print(
+            f"ASGI server at http://{self.config.host}:{self.config.port}, "
+            f"{BLOCKING_WORKERS} blocking threads"
+        )
+
+    def serve_forever(self):
+        self.server.run()
+
+    def shutdown(self):
+        self.server.should_exit = True
+
+
+async def _read_body(receive: Receive):
+    body = tempfile.SpooledTemporaryFile(max_size=MAX_MEMORY_BODY)
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body.write(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body.seek(0)
+    return body
+
+
+def _build_environ(scope: Scope, body) -> dict[str, Any]:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
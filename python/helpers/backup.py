@@ -275,6 +275,8 @@ class BackupService:
         matched_files = []
         processed_count = 0
 
+        scheduler_json, scheduler_db = self._get_scheduler_paths()
+
         try:
             spec = PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
 
@@ -314,6 +316,13 @@ class BackupService:
                         relative_path = pattern_path.lstrip('/')
 
                         if spec.match_file(relative_path):
+                            # the live scheduler database is backed up as an export of its tasks
+                            export = None
+                            if file_path in self._get_scheduler_db_files(scheduler_db):
+                                if file_path != scheduler_db:
+                                    continue
+                                export = "scheduler_tasks"
+                                pattern_path = self._unresolve_path(scheduler_json)
                             try:
                                 stat = os.stat(file_path)
                                 matched_files.append({
@@ -321,7 +330,8 @@ class BackupService:
                                     "real_path": file_path,
                                     "size": stat.st_size,
                                     "modified": datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                                    "type": "file"
+                                    "type": "file",
+                                    "export": export,
                                 })
                                 processed_count += 1
                             except (OSError, IOError):
@@ -418,7 +428,9 @@ class BackupService:
                     archive_path = file_info["path"].lstrip('/')
 
                     try:
-                        if os.path.exists(real_path) and os.path.isfile(real_path):
+                        if file_info.get("export") == "scheduler_tasks":
+                            zipf.writestr(archive_path, self._export_scheduler_tasks(real_path))
+                        elif os.path.exists(real_path) and os.path.isfile(real_path):
                             zipf.write(real_path, archive_path)
                     except (OSError, IOError) as e:
                         # Log error but continue with other files
@@ -620,6 +632,9 @@ class BackupService:
         skipped_files = []
         errors = []
         deleted_files = []
+        scheduler_files = []
+
+        scheduler_json, scheduler_db = self._get_scheduler_paths()
 
         try:
             backup_file.save(temp_file)
@@ -704,6 +719,11 @@ class BackupService:
                         })
                         continue
 
+                    # scheduler tasks are imported together after the other files
+                    if target_path == scheduler_json or target_path in self._get_scheduler_db_files(scheduler_db):
+                        scheduler_files.append((archive_path, target_path))
+                        continue
+
                     try:
                         # Handle overwrite policy
                         if os.path.exists(target_path):
@@ -744,6 +764,31 @@ class BackupService:
                             "error": str(e)
                         })
 
+                if scheduler_files:
+                    try:
+                        status = await self._restore_scheduler_tasks(zipf, scheduler_files, overwrite_policy)
+                        for archive_path, target_path in scheduler_files:
+                            if status == "restored":
+                                restored_files.append({
+                                    "archive_path": archive_path,
+                                    "original_path": archive_path,
+                                    "target_path": target_path,
+                                    "status": "restored"
+                                })
+                            else:
+                                skipped_files.append({
+                                    "archive_path": archive_path,
+                                    "original_path": archive_path,
+                                    "reason": status
+                                })
+                    except Exception as e:
+                        for archive_path, _ in scheduler_files:
+                            errors.append({
+                                "path": archive_path,
+                                "original_path": archive_path,
+                                "error": str(e)
+                            })
+
                 return {
                     "restored_files": restored_files,
                     "deleted_files": deleted_files,
@@ -766,6 +811,73 @@ class BackupService:
             if os.path.exists(temp_dir):
                 os.rmdir(temp_dir)
 
+    def _get_scheduler_paths(self) -> tuple[str, str]:
+        """Paths of the scheduler tasks.json and of its live task database"""
+        from python.helpers import task_scheduler
+
+        folder = files.get_abs_path(task_scheduler.SCHEDULER_FOLDER)
+        return (
+            os.path.join(folder, task_scheduler.TASKS_JSON_FILE),
+            os.path.join(folder, task_scheduler.TASKS_DB_FILE),
+        )
+
+    def _get_scheduler_db_files(self, scheduler_db: str) -> tuple[str, ...]:
+        return (scheduler_db, scheduler_db + "-wal", scheduler_db + "-shm", scheduler_db + "-journal")
+
+    def _export_scheduler_tasks(self, db_path: str) -> str:
+        """Tasks of a scheduler database as tasks.json, read through SQLite, not copied raw"""
+        from python.helpers.task_store import TaskStore
+
+        store = TaskStore(db_path)
+        try:
+            return store.export_json()
+        finally:
+            store.close()
+
+    async def _restore_scheduler_tasks(self, zipf: zipfile.ZipFile, entries: List[tuple[str, str]], overwrite_policy: str) -> str:
+        """Replace the scheduler task list with the tasks of a backup.
+
+        The live database is never overwritten. The backed up tasks are written
+        as tasks.json and the scheduler imports it in place of its current tasks.
+        Backups of raw database files are read from a temporary copy.
+
+        Returns "restored" or the reason the tasks were skipped.
+        """
+        import shutil
+        from python.helpers.task_scheduler import TaskScheduler
+
+        scheduler_json, scheduler_db = self._get_scheduler_paths()
+        by_name = {os.path.basename(target_path): archive_path for archive_path, target_path in entries}
+
+        if os.path.basename(scheduler_json) in by_name:
+            data = zipf.read(by_name[os.path.basename(scheduler_json)]).decode("utf-8")
+        elif os.path.basename(scheduler_db) in by_name:
+            temp_dir = tempfile.mkdtemp()
+            try:
+                for name, archive_path in by_name.items():
+                    with zipf.open(archive_path) as source, open(os.path.join(temp_dir, name), "wb") as target:
+                        shutil.copyfileobj(source, target)
+                data = self._export_scheduler_tasks(os.path.join(temp_dir, os.path.basename(scheduler_db)))
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        else:
+            return "incomplete_scheduler_database"
+
+        if os.path.exists(scheduler_db):
+            if overwrite_policy == "skip":
+                return "file_exists_skip_policy"
+            elif overwrite_policy == "backup":
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                with open(f"{scheduler_json}.backup.{timestamp}", "w", encoding="utf-8") as target:
+                    target.write(self._export_scheduler_tasks(scheduler_db))
+
+        os.makedirs(os.path.dirname(scheduler_json), exist_ok=True)
+        with open(scheduler_json, "w", encoding="utf-8") as target:
+            target.write(data)
+        # imported now, the restored tasks replace the current ones
+        await TaskScheduler.get().reload()
+        return "restored"
+
     def _translate_restore_path(self, archive_path: str, backup_metadata: Dict[str, Any]) -> str:
         """Translate file path from backed up system to current system.
 
@@ -0,0 +1,89 @@
+import struct
+from typing import Any, Iterator
+
+import msgpack
+import zstandard
+
+# Binary chat encoding, used for snapshots and journals.
+#   header: magic | u8 format version | u8 compression
+#   snapshot: header + compressed msgpack of the whole chat
+#   journal: header + records, each u32 length + msgpack, so a torn last record is detected
+# Values msgpack cannot store are saved as None, the same as in JSON chat files.
+
+MAGIC = b"A0CHAT"
+VERSION = 1
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+ZSTD_LEVEL = 3
+HEADER_SIZE = len(MAGIC) + 2
+
+
+def is_binary(head: bytes) -> bool:
+    return head.startswith(MAGIC)
+
+
+def encode(obj: Any) -> bytes:
+    payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(_pack(obj))
+    return _header(COMPRESSION_ZSTD) + payload
+
+
+def decode(raw: bytes) -> Any:
+    compression = _read_header(raw)
+    payload = memoryview(raw)[HEADER_SIZE:]
+    if compression == COMPRESSION_ZSTD:
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"Unknown chat file compression {compression}")
+    return _unpack(payload)
+
+
+def journal_header() -> bytes:
+    # records are small and appended one save at a time, compressing them gains little
+    return _header(COMPRESSION_NONE)
+
+
+def encode_record(obj: Any) -> bytes:
+    data = _pack(obj)
+    return struct.pack("<I", len(data)) + data
+
+
+def decode_records(raw: bytes) -> Iterator[Any]:
+    _read_header(raw)
+    view = memoryview(raw)
+    pos = HEADER_SIZE
+    while pos + 4 <= len(raw):
+        (length,) = struct.unpack_from("<I", raw, pos)
+        pos += 4
+        if pos + length > len(raw):
+            return  # torn write
+        try:
+            record = _unpack(view[pos : pos + length])
+        except Exception:
+            return
+        yield record
+        pos += length
+
+
+def _header(compression: int) -> bytes:
+    return MAGIC + struct.pack("<BB", VERSION, compression)
+
+
+def _read_header(raw: bytes) -> int:
+    if not is_binary(raw):
+        raise ValueError("Not a binary chat file")
+    version, compression = struct.unpack_from("<BB", raw, len(MAGIC))
+    if version > VERSION:
+        raise ValueError(f"Unsupported chat file version {version}")
+    return compression
+
+
+def _pack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_skip, use_bin_type=True)
+
+
+def _unpack(data) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _skip(obj: Any) -> None:
+    return None
@@ -0,0 +1,157 @@
+import json
+import os
+import uuid
+from typing import Any, Iterable
+
+from python.helpers import chat_codec
+
+# Append-only journal of chat changes next to the chat snapshot.
+# JSON lines, or length framed msgpack records when the snapshot is binary (see chat_codec).
+# The first record names the snapshot it continues, every other record is one change:
+#   {"op": "context", ...}                          context fields (name, type, last_message, ...)
+#   {"op": "agents", "numbers": [0, 1]}             agent chain changed
+#   {"op": "agent_data", "number": n, "data": {}}   agent data changed
+#   {"op": "history", "number": n, "history": ""}   full history, serialized or as object when binary
+#   {"op": "history_append", "number": n, "start": i, "messages": []}
+#                                                   messages of the current topic from index i
+#   {"op": "new_topic", "number": n}               current topic moved to topics, new one started
+#   {"op": "log", "guid": "", "reset": bool, "items": [], "progress": "", "progress_no": n}
+#                                                   changed log items, by their number
+
+JOURNAL_FILE_NAME = "chat.journal"
+# journal size that triggers compaction into a new snapshot,
+# relative to the snapshot, so writes stay amortized proportional to changes
+COMPACT_RATIO = 0.5
+COMPACT_MIN_SIZE = 512 * 1024
+
+
+def new_snapshot_id() -> str:
+    return str(uuid.uuid4())
+
+
+def start_journal(path: str, snapshot_id: str, binary: bool = False):
+    start = {"op": "start", "snapshot": snapshot_id}
+    with open(path, "wb") as f:
+        if binary:
+            f.write(chat_codec.journal_header() + chat_codec.encode_record(start))
+        else:
+            f.write(_encode_line(start))
+
+
+def append(path: str, records: Iterable[dict[str, Any]], binary: bool = False) -> int:
+    # one write per save
+    encode = chat_codec.encode_record if binary else _encode_line
+    data = b"".join(encode(record) for record in records)
+    if not data:
+        return 0
+    with open(path, "ab") as f:
+        f.write(data)
+    return len(data)
+
+
+def should_compact(journal_size: int, snapshot_size: int) -> bool:
+    return journal_size > max(COMPACT_MIN_SIZE, snapshot_size * COMPACT_RATIO)
+
+
+def replay(data: dict[str, Any], path: str, log_size: int = 0) -> dict[str, Any]:
+    """Apply the journal at path onto a snapshot dict. Journals written for another
+    snapshot are ignored, a torn last line from a crash is skipped."""
+    if not os.path.exists(path):
+        return data
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    binary = chat_codec.is_binary(raw)
+    records = chat_codec.decode_records(raw) if binary else _decode_lines(raw)
+    start = next(records, None)
+    if (
+        not isinstance(start, dict)
+        or start.get("op") != "start"
+        or start.get("snapshot") != data.get("journal")
+    ):
+        return data
+
+    agents: dict[int, dict[str, Any]] = {
+        agent["number"]: agent for agent in data.get("agents", [])
+    }
+    order = [agent["number"] for agent in data.get("agents", [])]
+    # histories are parsed once and dumped at the end,
+    # binary snapshots store them as objects and get them back as objects
+    histories: dict[int, dict[str, Any]] = {}
+    log = data.setdefault("log", {})
+    log_items = {item.get("no", i): item for i, item in enumerate(log.get("logs", []))}
+
+    def history(number: int) -> dict[str, Any]:
+        if number not in histories:
+            raw = agents.setdefault(number, _new_agent(number)).get("history", "")
+            histories[number] = _load_history(raw) if raw else _new_history()
+        return histories[number]
+
+    for op in records:
+        kind = op.pop("op", None)
+        if kind == "context":
+            data.update(op)
+        elif kind == "agents":
+            order = op["numbers"]
+            for number in order:
+                agents.setdefault(number, _new_agent(number))
+        elif kind == "agent_data":
+            agents.setdefault(op["number"], _new_agent(op["number"]))["data"] = op[
+                "data"
+            ]
+        elif kind == "history":
+            agents.setdefault(op["number"], _new_agent(op["number"]))
+            histories[op["number"]] = _load_history(op["history"])
+        elif kind == "history_append":
+            messages = history(op["number"])["current"]["messages"]
+            messages[op["start"] :] = op["messages"]
+        elif kind == "new_topic":
+            hist = history(op["number"])
+            hist["topics"].append(hist["current"])
+            hist["current"] = _new_history()["current"]
+        elif kind == "log":
+            if op.get("reset") or op.get("guid") != log.get("guid"):
+                log_items = {}
+                log["guid"] = op.get("guid")
+            for item in op.get("items", []):
+                log_items[item["no"]] = item
+            log["progress"] = op.get("progress", log.get("progress"))
+            log["progress_no"] = op.get("progress_no", log.get("progress_no"))
+
+    for number, hist in histories.items():
+        agents[number]["history"] = hist if binary else json.dumps(hist, ensure_ascii=False)
+    data["agents"] = [agents[number] for number in order if number in agents]
+    items = [log_items[no] for no in sorted(log_items)]
+    log["logs"] = items[-log_size:] if log_size else items
+    return data
+
+
+def _encode_line(record: dict[str, Any]) -> bytes:
+    # values JSON cannot store are saved as None
+    line = json.dumps(record, ensure_ascii=False, default=lambda o: None)
+    return (line + "\n").encode("utf-8")
+
+
+def _decode_lines(raw: bytes):
+    for line in raw.decode("utf-8", errors="replace").splitlines():
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            return  # torn write, everything after it is lost anyway
+
+
+def _load_history(history: str | dict[str, Any]) -> dict[str, Any]:
+    return json.loads(history) if isinstance(history, str) else history
+
+
+def _new_agent(number: int) -> dict[str, Any]:
+    return {"number": number, "data": {}, "history": ""}
+
+
+def _new_history() -> dict[str, Any]:
+    return {
+        "_cls": "History",
+        "bulks": [],
+        "topics": [],
+        "current": {"_cls": "Topic", "summary": "", "messages": []},
+    }
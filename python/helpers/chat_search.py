@@ -0,0 +1,153 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Iterable
+
+from python.helpers import files
+
+# full-text index of chat log items across all saved chats, see persist_chat
+INDEX_FILE = "tmp/chat_search.sqlite"
+SEARCH_LIMIT = 20
+# most results one search returns
+MAX_SEARCH_LIMIT = 200
+# words of context around matches in snippets
+SNIPPET_TOKENS = 16
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+
+_TERM_RE = re.compile(r"\S+")
+
+_instance: "ChatSearchIndex | None" = None
+_instance_lock = threading.Lock()
+
+
+def get() -> "ChatSearchIndex":
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = ChatSearchIndex(files.get_abs_path(INDEX_FILE))
+        return _instance
+
+
+class ChatSearchIndex:
+    """SQLite FTS5 index of chat log items, updated with each chat save."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        # chats are saved from agent threads, access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chats (
+                ctxid TEXT PRIMARY KEY, log_guid TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY, ctxid TEXT NOT NULL, no INTEGER NOT NULL,
+                type TEXT, heading TEXT, content TEXT, UNIQUE (ctxid, no));
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                heading, content, content='items', content_rowid='id');
+            CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, heading, content)
+                VALUES (new.id, new.heading, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, heading, content)
+                VALUES ('delete', old.id, old.heading, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, heading, content)
+                VALUES ('delete', old.id, old.heading, old.content);
+                INSERT INTO items_fts (rowid, heading, content)
+                VALUES (new.id, new.heading, new.content);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def update(
+        self, ctxid: str, log_guid: str, items: Iterable[dict[str, Any]], full: bool = False
+    ):
+        """Index changed log items of a chat by their number, a new log guid drops the old ones.
+        With full the items are the whole log and replace all indexed ones."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT log_guid FROM chats WHERE ctxid = ?", (ctxid,)
+            ).fetchone()
+            if full or row is None or row[0] != log_guid:
+                self._conn.execute("DELETE FROM items WHERE ctxid = ?", (ctxid,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO chats (ctxid, log_guid) VALUES (?, ?)",
+                    (ctxid, log_guid),
+                )
+            self._conn.executemany(
+                "INSERT INTO items (ctxid, no, type, heading, content) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (ctxid, no) DO UPDATE SET "
+                "type = excluded.type, heading = excluded.heading, content = excluded.content",
+                (
+                    (
+                        ctxid,
+                        item["no"],
+                        item.get("type") or "",
+                        item.get("heading") or "",
+                        item.get("content") or "",
+                    )
+                    for item in items
+                ),
+            )
+
+    def remove(self, ctxid: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE ctxid = ?", (ctxid,))
+            self._conn.execute("DELETE FROM chats WHERE ctxid = ?", (ctxid,))
+
+    def indexed_ids(self) -> set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT ctxid FROM chats")}
+
+    def search(
+        self, query: str, limit: int = SEARCH_LIMIT, ctxid: str = ""
+    ) -> list[dict[str, Any]]:
+        """Best matching log items, all words of the query have to match"""
+        match = _match_query(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT items.ctxid, items.no, items.type, items.heading, "
+            f"snippet(items_fts, -1, ?, ?, '…', {SNIPPET_TOKENS}), bm25(items_fts) "
+            "FROM items_fts JOIN items ON items.id = items_fts.rowid "
+            "WHERE items_fts MATCH ?"
+        )
+        params: list[Any] = [SNIPPET_START, SNIPPET_END, match]
+        if ctxid:
+            sql += " AND items.ctxid = ?"
+            params.append(ctxid)
+        sql += " ORDER BY bm25(items_fts) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "ctxid": row[0],
+                "no": row[1],
+                "type": row[2],
+                "heading": row[3],
+                "snippet": row[4],
+                "score": round(-row[5], 4),
+            }
+            for row in rows
+        ]
+
+
+def _match_query(query: str) -> str:
+    # every whitespace separated term is matched as a phrase, so user input
+    # like file names or error codes never hits FTS query syntax
+    terms = _TERM_RE.findall(query)
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
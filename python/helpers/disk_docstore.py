@@ -0,0 +1,238 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator, Mapping
+
+from typing import Callable
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+from python.helpers.keyword_index import MIN_KEYWORD_COVERAGE, idf, tokenize
+
+# keyword matches ranked by FTS5 that are checked for coverage before a search gives up
+MAX_KEYWORD_CANDIDATES = 1000
+
+
+class DiskDocstore(Docstore, AddableMixin):
+    """Docstore keeping documents in a local SQLite file, loaded by id on demand."""
+
+    FILE_NAME = "docstore.sqlite"
+
+    def __init__(self, folder_path: str):
+        os.makedirs(folder_path, exist_ok=True)
+        self.path = os.path.join(folder_path, self.FILE_NAME)
+        self._lock = threading.RLock()
+        # FAISS runs deletes in executor threads, access is serialized by the lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "id TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        # deleted ids whose vectors are not compacted out of the index yet
+        self._conn.execute("CREATE TABLE IF NOT EXISTS tombstones (id TEXT PRIMARY KEY)")
+        # keyword postings of each document by docs rowid, terms as produced by tokenize()
+        has_keywords = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'docs_fts'"
+        ).fetchone()
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5("
+            "terms, tokenize = \"unicode61 remove_diacritics 0 tokenchars '_.-:/#'\")"
+        )
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts_vocab USING fts5vocab(docs_fts, row)"
+        )
+        self._conn.commit()
+        self._dict = DiskDocstoreDict(self)
+        if not has_keywords:
+            self._index_keywords()
+
+    @staticmethod
+    def exists(folder_path: str) -> bool:
+        return os.path.exists(os.path.join(folder_path, DiskDocstore.FILE_NAME))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, texts: dict[str, Document]) -> None:
+        with self._lock, self._conn:
+            for id, doc in texts.items():
+                self._delete_keywords(id)
+                rowid = self._conn.execute(
+                    "INSERT OR REPLACE INTO docs (id, page_content, metadata) VALUES (?, ?, ?)",
+                    (id, doc.page_content, json.dumps(doc.metadata, default=str)),
+                ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO docs_fts (rowid, terms) VALUES (?, ?)",
+                    (rowid, " ".join(tokenize(doc.page_content))),
+                )
+
+    def delete(self, ids: list) -> None:
+        with self._lock, self._conn:
+            for id in ids:
+                self._delete_keywords(id)
+            self._conn.executemany("DELETE FROM docs WHERE id = ?", ((id,) for id in ids))
+            self._conn.executemany(
+                "DELETE FROM tombstones WHERE id = ?", ((id,) for id in ids)
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("DELETE FROM docs_fts")
+            self._conn.execute("DELETE FROM tombstones")
+
+    def _delete_keywords(self, id: str):
+        self._conn.execute(
+            "DELETE FROM docs_fts WHERE rowid IN (SELECT rowid FROM docs WHERE id = ?)", (id,)
+        )
+
+    def _index_keywords(self):
+        # docstores of earlier versions get their keyword postings once, batch by batch
+        last = 0
+        while True:
+            with self._lock, self._conn:
+                rows = self._conn.execute(
+                    "SELECT rowid, page_content FROM docs WHERE rowid > ? ORDER BY rowid LIMIT 500",
+                    (last,),
+                ).fetchall()
+                self._conn.executemany(
+                    "INSERT INTO docs_fts (rowid, terms) VALUES (?, ?)",
+                    ((rowid, " ".join(tokenize(content))) for rowid, content in rows),
+                )
+            if not rows:
+                return
+            last = rows[-1][0]
+
+    def keyword_search(
+        self,
+        query: str,
+        limit: int,
+        filter: Callable[[str], bool] | None = None,
+        min_coverage: float = MIN_KEYWORD_COVERAGE,
+    ) -> list[tuple[str, float]]:
+        """BM25 ranked ids of documents matching the query's keywords, see KeywordIndex.search"""
+        terms = set(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+        result = []
+        with self._lock:
+            total = self.count()
+            if not total:
+                return []
+            counts = dict(
+                self._conn.execute(
+                    f"SELECT term, doc FROM docs_fts_vocab WHERE term IN ({','.join('?' * len(terms))})",
+                    list(terms),
+                ).fetchall()
+            )
+            idfs = {term: idf(counts.get(term, 0), total) for term in terms}
+            query_weight = sum(idfs.values()) or 1
+            rows = self._conn.execute(
+                "SELECT docs.id, docs_fts.terms, bm25(docs_fts) FROM docs_fts "
+                "JOIN docs ON docs.rowid = docs_fts.rowid "
+                "WHERE docs_fts MATCH ? ORDER BY bm25(docs_fts) LIMIT ?",
+                (match, MAX_KEYWORD_CANDIDATES),
+            ).fetchall()
+        for id, doc_terms, rank in rows:
+            # documents matching only common words of the query are ignored
+            found = terms.intersection(doc_terms.split())
+            if sum(idfs[term] for term in found) / query_weight < min_coverage:
+                continue
+            if filter and not filter(id):
+                continue
+            # FTS5 ranks lower is better
+            result.append((id, -rank))
+            if len(result) >= limit:
+                break
+        return result
+
+    def add_tombstones(self, ids: list[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tombstones (id) VALUES (?)", ((id,) for id in ids)
+            )
+
+    def get_tombstones(self) -> set[str]:
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT id FROM tombstones")}
+
+    def search(self, search: str) -> str | Document:
+        doc = self.get(search)
+        return doc if doc is not None else f"ID {search} not found."
+
+    def get(self, id: str) -> Document | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_content, metadata FROM docs WHERE id = ?", (id,)
+            ).fetchone()
+        return _to_document(id, row) if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def has(self, id: str) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute("SELECT 1 FROM docs WHERE id = ?", (id,)).fetchone()
+                is not None
+            )
+
+    def iter_ids(self) -> Iterator[str]:
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM docs")]
+        return iter(ids)
+
+    def iter_items(self, batch_size: int = 500) -> Iterator[tuple[str, Document]]:
+        # paged by rowid so only one batch is in memory and the lock is not held while iterating
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, id, page_content, metadata FROM docs "
+                    "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, id, content, metadata in rows:
+                yield id, _to_document(id, (content, metadata))
+            last = rows[-1][0]
+
+
+class DiskDocstoreDict(Mapping):
+    # read-only dict view, keeps code expecting InMemoryDocstore._dict working
+    def __init__(self, store: DiskDocstore):
+        self.store = store
+
+    def __getitem__(self, id: str) -> Document:
+        doc = self.store.get(id)
+        if doc is None:
+            raise KeyError(id)
+        return doc
+
+    def __contains__(self, id: object) -> bool:
+        return isinstance(id, str) and self.store.has(id)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.iter_ids()
+
+    def __len__(self) -> int:
+        return self.store.count()
+
+    def values(self):  # type: ignore
+        return (doc for _, doc in self.store.iter_items())
+
+    def items(self):  # type: ignore
+        return self.store.iter_items()
+
+
+def _to_document(id: str, row: tuple[str, str]) -> Document:
+    return Document(id=id, page_content=row[0], metadata=json.loads(row[1]))
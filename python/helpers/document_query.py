@@ -2,7 +2,9 @@ import mimetypes
 import os
 import asyncio
 import aiohttp
+import hashlib
 import json
+from collections import OrderedDict
 
 from python.helpers.vector_db import VectorDB
 
@@ -10,26 +12,30 @@ os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"  # noqa E402
 from langchain_unstructured import UnstructuredLoader  # noqa E402
 
 from urllib.parse import urlparse
-from typing import Callable, Sequence, List, Optional, Tuple
+from typing import AsyncIterable, AsyncIterator, Callable, Sequence, List, Optional, Tuple
 from datetime import datetime
 
 from langchain_community.document_loaders import AsyncHtmlLoader
 from langchain_community.document_loaders.text import TextLoader
-from langchain_community.document_loaders.pdf import PyMuPDFLoader
 from langchain_community.document_transformers import MarkdownifyTransformer
-from langchain_community.document_loaders.parsers.images import TesseractBlobParser
 
 from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files, errors
+from python.helpers import files, errors, pdf_extract
 from agent import Agent
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
 DEFAULT_SEARCH_THRESHOLD = 0.5
+# hybrid keyword + vector ranking puts exact matches first, so fewer chunks are needed
+DEFAULT_SEARCH_LIMIT = 30
+# max. parallel utility model calls when optimizing queries
+DEFAULT_QA_CONCURRENCY = 5
+# stores kept in memory, the least recently used chat's store is dropped first
+MAX_CACHED_STORES = 16
 
 
 class DocumentQueryStore:
@@ -42,19 +48,32 @@ class DocumentQueryStore:
     DEFAULT_CHUNK_SIZE = 1000
     DEFAULT_CHUNK_OVERLAP = 100
 
-    # Cache for initialized stores
-    _stores: dict[str, "DocumentQueryStore"] = {}
+    # Cache for initialized stores, dropped on chat reset, unload and removal
+    _stores: OrderedDict[str, "DocumentQueryStore"] = OrderedDict()
 
     @staticmethod
     def get(agent: Agent):
-        """Create a DocumentQueryStore instance for the specified agent."""
+        """Get the DocumentQueryStore for the agent's context, creating it if needed."""
         if not agent or not agent.config:
             raise ValueError("Agent and agent config must be provided")
 
-        # Initialize store
-        store = DocumentQueryStore(agent)
+        # one store per chat, so documents indexed in earlier rounds are reused
+        key = agent.context.id
+        store = DocumentQueryStore._stores.get(key)
+        if not store:
+            store = DocumentQueryStore(agent)
+            DocumentQueryStore._stores[key] = store
+            while len(DocumentQueryStore._stores) > MAX_CACHED_STORES:
+                DocumentQueryStore._stores.popitem(last=False)
+        DocumentQueryStore._stores.move_to_end(key)
+        store.agent = agent
         return store
 
+    @staticmethod
+    def remove(context_id: str):
+        """Drop the cached store of a context."""
+        DocumentQueryStore._stores.pop(context_id, None)
+
     def __init__(
         self,
         agent: Agent,
@@ -62,6 +81,15 @@ class DocumentQueryStore:
         """Initialize a DocumentQueryStore instance."""
         self.agent = agent
         self.vector_db: VectorDB | None = None
+        # content fingerprint per normalized document URI
+        self.fingerprints: dict[str, str] = {}
+        # source file stats per normalized document URI, used to skip extraction
+        self.source_stats: dict[str, tuple[int, int]] = {}
+
+    @staticmethod
+    def fingerprint(text: str) -> str:
+        """Content hash used to detect unchanged documents and chunks."""
+        return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
 
     @staticmethod
     def normalize_uri(uri: str) -> str:
@@ -102,6 +130,8 @@ class DocumentQueryStore:
     ) -> tuple[bool, list[str]]:
         """
         Add a document to the store with the given URI.
+        Unchanged documents are skipped, changed documents only embed chunks
+        whose content changed and reuse the others.
 
         Args:
             text: The document text content
@@ -109,50 +139,141 @@ class DocumentQueryStore:
             metadata: Optional metadata for the document
 
         Returns:
-            True if successful, False otherwise
+            Tuple of success flag and IDs of all chunks of the document
         """
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
-        # Delete existing document if it exists to avoid duplicates
-        await self.delete_document(document_uri)
+        # Unchanged content, nothing to do
+        if self.fingerprints.get(document_uri) == self.fingerprint(text):
+            existing = await self._get_document_chunks(document_uri)
+            if existing:
+                PrintStyle.standard(
+                    f"Document '{document_uri}' unchanged, skipping indexing"
+                )
+                existing.sort(key=lambda x: x.metadata.get("chunk_index", 0))
+                return True, [chunk.metadata["id"] for chunk in existing]
+
+        async def parts():
+            yield text
+
+        return await self.add_document_parts(parts(), document_uri, metadata)
+
+    async def add_document_parts(
+        self,
+        parts: AsyncIterable[str],
+        document_uri: str,
+        metadata: dict | None = None,
+    ) -> tuple[bool, list[str]]:
+        """
+        Add a document to the store from consecutive text parts (e.g. page batches).
+        Each part is split and embedded as soon as it arrives, so indexing overlaps
+        with extraction of the following parts. Chunks never span two parts.
+
+        Args:
+            parts: The document text content, in order
+            document_uri: The URI that uniquely identifies this document
+            metadata: Optional metadata for the document
+
+        Returns:
+            Tuple of success flag and IDs of all chunks of the document
+        """
+        # Normalize the URI
+        document_uri = self.normalize_uri(document_uri)
+
+        # Existing chunks by content hash, available for reuse
+        reusable: dict[str, list[Document]] = {}
+        for chunk in await self._get_document_chunks(document_uri):
+            chunk_hash = chunk.metadata.get("chunk_hash") or self.fingerprint(
+                chunk.page_content
+            )
+            reusable.setdefault(chunk_hash, []).append(chunk)
 
         # Initialize metadata
         doc_metadata = metadata or {}
         doc_metadata["document_uri"] = document_uri
         doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Split text into chunks
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
         )
-        chunks = text_splitter.split_text(text)
-
-        # Create documents
-        docs = []
-        for i, chunk in enumerate(chunks):
-            chunk_metadata = doc_metadata.copy()
-            chunk_metadata["chunk_index"] = i
-            chunk_metadata["total_chunks"] = len(chunks)
-            docs.append(Document(page_content=chunk, metadata=chunk_metadata))
-
-        if not docs:
-            PrintStyle.error(f"No chunks created for document: {document_uri}")
-            return False, []
+        # same as fingerprint() of the parts joined by newlines
+        fingerprint = hashlib.sha256()
+        ids: list[str] = []
+        # chunks inserted by this call, removed again if a later part fails
+        inserted: list[str] = []
+        # metadata of reused chunks, applied once every part is inserted
+        reused_metadata: list[tuple[Document, dict]] = []
+        embedded = 0
 
         try:
             # Initialize vector db if not already initialized
             if not self.vector_db:
                 self.vector_db = self.init_vector_db()
 
-            ids = await self.vector_db.insert_documents(docs)
+            separator = ""
+            async for part in parts:
+                fingerprint.update(
+                    (separator + part).encode("utf-8", errors="surrogatepass")
+                )
+                separator = "\n"
+
+                # Reuse unchanged chunks, create documents for new ones
+                part_ids: list[str | None] = []
+                docs = []
+                for chunk in text_splitter.split_text(part):
+                    chunk_hash = self.fingerprint(chunk)
+                    chunk_metadata = doc_metadata.copy()
+                    chunk_metadata["chunk_index"] = len(ids) + len(part_ids)
+                    chunk_metadata["chunk_hash"] = chunk_hash
+                    if reusable.get(chunk_hash):
+                        reused = reusable[chunk_hash].pop()
+                        chunk_metadata["id"] = reused.metadata["id"]
+                        reused_metadata.append((reused, chunk_metadata))
+                        part_ids.append(reused.metadata["id"])
+                    else:
+                        docs.append(Document(page_content=chunk, metadata=chunk_metadata))
+                        part_ids.append(None)
+
+                new_ids = await self.vector_db.insert_documents(docs)
+                inserted += new_ids
+                new_ids = iter(new_ids)
+                ids += [id or next(new_ids) for id in part_ids]
+                embedded += len(docs)
+
+            if not ids:
+                PrintStyle.error(f"No chunks created for document: {document_uri}")
+                return False, []
+
+            # Remove chunks that are no longer part of the document
+            stale = [chunk.metadata["id"] for group in reusable.values() for chunk in group]
+            if stale:
+                await self.vector_db.delete_documents_by_ids(stale)
+
+            for reused, chunk_metadata in reused_metadata:
+                reused.metadata = chunk_metadata  # docstore holds the same object
+
+            # total is only known now
+            for doc in self.vector_db.db.get_by_ids(ids):
+                doc.metadata["total_chunks"] = len(ids)
+
+            self.fingerprints[document_uri] = fingerprint.hexdigest()
             PrintStyle.standard(
-                f"Added document '{document_uri}' with {len(docs)} chunks"
+                f"Added document '{document_uri}' with {len(ids)} chunks "
+                f"({embedded} embedded, {len(ids) - embedded} reused, {len(stale)} removed)"
             )
             return True, ids
         except Exception as e:
             err_text = errors.format_error(e)
             PrintStyle.error(f"Error adding document '{document_uri}': {err_text}")
+            # a retry would insert them again
+            if inserted and self.vector_db:
+                try:
+                    await self.vector_db.delete_documents_by_ids(inserted)
+                except Exception as e:
+                    PrintStyle.error(
+                        f"Error removing chunks of '{document_uri}': {errors.format_error(e)}"
+                    )
             return False, []
 
     async def get_document(self, document_uri: str) -> Optional[Document]:
@@ -259,6 +380,8 @@ class DocumentQueryStore:
         chunks = await self.vector_db.search_by_metadata(
             filter=f"document_uri == '{document_uri}'",
         )
+        self.fingerprints.pop(document_uri, None)
+        self.source_stats.pop(document_uri, None)
         if not chunks:
             return False
 
@@ -365,34 +488,26 @@ class DocumentQueryHelper:
     ) -> Tuple[bool, str]:
         self.progress_callback(f"Starting Q&A process")
 
-        # index document
-        _ = await self.document_get_content(document_uri, True)
-        selected_chunks = {}
-        for question in questions:
-            self.progress_callback(f"Optimizing query: {question}")
-            human_content = f'Search Query: "{question}"'
-            system_content = self.agent.parse_prompt(
-                "fw.document_query.optmimize_query.md"
-            )
-
-            optimized_query = (
-                await self.agent.call_utility_model(
-                    system=system_content, message=human_content
-                )
-            ).strip()
-
-            self.progress_callback(f"Searching document with query: {optimized_query}")
-
-            normalized_uri = self.store.normalize_uri(document_uri)
-            chunks = await self.store.search_document(
-                document_uri=normalized_uri,
-                query=optimized_query,
-                limit=100,
-                threshold=DEFAULT_SEARCH_THRESHOLD,
-            )
+        # index document while the queries are being optimized
+        semaphore = asyncio.Semaphore(DEFAULT_QA_CONCURRENCY)
+        _, optimized_queries = await asyncio.gather(
+            self.document_get_content(document_uri, True, return_content=False),
+            asyncio.gather(
+                *[self._optimize_query(question, semaphore) for question in questions]
+            ),
+        )
 
-            self.progress_callback(f"Found {len(chunks)} chunks")
+        # search for all queries at once
+        normalized_uri = self.store.normalize_uri(document_uri)
+        results = await asyncio.gather(
+            *[
+                self._search_query(normalized_uri, query)
+                for query in optimized_queries
+            ]
+        )
 
+        selected_chunks = {}
+        for chunks in results:
             for chunk in chunks:
                 selected_chunks[chunk.metadata["id"]] = chunk
 
@@ -426,9 +541,38 @@ class DocumentQueryHelper:
 
         return True, str(ai_response)
 
+    async def _optimize_query(
+        self, question: str, semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            self.progress_callback(f"Optimizing query: {question}")
+            human_content = f'Search Query: "{question}"'
+            system_content = self.agent.parse_prompt(
+                "fw.document_query.optmimize_query.md"
+            )
+
+            return (
+                await self.agent.call_utility_model(
+                    system=system_content, message=human_content
+                )
+            ).strip()
+
+    async def _search_query(self, document_uri: str, query: str) -> list[Document]:
+        self.progress_callback(f"Searching document with query: {query}")
+        chunks = await self.store.search_document(
+            document_uri=document_uri,
+            query=query,
+            limit=DEFAULT_SEARCH_LIMIT,
+            threshold=DEFAULT_SEARCH_THRESHOLD,
+        )
+        self.progress_callback(f"Found {len(chunks)} chunks")
+        return chunks
+
     async def document_get_content(
-        self, document_uri: str, add_to_db: bool = False
+        self, document_uri: str, add_to_db: bool = False, return_content: bool = True
     ) -> str:
+        # without return_content the document is only indexed and "" is returned,
+        # its text is not held in memory
         self.progress_callback(f"Fetching document content")
         url = urlparse(document_uri)
         scheme = url.scheme or "file"
@@ -493,32 +637,42 @@ class DocumentQueryHelper:
         document_uri_norm = self.store.normalize_uri(document_uri)
 
         exists = await self.store.document_exists(document_uri_norm)
+
+        # local files may have changed since they were indexed
+        source_stat = self._file_stat(document_uri) if scheme == "file" else None
+        if exists and source_stat != self.store.source_stats.get(document_uri_norm):
+            exists = False
+
         document_content = ""
         if not exists:
-            if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(document_uri, scheme)
-            elif mimetype == "text/html":
-                document_content = self.handle_html_document(document_uri, scheme)
-            elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(document_uri, scheme)
-            elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(document_uri, scheme)
-            else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme
-                )
+            # parts are collected for the returned content while being indexed
+            contents: list[str] = []
+            collect_content = return_content or not add_to_db
+
+            async def collect():
+                async for part in self._document_parts(document_uri, scheme, mimetype):
+                    if collect_content:
+                        contents.append(part)
+                    yield part
+
             if add_to_db:
                 self.progress_callback(f"Indexing document")
-                success, ids = await self.store.add_document(
-                    document_content, document_uri_norm
+                success, ids = await self.store.add_document_parts(
+                    collect(), document_uri_norm
                 )
                 if not success:
                     self.progress_callback(f"Failed to index document")
                     raise ValueError(
                         f"DocumentQueryHelper::document_get_content: Failed to index document: {document_uri_norm}"
                     )
+                if source_stat:
+                    self.store.source_stats[document_uri_norm] = source_stat
                 self.progress_callback(f"Indexed {len(ids)} chunks")
-        else:
+            else:
+                async for _ in collect():
+                    pass
+            document_content = "\n".join(contents)
+        elif return_content:
             doc = await self.store.get_document(document_uri_norm)
             if doc:
                 document_content = doc.page_content
@@ -528,6 +682,34 @@ class DocumentQueryHelper:
                 )
         return document_content
 
+    async def _document_parts(
+        self, document_uri: str, scheme: str, mimetype: str
+    ) -> AsyncIterator[str]:
+        # PDFs are streamed in page batches, other formats are extracted in one
+        # piece on a worker thread so the event loop is not blocked
+        if mimetype == "application/pdf":
+            async for part in self.handle_pdf_document(document_uri, scheme):
+                yield part
+            return
+
+        if mimetype.startswith("image/"):
+            handler = self.handle_image_document
+        elif mimetype == "text/html":
+            handler = self.handle_html_document
+        elif mimetype.startswith("text/") or mimetype == "application/json":
+            handler = self.handle_text_document
+        else:
+            handler = self.handle_unstructured_document
+        yield await asyncio.to_thread(handler, document_uri, scheme)
+
+    @staticmethod
+    def _file_stat(path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
     def handle_image_document(self, document: str, scheme: str) -> str:
         return self.handle_unstructured_document(document, scheme)
 
@@ -568,12 +750,43 @@ class DocumentQueryHelper:
 
         return "\n".join([element.page_content for element in elements])
 
-    def handle_pdf_document(self, document: str, scheme: str) -> str:
+    async def handle_pdf_document(
+        self, document: str, scheme: str
+    ) -> AsyncIterator[str]:
+        temp_file_path = await asyncio.to_thread(self._pdf_temp_file, document, scheme)
+
+        try:
+            # text layer per page, OCR only for pages without one. Pages are OCRed there
+            # already, rasterizing with poppler is only for files PyMuPDF can not open
+            opened = False
+            try:
+                async for part in pdf_extract.iter_pdf_pages(temp_file_path):
+                    opened = True
+                    yield part
+            except Exception as e:
+                if opened:
+                    raise
+                PrintStyle.error(
+                    f"DocumentQueryHelper::handle_pdf_document: Error loading with PyMuPDF: {e}"
+                )
+
+            if not opened:
+                PrintStyle.debug(
+                    f"DocumentQueryHelper::handle_pdf_document: FALLBACK Converting PDF to images: {temp_file_path}"
+                )
+                async for part in pdf_extract.iter_pdf_pages(
+                    temp_file_path, ocr_fallback=True
+                ):
+                    yield part
+        finally:
+            os.unlink(temp_file_path)
+
+    def _pdf_temp_file(self, document: str, scheme: str) -> str:
         temp_file_path = ""
         if scheme == "file":
             # Use RFC file operations to read the PDF file as binary
             file_content_bytes = files.read_file_bin(document)
-            # Create a temporary file for PyMuPDFLoader since it needs a file path
+            # Create a temporary file for PyMuPDF since it needs a file path
             import tempfile
 
             with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
@@ -599,42 +812,7 @@ class DocumentQueryHelper:
             raise ValueError(
                 f"DocumentQueryHelper::handle_pdf_document: Temporary file not found: {temp_file_path}"
             )
-
-        try:
-            try:
-                loader = PyMuPDFLoader(
-                    temp_file_path,
-                    mode="single",
-                    extract_tables="markdown",
-                    extract_images=True,
-                    images_inner_format="text",
-                    images_parser=TesseractBlobParser(),
-                    pages_delimiter="\n",
-                )
-                elements: list[Document] = loader.load()
-                contents = "\n".join([element.page_content for element in elements])
-            except Exception as e:
-                PrintStyle.error(
-                    f"DocumentQueryHelper::handle_pdf_document: Error loading with PyMuPDF: {e}"
-                )
-                contents = ""
-
-            if not contents:
-                import pdf2image
-                import pytesseract
-
-                PrintStyle.debug(
-                    f"DocumentQueryHelper::handle_pdf_document: FALLBACK Converting PDF to images: {temp_file_path}"
-                )
-
-                # Convert PDF to images
-                pages = pdf2image.convert_from_path(temp_file_path)  # type: ignore
-                for page in pages:
-                    contents += pytesseract.image_to_string(page) + "\n\n"
-
-            return contents
-        finally:
-            os.unlink(temp_file_path)
+        return temp_file_path
 
     def handle_unstructured_document(self, document: str, scheme: str) -> str:
         elements: list[Document] = []
@@ -2,8 +2,12 @@ import os
 from pathlib import Path
 import shutil
 import base64
-import subprocess
-from typing import Dict, List, Tuple, Any
+import binascii
+import fnmatch
+import json
+import stat
+import time
+from typing import Dict, List, NamedTuple, Tuple, Any
 from werkzeug.utils import secure_filename
 from datetime import datetime
 
@@ -11,6 +15,29 @@ from python.helpers import files
 from python.helpers.print_style import PrintStyle
 
 
+class _ScanEntry(NamedTuple):
+    name: str
+    is_dir: bool
+    size: int
+    mtime: float
+    is_symlink: bool
+
+
+class _DirInfo(NamedTuple):
+    mtime_ns: int
+    size: int  # files directly in the folder
+    files: int
+    subdirs: List[str]
+    checked: float
+
+
+# folder sizes by path, a folder is rescanned when its mtime changes (entries added,
+# removed or renamed) or the entry gets older than DIR_SIZE_MAX_AGE (files changed in place)
+_dir_cache: Dict[str, _DirInfo] = {}
+DIR_SIZE_MAX_AGE = 600
+DIR_CACHE_SIZE = 100000
+
+
 class FileBrowser:
     ALLOWED_EXTENSIONS = {
         'image': {'jpg', 'jpeg', 'png', 'bmp'},
@@ -19,6 +46,12 @@ class FileBrowser:
     }
 
     MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+    PAGE_SIZE = 200
+    MAX_PAGE_SIZE = 1000
+    # entries read from one directory, the rest is not listed
+    MAX_ENTRIES = 100000
+    # seconds for one folder size request, a partial size is returned after that
+    DIR_SIZE_TIMEOUT = 20
 
     def __init__(self):
         # if runtime.is_development():
@@ -122,124 +155,80 @@ class FileBrowser:
     def _get_file_extension(self, filename: str) -> str:
         return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
 
-    def _get_files_via_ls(self, full_path: Path) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-        """Get files and folders using ls command for better error handling"""
-        files: List[Dict[str, Any]] = []
-        folders: List[Dict[str, Any]] = []
-
+    def _scan_dir(self, full_path: Path) -> Tuple[List[_ScanEntry], bool]:
+        """Entries of a directory with one stat each, and whether the scan was cut at MAX_ENTRIES"""
+        entries: List[_ScanEntry] = []
         try:
-            # Use ls command to get directory listing
-            result = subprocess.run(
-                ['ls', '-la', str(full_path)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                PrintStyle.error(f"ls command failed: {result.stderr}")
-                return files, folders
-
-            # Parse ls output (skip first line which is "total X")
-            lines = result.stdout.strip().split('\n')
-            if len(lines) <= 1:
-                return files, folders
-
-            for line in lines[1:]:  # Skip the "total" line
-                try:
-                    # Skip current and parent directory entries
-                    if line.endswith(' .') or line.endswith(' ..'):
-                        continue
-
-                    # Parse ls -la output format
-                    parts = line.split()
-                    if len(parts) < 9:
-                        continue
-
-                    # Check if this is a symlink (permissions start with 'l')
-                    permissions = parts[0]
-                    is_symlink = permissions.startswith('l')
-
-                    if is_symlink:
-                        # For symlinks, extract the name before the '->' arrow
-                        full_name_part = ' '.join(parts[8:])
-                        if ' -> ' in full_name_part:
-                            filename = full_name_part.split(' -> ')[0]
-                            symlink_target = full_name_part.split(' -> ')[1]
-                        else:
-                            filename = full_name_part
-                            symlink_target = None
-                    else:
-                        filename = ' '.join(parts[8:])  # Handle filenames with spaces
-                        symlink_target = None
-
-                    if not filename:
-                        continue
-
-                    # Get full path for this entry
-                    entry_path = full_path / filename
-
+            with os.scandir(full_path) as it:
+                for entry in it:
+                    if len(entries) >= self.MAX_ENTRIES:
+                        return entries, True
                     try:
-                        stat_info = entry_path.stat()
-
-                        entry_data: Dict[str, Any] = {
-                            "name": filename,
-                            "path": str(entry_path.relative_to(self.base_dir)),
-                            "modified": datetime.fromtimestamp(stat_info.st_mtime).isoformat()
-                        }
-
-                        # Add symlink information if this is a symlink
-                        if is_symlink and symlink_target:
-                            entry_data["symlink_target"] = symlink_target
-                            entry_data["is_symlink"] = True
-
-                        if entry_path.is_file():
-                            entry_data.update({
-                                "type": self._get_file_type(filename),
-                                "size": stat_info.st_size,
-                                "is_dir": False
-                            })
-                            files.append(entry_data)
-                        elif entry_path.is_dir():
-                            entry_data.update({
-                                "type": "folder",
-                                "size": 0,  # Directories show as 0 bytes
-                                "is_dir": True
-                            })
-                            folders.append(entry_data)
-
-                    except (OSError, PermissionError, FileNotFoundError) as e:
-                        # Log error but continue with other files
-                        PrintStyle.warning(f"No access to {filename}: {e}")
+                        is_symlink = entry.is_symlink()
+                        # symlinks are listed as what they point to, like before
+                        stat_info = entry.stat(follow_symlinks=True)
+                    except OSError as e:
+                        if not is_symlink:
+                            PrintStyle.warning(f"No access to {entry.name}: {e}")
                         continue
-
-                    if len(files) + len(folders) > 10000:
-                        break
-
-                except Exception as e:
-                    # Log error and continue with next line
-                    PrintStyle.error(f"Error parsing ls line '{line}': {e}")
-                    continue
-
-        except subprocess.TimeoutExpired:
-            PrintStyle.error("ls command timed out")
-        except Exception as e:
-            PrintStyle.error(f"Error running ls command: {e}")
-
-        return files, folders
-
-    def get_files(self, current_path: str = "") -> Dict:
+                    if stat.S_ISDIR(stat_info.st_mode):
+                        entries.append(_ScanEntry(entry.name, True, 0, stat_info.st_mtime, is_symlink))
+                    elif stat.S_ISREG(stat_info.st_mode):
+                        entries.append(
+                            _ScanEntry(entry.name, False, stat_info.st_size, stat_info.st_mtime, is_symlink)
+                        )
+        except OSError as e:
+            PrintStyle.error(f"Error scanning {full_path}: {e}")
+        return entries, False
+
+    def _to_entry(self, full_path: Path, scanned: _ScanEntry) -> Dict[str, Any]:
+        entry_path = full_path / scanned.name
+        entry_data: Dict[str, Any] = {
+            "name": scanned.name,
+            "path": str(entry_path.relative_to(self.base_dir)),
+            "modified": datetime.fromtimestamp(scanned.mtime).isoformat(),
+        }
+        if scanned.is_symlink:
+            try:
+                entry_data["symlink_target"] = os.readlink(entry_path)
+                entry_data["is_symlink"] = True
+            except OSError:
+                pass
+        if scanned.is_dir:
+            entry_data.update({"type": "folder", "size": 0, "is_dir": True})
+        else:
+            entry_data.update({
+                "type": self._get_file_type(scanned.name),
+                "size": scanned.size,
+                "is_dir": False
+            })
+        return entry_data
+
+    def get_files(
+        self,
+        current_path: str = "",
+        sort_by: str = "name",
+        direction: str = "asc",
+        filter: str = "",
+        cursor: str = "",
+        limit: int = PAGE_SIZE,
+    ) -> Dict:
+        """One page of a directory listing, folders first, sorted and filtered.
+        next_cursor is empty on the last page, pass it back for the next one."""
         try:
             # Resolve the full path while preventing directory traversal
             full_path = (self.base_dir / current_path).resolve()
             if not str(full_path).startswith(str(self.base_dir)):
                 raise ValueError("Invalid path")
 
-            # Use ls command instead of os.scandir for better error handling
-            files, folders = self._get_files_via_ls(full_path)
-
-            # Combine folders and files, folders first
-            all_entries = folders + files
+            scanned, truncated = self._scan_dir(full_path)
+            scanned = _filter_entries(scanned, filter)
+            scanned = _sort_entries(scanned, sort_by, direction)
+            limit = max(1, min(int(limit or self.PAGE_SIZE), self.MAX_PAGE_SIZE))
+            start = _cursor_start(scanned, cursor)
+            page = scanned[start:start + limit]
+            end = start + len(page)
+            next_cursor = _make_cursor(page[-1].name, end) if end < len(scanned) else ""
 
             # Get parent directory path if not at root
             parent_path = ""
@@ -256,14 +245,31 @@ class FileBrowser:
                     parent_path = ""
 
             return {
-                "entries": all_entries,
+                "entries": [self._to_entry(full_path, s) for s in page],
                 "current_path": current_path,
-                "parent_path": parent_path
+                "parent_path": parent_path,
+                "total": len(scanned),
+                "next_cursor": next_cursor,
+                "truncated": truncated,
             }
 
         except Exception as e:
             PrintStyle.error(f"Error reading directory: {e}")
-            return {"entries": [], "current_path": "", "parent_path": ""}
+            return {
+                "entries": [], "current_path": "", "parent_path": "",
+                "total": 0, "next_cursor": "", "truncated": False,
+            }
+
+    def get_dir_size(self, dir_path: str) -> Dict:
+        """Total size and file count of a folder and its subfolders, see _dir_size"""
+        full_path = (self.base_dir / dir_path).resolve()
+        if not str(full_path).startswith(str(self.base_dir)):
+            raise ValueError("Invalid path")
+        if not full_path.is_dir():
+            raise ValueError(f"Folder {dir_path} not found")
+        deadline = time.monotonic() + self.DIR_SIZE_TIMEOUT
+        size, count, complete = _dir_size(str(full_path), deadline)
+        return {"path": dir_path, "size": size, "files": count, "complete": complete}
 
     def get_full_path(self, file_path: str, allow_dir: bool = False) -> str:
         """Get full file path if it exists and is within base_dir"""
@@ -278,3 +284,103 @@ class FileBrowser:
             if ext in extensions:
                 return file_type
         return 'unknown'
+
+_SORT_KEYS = {
+    "name": lambda e: (e.name.casefold(), e.name),
+    "size": lambda e: (e.size, e.name.casefold()),
+    "date": lambda e: (e.mtime, e.name.casefold()),
+}
+
+
+def _filter_entries(entries: List[_ScanEntry], pattern: str) -> List[_ScanEntry]:
+    # case insensitive, a substring or a glob pattern like *.py
+    pattern = (pattern or "").strip().casefold()
+    if not pattern:
+        return entries
+    if any(c in pattern for c in "*?["):
+        return [e for e in entries if fnmatch.fnmatchcase(e.name.casefold(), pattern)]
+    return [e for e in entries if pattern in e.name.casefold()]
+
+
+def _sort_entries(entries: List[_ScanEntry], sort_by: str, direction: str) -> List[_ScanEntry]:
+    key = _SORT_KEYS.get(sort_by, _SORT_KEYS["name"])
+    reverse = direction == "desc"
+    # folders always come first
+    folders = sorted((e for e in entries if e.is_dir), key=key, reverse=reverse)
+    files = sorted((e for e in entries if not e.is_dir), key=key, reverse=reverse)
+    return folders + files
+
+
+def _make_cursor(last_name: str, offset: int) -> str:
+    data = json.dumps([last_name, offset]).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def _cursor_start(entries: List[_ScanEntry], cursor: str) -> int:
+    """Index after the last entry of the previous page, found by name
+    so files added or removed meanwhile do not shift the next page"""
+    if not cursor:
+        return 0
+    try:
+        last_name, offset = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        offset = int(offset)
+    except (ValueError, TypeError, binascii.Error):
+        return 0
+    if 0 < offset <= len(entries) and entries[offset - 1].name == last_name:
+        return offset
+    for i, entry in enumerate(entries):
+        if entry.name == last_name:
+            return i + 1
+    return max(0, min(offset, len(entries)))
+
+
+def _dir_size(root: str, deadline: float) -> Tuple[int, int, bool]:
+    """Size and count of files under root, without following symlinks or leaving
+    the file system of root. Unchanged folders come from _dir_cache without a rescan."""
+    root_dev = os.stat(root).st_dev
+    size = count = 0
+    stack = [root]
+    while stack:
+        if time.monotonic() > deadline:
+            return size, count, False
+        path = stack.pop()
+        try:
+            dir_stat = os.stat(path)
+        except OSError:
+            continue
+        if dir_stat.st_dev != root_dev:
+            continue
+        info = _dir_cache.get(path)
+        now = time.time()
+        if (
+            info is None
+            or info.mtime_ns != dir_stat.st_mtime_ns
+            or now - info.checked > DIR_SIZE_MAX_AGE
+        ):
+            info = _scan_dir_size(path, dir_stat.st_mtime_ns, now)
+            if len(_dir_cache) >= DIR_CACHE_SIZE:
+                _dir_cache.clear()
+            _dir_cache[path] = info
+        size += info.size
+        count += info.files
+        stack.extend(info.subdirs)
+    return size, count, True
+
+
+def _scan_dir_size(path: str, mtime_ns: int, now: float) -> _DirInfo:
+    size = count = 0
+    subdirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        size += entry.stat(follow_symlinks=False).st_size
+                        count += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass  # no access, counted as empty
+    return _DirInfo(mtime_ns, size, count, subdirs, now)
@@ -441,10 +441,11 @@ class History(Record):
         return bulk
 
 
-def deserialize_history(json_data: str, agent) -> History:
+def deserialize_history(json_data: str | dict, agent) -> History:
     history = History(agent=agent)
     if json_data:
-        data = _json_loads(json_data)
+        # binary chat files store the history dict directly
+        data = _json_loads(json_data) if isinstance(json_data, str) else json_data
         history = History.from_dict(data, history=history)
     return history
 
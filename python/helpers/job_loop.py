@@ -5,8 +5,10 @@ from python.helpers.task_scheduler import TaskScheduler
 from python.helpers.print_style import PrintStyle
 from python.helpers import errors
 from python.helpers import runtime
+from python.helpers import persist_chat
 
 
+# longest sleep, the scheduler wakes earlier for due tasks and task changes
 SLEEP_TIME = 60
 
 keep_running = True
@@ -16,6 +18,7 @@ pause_time = 0
 async def run_loop():
     global pause_time, keep_running
 
+    last_unload = time.time()
     while True:
         if runtime.is_development():
             # Signal to container that the job loop should be paused
@@ -26,19 +29,29 @@ async def run_loop():
                 PrintStyle().error("Failed to pause job loop by development instance: " + errors.error_text(e))
         if not keep_running and (time.time() - pause_time) > (SLEEP_TIME * 2):
             resume_loop()
+        timeout = SLEEP_TIME
         if keep_running:
             try:
-                await scheduler_tick()
+                next_run = await scheduler_tick()
+                if next_run is not None:
+                    timeout = min(timeout, next_run)
             except Exception as e:
                 PrintStyle().error(errors.format_error(e))
-        await asyncio.sleep(SLEEP_TIME)  # TODO! - if we lower it under 1min, it can run a 5min job multiple times in it's target minute
+        # memory of this instance, not paused with the jobs
+        if time.time() - last_unload >= SLEEP_TIME:
+            last_unload = time.time()
+            try:
+                await persist_chat.unload_idle_chats()
+            except Exception as e:
+                PrintStyle().error(errors.format_error(e))
+        await TaskScheduler.get().wait(timeout)
 
 
-async def scheduler_tick():
+async def scheduler_tick() -> float | None:
     # Get the task scheduler instance and print detailed debug info
     scheduler = TaskScheduler.get()
-    # Run the scheduler tick
-    await scheduler.tick()
+    # Run the scheduler tick, seconds until the next due task
+    return await scheduler.tick()
 
 
 def pause_loop():
@@ -0,0 +1,179 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Iterable
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# reciprocal rank fusion constant, dampens the weight of top ranks
+RRF_K = 60
+
+# share of the query's idf weight a document has to cover to count as a keyword hit
+# keeps rare exact identifiers (function names, error codes, ticket ids) decisive
+# while documents matching only common words are ignored
+MIN_KEYWORD_COVERAGE = 0.5
+
+_TOKEN_RE = re.compile(r"\w+(?:[.\-:/#]\w+)*", re.UNICODE)
+_PART_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have he her his i if in into is it its "
+    "me my no not of on or our she so that the their them then there these they "
+    "this to was we were what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    # compound tokens like "get_settings", "ERR-1234" or "file.py" are kept whole
+    # and their parts are indexed too, so both exact and partial lookups match
+    tokens = []
+    for match in _TOKEN_RE.findall(text.lower()):
+        parts = _PART_RE.findall(match)
+        if len(parts) > 1 or match not in parts:
+            tokens.append(match)
+        tokens.extend(p for p in parts if p not in _STOPWORDS)
+    return tokens
+
+
+class KeywordIndex:
+    """Inverted BM25 keyword index kept alongside a vector store."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, int]] = {}
+        self.doc_terms: dict[str, tuple[str, ...]] = {}
+        self.doc_len: dict[str, int] = {}
+        self.total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def __contains__(self, id: str):
+        return id in self.doc_len
+
+    def add(self, id: str, text: str):
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        with self._lock:
+            if id in self.doc_len:
+                self._remove(id)
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[id] = tf
+            self.doc_terms[id] = tuple(counts.keys())
+            self.doc_len[id] = len(tokens)
+            self.total_len += len(tokens)
+
+    def add_many(self, items: Iterable[tuple[str, str]]):
+        for id, text in items:
+            self.add(id, text)
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for id in ids:
+                self._remove(id)
+
+    def _remove(self, id: str):
+        terms = self.doc_terms.pop(id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(id, 0)
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.doc_terms.clear()
+            self.doc_len.clear()
+            self.total_len = 0
+
+    def idf(self, term: str) -> float:
+        return idf(len(self.postings.get(term, ())), len(self.doc_len))
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        filter: Callable[[str], bool] | None = None,
+        min_coverage: float = MIN_KEYWORD_COVERAGE,
+    ) -> list[tuple[str, float]]:
+        terms = set(tokenize(query))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            if not self.doc_len:
+                return []
+            avg_len = self.total_len / len(self.doc_len) or 1
+            idfs = {term: self.idf(term) for term in terms}
+            query_weight = sum(idfs.values()) or 1
+
+            scores: dict[str, float] = {}
+            coverage: dict[str, float] = {}
+            for term, idf in idfs.items():
+                for id, tf in self.postings.get(term, {}).items():
+                    norm = 1 - BM25_B + BM25_B * self.doc_len[id] / avg_len
+                    scores[id] = scores.get(id, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                        tf + BM25_K1 * norm
+                    )
+                    coverage[id] = coverage.get(id, 0.0) + idf
+
+        ranked = sorted(
+            (
+                (id, score)
+                for id, score in scores.items()
+                if coverage[id] / query_weight >= min_coverage
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+        result = []
+        for id, score in ranked:
+            if filter and not filter(id):
+                continue
+            result.append((id, score))
+            if len(result) >= limit:
+                break
+        return result
+
+
+def idf(docs_with_term: int, total: int) -> float:
+    # lucene variant, always positive
+    # unknown terms weigh like the rarest known ones, so a single typo or synonym
+    # in the query does not outweigh everything the documents do match
+    n = max(1, docs_with_term)
+    return math.log(1 + (total - n + 0.5) / (n + 0.5))
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]], limit: int = 0, k: int = RRF_K
+) -> list[str]:
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id in enumerate(ranking):
+            scores[id] = scores.get(id, 0.0) + 1 / (k + rank + 1)
+    # sorted() is stable, so ties keep the order of the first ranking they appeared in
+    fused = sorted(scores, key=lambda id: scores[id], reverse=True)
+    return fused[:limit] if limit > 0 else fused
+
+
+def metadata_filter(
+    docs: dict[str, Any], comparator: Callable[[dict[str, Any]], bool] | None
+) -> Callable[[str], bool] | None:
+    # adapt a metadata comparator to a doc id filter for keyword search
+    if not comparator:
+        return None
+
+    def filter(id: str) -> bool:
+        doc = docs.get(id)
+        return doc is not None and bool(comparator(doc.metadata))
+
+    return filter
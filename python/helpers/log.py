@@ -1,9 +1,12 @@
 from dataclasses import dataclass, field
 import json
+import threading
+import time
 from typing import Any, Literal, Optional, Dict
 import uuid
 from collections import OrderedDict  # Import OrderedDict
 from python.helpers.strings import truncate_text_by_ratio
+from python.helpers import state_monitor
 import copy
 
 Type = Literal[
@@ -164,8 +167,14 @@ class Log:
 
     def __init__(self):
         self.guid: str = str(uuid.uuid4())
-        self.updates: list[int] = []
+        # bumped on every change, clients poll with the last version they have seen
+        self.version: int = 0
+        # item no -> version of its last change, ordered by last change
+        # repeated updates of one item (streaming) replace its entry, so this stays bounded
+        self.updates: OrderedDict[int, int] = OrderedDict()
         self.logs: list[LogItem] = []
+        # agents log from their own threads while the UI polls
+        self._lock = threading.Lock()
         self.set_initial_progress()
 
     def log(
@@ -212,7 +221,7 @@ class Log:
             id=id,  # Pass id to LogItem
         )
         self.logs.append(item)
-        self.updates += [item.no]
+        self.touch(item.no)
         self._update_progress_from_item(item)
         return item
 
@@ -258,39 +267,51 @@ class Log:
                 item.kvps[_truncate_key(k)] = _truncate_value(v)
 
 
-        self.updates += [item.no]
+        self.touch(item.no)
         self._update_progress_from_item(item)
 
+    def touch(self, no: int):
+        with self._lock:
+            self.version += 1
+            self.updates[no] = self.version
+            self.updates.move_to_end(no)
+        state_monitor.notify(self)
+
+    def changed(self, start: int = 0, end: int | None = None) -> list[int]:
+        # numbers of items changed after version start, up to version end
+        nos = []
+        with self._lock:
+            for no, version in reversed(self.updates.items()):
+                if version <= start:
+                    break
+                if end is None or version <= end:
+                    nos.append(no)
+        nos.sort()  # creation order, new items always have higher numbers
+        return nos
+
     def set_progress(self, progress: str, no: int = 0, active: bool = True):
         self.progress = _truncate_progress(progress)
         if not no:
             no = len(self.logs)
         self.progress_no = no
         self.progress_active = active
+        state_monitor.notify(self)
 
     def set_initial_progress(self):
         self.set_progress("Waiting for input", 0, False)
 
     def output(self, start=None, end=None):
-        if start is None:
-            start = 0
-        if end is None:
-            end = len(self.updates)
-
-        out = []
-        seen = set()
-        for update in self.updates[start:end]:
-            if update not in seen:
-                out.append(self.logs[update].output())
-                seen.add(update)
-
-        return out
+        # items changed after version start, each one once in its latest state
+        return [self.logs[no].output() for no in self.changed(start or 0, end)]
 
     def reset(self):
-        self.guid = str(uuid.uuid4())
-        self.updates = []
-        self.logs = []
+        with self._lock:
+            self.guid = str(uuid.uuid4())
+            self.version = 0
+            self.updates = OrderedDict()
+            self.logs = []
         self.set_initial_progress()
+        state_monitor.notify()
 
     def _update_progress_from_item(self, item: LogItem):
         if item.heading and item.update_progress != "none":
@@ -299,4 +320,22 @@ class Log:
                     item.heading,
                     (item.no if item.update_progress == "persistent" else -1),
                 )
-            
+
+
+class StreamThrottle:
+    """Lets stream updates through at most fps times per second. Skipped updates are
+    remembered as pending, so the final state can be flushed when the stream ends."""
+
+    def __init__(self, fps: float):
+        self.interval = 1 / fps if fps > 0 else 0
+        self.last = 0.0
+        self.pending = False
+
+    def ready(self) -> bool:
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
+            self.pending = False
+            return True
+        self.pending = True
+        return False
@@ -1,27 +1,29 @@
 from datetime import datetime
-from typing import Any, List, Sequence
+from typing import Any, Awaitable, Callable, List, Sequence
 from langchain.storage import InMemoryByteStore, LocalFileStore
 from langchain.embeddings import CacheBackedEmbeddings
 
 # from langchain_chroma import Chroma
-from langchain_community.vectorstores import FAISS
 
 # faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
 from python.helpers import faiss_monkey_patch
 import faiss
 
 
-from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores.utils import (
     DistanceStrategy,
 )
 from langchain_core.embeddings import Embeddings
 
-import os, json
+import asyncio, os, json, threading, time
 
 import numpy as np
 
 from python.helpers.print_style import PrintStyle
+from python.helpers.vector_db import MyFaiss
+from python.helpers.disk_docstore import DiskDocstore
+from python.helpers import memory_columnar
+from python.helpers.memory_columnar import ColumnarReader, ColumnarWriter, RowGroup
 from . import files
 from langchain_core.documents import Document
 import uuid
@@ -37,18 +39,13 @@ from simpleeval import simple_eval
 # Raise the log level so WARNING messages aren't shown
 logging.getLogger("langchain_core.vectorstores.base").setLevel(logging.ERROR)
 
+# set in task worker processes, memory calls run in the process owning the memory files
+_remote_call: Callable[[str, tuple, dict], Awaitable[Any]] | None = None
 
-class MyFaiss(FAISS):
-    # override aget_by_ids
-    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
-        # return all self.docstore._dict[id] in ids
-        return [self.docstore._dict[id] for id in (ids if isinstance(ids, list) else [ids]) if id in self.docstore._dict]  # type: ignore
 
-    async def aget_by_ids(self, ids: Sequence[str], /) -> List[Document]:
-        return self.get_by_ids(ids)
-
-    def get_all_docs(self):
-        return self.docstore._dict  # type: ignore
+def set_remote_call(call: Callable[[str, tuple, dict], Awaitable[Any]] | None):
+    global _remote_call
+    _remote_call = call
 
 
 class Memory:
@@ -60,10 +57,26 @@ class Memory:
         INSTRUMENTS = "instruments"
 
     index: dict[str, "MyFaiss"] = {}
+    # last access time per memory subdir, idle ones are evicted from index
+    last_used: dict[str, float] = {}
+    # subdirs with knowledge already preloaded in this process
+    preloaded: set[str] = set()
+
+    # compaction thread per subdir while one is running
+    compacting: dict[str, threading.Thread] = {}
+
+    # seconds after which an unused memory subdir is dropped from index
+    IDLE_TIMEOUT = 30 * 60
+    # share of deleted memories at which the index is rebuilt without them
+    COMPACT_TOMBSTONE_RATIO = 0.2
 
     @staticmethod
     async def get(agent: Agent):
+        if _remote_call is not None:
+            return RemoteMemory(_remote_call)
         memory_subdir = agent.config.memory_subdir or "default"
+        Memory._evict_idle(keep=memory_subdir)
+        Memory.last_used[memory_subdir] = time.time()
         if Memory.index.get(memory_subdir) is None:
             log_item = agent.context.log.log(
                 type="util",
@@ -76,11 +89,14 @@ class Memory:
                 False,
             )
             Memory.index[memory_subdir] = db
+            Memory._compact_if_needed(db, memory_subdir)
             wrap = Memory(agent, db, memory_subdir=memory_subdir)
-            if agent.config.knowledge_subdirs:
+            # reopening an evicted subdir does not need another knowledge preload
+            if agent.config.knowledge_subdirs and memory_subdir not in Memory.preloaded:
                 await wrap.preload_knowledge(
                     log_item, agent.config.knowledge_subdirs, memory_subdir
                 )
+                Memory.preloaded.add(memory_subdir)
             return wrap
         else:
             return Memory(
@@ -89,11 +105,33 @@ class Memory:
                 memory_subdir=memory_subdir,
             )
 
+    @staticmethod
+    def _evict_idle(keep: str = ""):
+        now = time.time()
+        for memory_subdir, used in list(Memory.last_used.items()):
+            if memory_subdir == keep or now - used <= Memory.IDLE_TIMEOUT:
+                continue
+            # the compaction thread still writes the files, evicted on a later call
+            if memory_subdir in Memory.compacting:
+                continue
+            Memory._drop_db(memory_subdir)
+            del Memory.last_used[memory_subdir]
+
+    @staticmethod
+    def _drop_db(memory_subdir: str):
+        # the next get opens the files again, wrappers still in use (imports,
+        # consolidation, dashboard requests) keep the old instance until they are
+        # done, its docstore connection is closed when it is collected
+        Memory.index.pop(memory_subdir, None)
+
     @staticmethod
     async def reload(agent: Agent):
         memory_subdir = agent.config.memory_subdir or "default"
-        if Memory.index.get(memory_subdir):
-            del Memory.index[memory_subdir]
+        compaction = Memory.compacting.get(memory_subdir)
+        if compaction:
+            await asyncio.to_thread(compaction.join)
+        Memory._drop_db(memory_subdir)
+        Memory.preloaded.discard(memory_subdir)
         return await Memory.get(agent)
 
     @staticmethod
@@ -145,14 +183,7 @@ class Memory:
 
         # if db folder exists and is not empty:
         if os.path.exists(db_dir) and files.exists(db_dir, "index.faiss"):
-            db = MyFaiss.load_local(
-                folder_path=db_dir,
-                embeddings=embedder,
-                allow_dangerous_deserialization=True,
-                distance_strategy=DistanceStrategy.COSINE,
-                # normalize_L2=True,
-                relevance_score_fn=Memory._cosine_normalizer,
-            )  # type: ignore
+            db = Memory._load_db_file(db_dir, embedder, log_item)
 
             # if there is a mismatch in embeddings used, re-index the whole DB
             emb_ok = False
@@ -168,17 +199,19 @@ class Memory:
 
             # re-index -  create new DB and insert existing docs
             if db and not emb_ok:
-                docs = db.get_all_docs()
+                docs = dict(db.get_all_docs().items())
                 db = None
 
         # DB not loaded, create one
         if not db:
             index = faiss.IndexFlatIP(len(embedder.embed_query("example")))
+            docstore = DiskDocstore(db_dir)
+            docstore.clear()
 
             db = MyFaiss(
                 embedding_function=embedder,
                 index=index,
-                docstore=InMemoryDocstore(),
+                docstore=docstore,
                 index_to_docstore_id={},
                 distance_strategy=DistanceStrategy.COSINE,
                 # normalize_L2=True,
@@ -296,18 +329,52 @@ class Memory:
         return index
 
     async def search_similarity_threshold(
-        self, query: str, limit: int, threshold: float, filter: str = ""
+        self,
+        query: str,
+        limit: int,
+        threshold: float,
+        filter: str = "",
+        hybrid: bool = True,
     ):
+        # near identical queries repeat within a monologue, reuse results until the db changes
+        key = (query, filter, threshold, limit, hybrid)
+        version = self.db.version
+        cached = self.db.query_cache.get(key, version)
+        if cached is None:
+            cached = await self._search_similarity_threshold(
+                query, limit, threshold, filter, hybrid
+            )
+            self.db.query_cache.put(key, version, cached)
+        # callers may annotate metadata, keep the cached documents untouched
+        return [
+            doc.model_copy(update={"metadata": dict(doc.metadata)}) for doc in cached
+        ]
+
+    async def _search_similarity_threshold(
+        self, query: str, limit: int, threshold: float, filter: str, hybrid: bool
+    ) -> list[Document]:
         comparator = Memory._get_comparator(filter) if filter else None
 
-        return await self.db.asearch(
+        # pure vector search where results must really be above threshold
+        if not hybrid:
+            return await self.db.asearch_threshold(
+                query,
+                k=limit,
+                score_threshold=threshold,
+                filter=comparator,
+            )
+
+        # vector search fused with keyword matches on exact identifiers
+        return await self.db.ahybrid_search(
             query,
-            search_type="similarity_score_threshold",
             k=limit,
             score_threshold=threshold,
             filter=comparator,
         )
 
+    def get_cache_stats(self) -> dict[str, Any]:
+        return self.db.query_cache.stats()
+
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
     ):
@@ -318,7 +385,7 @@ class Memory:
         while True:
             # Perform similarity search with score
             docs = await self.search_similarity_threshold(
-                query, limit=k, threshold=threshold, filter=filter
+                query, limit=k, threshold=threshold, filter=filter, hybrid=False
             )
             removed += docs
 
@@ -331,15 +398,13 @@ class Memory:
                 # fnd = self.db.get(where={"id": {"$in": document_ids}})
                 # if fnd["ids"]: self.db.delete(ids=fnd["ids"])
                 # tot += len(fnd["ids"])
-                await self.db.adelete(ids=document_ids)
+                await self._delete_ids(document_ids)
                 tot += len(document_ids)
 
             # If fewer than K document IDs, break the loop
             if len(document_ids) < k:
                 break
 
-        if tot:
-            self._save_db()  # persist
         return removed
 
     async def delete_documents_by_ids(self, ids: list[str]):
@@ -349,11 +414,177 @@ class Memory:
         )  # existing docs to remove (prevents error)
         if rem_docs:
             rem_ids = [doc.metadata["id"] for doc in rem_docs]  # ids to remove
-            await self.db.adelete(ids=rem_ids)
+            await self._delete_ids(rem_ids)
+        return rem_docs
 
-        if rem_docs:
+    async def get_documents_by_ids(self, ids: list[str]) -> list[Document]:
+        return await self.db.aget_by_ids(ids)
+
+    def get_ids_by_filter(self, filter: str) -> list[str]:
+        # single pass over all documents, metadata only
+        # documents missing a key used in the filter simply do not match
+        comparator = Memory._get_comparator(filter, log_errors=False)
+        return [
+            id for id, doc in self.db.get_all_docs().items() if comparator(doc.metadata)
+        ]
+
+    async def delete_documents_by_filter(self, filter: str) -> int:
+        if not filter.strip():
+            raise ValueError("Filter is required for bulk delete")
+        ids = self.get_ids_by_filter(filter)
+        if ids:
+            await self._delete_ids(ids)
+        return len(ids)
+
+    async def update_documents_by_filter(self, filter: str, metadata: dict) -> int:
+        if not filter.strip():
+            raise ValueError("Filter is required for bulk update")
+        # ids identify documents in the index and must stay
+        metadata = {k: v for k, v in metadata.items() if k != "id"}
+        docs = self.db.get_all_docs()
+        ids = self.get_ids_by_filter(filter)
+        if not ids or not metadata:
+            return len(ids)
+
+        updated = {}
+        for id in ids:
+            doc = docs[id]
+            doc.metadata = {**doc.metadata, **metadata}
+            updated[id] = doc
+
+        if isinstance(self.db.docstore, DiskDocstore):
+            self.db.docstore.add(updated)  # one transaction
+        else:
+            self._save_db()  # documents were updated in place, persist once
+        self.db.bump_version()
+        return len(ids)
+
+    async def export_columnar(self, path: str) -> int:
+        # file writes and compression off the event loop
+        return await asyncio.to_thread(self._export_columnar, path)
+
+    def _export_columnar(self, path: str) -> int:
+        # streamed in row groups, vectors are read back from the index
+        model_id = Memory._embedding_model_id(self.memory_subdir)
+        rows = 0
+        with open(path + ".tmp", "wb") as f:
+            writer = ColumnarWriter(f, model_id, self.db.index.d)
+            start = 0
+            while True:
+                with self.db._lock:
+                    end = min(
+                        start + memory_columnar.ROW_GROUP_SIZE,
+                        len(self.db.index_to_docstore_id),
+                    )
+                    if start >= end:
+                        break
+                    ids = [self.db.index_to_docstore_id[i] for i in range(start, end)]
+                    vectors = self.db.index.reconstruct_n(start, end - start)
+                start = end
+
+                docs = {doc.metadata["id"]: doc for doc in self.db.get_by_ids(ids)}
+                group = RowGroup()
+                keep = []
+                for i, id in enumerate(ids):
+                    doc = docs.get(id)
+                    if not doc:
+                        continue  # tombstoned
+                    metadata = dict(doc.metadata)
+                    group.id.append(id)
+                    group.area.append(metadata.pop("area", Memory.Area.MAIN.value))
+                    group.timestamp.append(metadata.pop("timestamp", ""))
+                    metadata.pop("id", None)
+                    group.metadata.append(metadata)
+                    group.text.append(doc.page_content)
+                    keep.append(i)
+                group.vector = vectors[keep]
+                writer.write(group)
+            writer.close()
+            rows = writer.rows
+        os.replace(path + ".tmp", path)
+        return rows
+
+    async def import_columnar(self, path: str) -> tuple[int, bool]:
+        # vectors are reused when the embedding model matches, otherwise texts are re-embedded.
+        # row groups are read and decompressed off the event loop, one at a time
+        model_id = await asyncio.to_thread(Memory._embedding_model_id, self.memory_subdir)
+        imported = 0
+        with await asyncio.to_thread(open, path, "rb") as f:
+            reader = await asyncio.to_thread(ColumnarReader, f)
+            # an unknown model on either side is never a match
+            reuse = (
+                bool(model_id)
+                and reader.embedding_model == model_id
+                and reader.dim == self.db.index.d
+            )
+            groups = iter(reader)
+            while (group := await asyncio.to_thread(next, groups, None)) is not None:
+                # ids already present (including tombstoned) are skipped
+                keep = [
+                    i
+                    for i, id in enumerate(group.id)
+                    if id not in self.db.docstore._dict  # type: ignore
+                ]
+                if not keep:
+                    continue
+                ids = [group.id[i] for i in keep]
+                texts = [group.text[i] for i in keep]
+                metadatas = [group.full_metadata(i) for i in keep]
+                if reuse and group.vector is not None:
+                    self.db.add_embeddings(
+                        zip(texts, group.vector[keep]), metadatas=metadatas, ids=ids
+                    )
+                else:
+                    await self.db.aadd_texts(texts, metadatas=metadatas, ids=ids)
+                imported += len(ids)
+        if imported:
+            await asyncio.to_thread(self._save_db)  # persist once
+        return imported, reuse
+
+    async def _delete_ids(self, ids: list[str]):
+        if not isinstance(self.db.docstore, DiskDocstore):
+            await self.db.adelete(ids=ids)
             self._save_db()  # persist
-        return rem_docs
+            return
+
+        # tombstone only, persisted right away, vectors are removed by compaction later
+        self.db.docstore.add_tombstones(ids)
+        self.db.tombstone(ids)
+        Memory._compact_if_needed(self.db, self.memory_subdir)
+
+    @staticmethod
+    def _compact_if_needed(db: MyFaiss, memory_subdir: str):
+        if (
+            db.tombstone_ratio() < Memory.COMPACT_TOMBSTONE_RATIO
+            or memory_subdir in Memory.compacting
+        ):
+            return
+        thread = threading.Thread(
+            target=Memory._compact,
+            args=(db, memory_subdir),
+            daemon=True,
+            name=f"MemoryCompaction-{memory_subdir}",
+        )
+        Memory.compacting[memory_subdir] = thread
+        thread.start()
+
+    @staticmethod
+    def _compact(db: MyFaiss, memory_subdir: str):
+        try:
+            ids = db.compact()
+            # index first, docs last, a crash in between only leaves unused docs behind
+            Memory._save_db_file(db, memory_subdir)
+            if isinstance(db.docstore, DiskDocstore):
+                db.docstore.delete(ids)
+            # on failure the ids stay tombstoned and are retried by the next compaction
+            db.release_tombstones(ids)
+            PrintStyle.standard(
+                f"Compacted VectorDB '/{memory_subdir}', removed {len(ids)} memories"
+            )
+        except Exception as e:
+            PrintStyle.error(f"VectorDB compaction failed: {e}")
+        finally:
+            Memory.compacting.pop(memory_subdir, None)
 
     async def insert_text(self, text, metadata: dict = {}):
         doc = Document(text, metadata=metadata)
@@ -378,19 +609,95 @@ class Memory:
     def _save_db(self):
         Memory._save_db_file(self.db, self.memory_subdir)
 
+    @staticmethod
+    def _load_db_file(
+        db_dir: str, embedder: Embeddings, log_item: LogItem | None = None
+    ) -> MyFaiss:
+        index_path = files.get_abs_path(db_dir, "index.faiss")
+
+        # older DBs pickle the whole docstore, move it to the disk docstore once
+        if not DiskDocstore.exists(db_dir) or not files.exists(db_dir, "index_ids.json"):
+            PrintStyle.standard("Migrating VectorDB docstore...")
+            if log_item:
+                log_item.stream(progress="\nMigrating VectorDB docstore")
+            db = MyFaiss.load_local(
+                folder_path=db_dir,
+                embeddings=embedder,
+                allow_dangerous_deserialization=True,
+                distance_strategy=DistanceStrategy.COSINE,
+                # normalize_L2=True,
+                relevance_score_fn=Memory._cosine_normalizer,
+            )  # type: ignore
+            docstore = DiskDocstore(db_dir)
+            docstore.clear()
+            docstore.add(db.get_all_docs())
+            db.set_docstore(docstore)
+            Memory._save_db_index(db, db_dir)
+            pkl_path = files.get_abs_path(db_dir, "index.pkl")
+            if os.path.exists(pkl_path):
+                os.remove(pkl_path)
+            return db
+
+        # vectors are memory-mapped read-only, documents are read by id on demand
+        try:
+            flags = faiss.IO_FLAG_READ_ONLY | getattr(
+                faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP
+            )
+            index = faiss.read_index(index_path, flags)
+            mmap_path = index_path
+        except RuntimeError:
+            # index type without mmap support
+            index = faiss.read_index(index_path)
+            mmap_path = None
+
+        ids = json.loads(files.read_file(files.get_abs_path(db_dir, "index_ids.json")))
+        docstore = DiskDocstore(db_dir)
+        db = MyFaiss(
+            embedding_function=embedder,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.COSINE,
+            # normalize_L2=True,
+            relevance_score_fn=Memory._cosine_normalizer,
+        )
+        db.mmap_path = mmap_path
+        db.tombstones = docstore.get_tombstones()
+        return db
+
     @staticmethod
     def _save_db_file(db: MyFaiss, memory_subdir: str):
         abs_dir = Memory._abs_db_dir(memory_subdir)
-        db.save_local(folder_path=abs_dir)
+        if isinstance(db.docstore, DiskDocstore):
+            # documents are already persisted by the docstore
+            Memory._save_db_index(db, abs_dir)
+        else:
+            db.save_local(folder_path=abs_dir)
 
     @staticmethod
-    def _get_comparator(condition: str):
+    def _save_db_index(db: MyFaiss, abs_dir: str):
+        # still mapped means unchanged, never write over the mapped file
+        if db.mmap_path:
+            return
+        index_path = files.get_abs_path(abs_dir, "index.faiss")
+        # compaction saves from a background thread
+        with db._lock:
+            faiss.write_index(db.index, index_path + ".tmp")
+            os.replace(index_path + ".tmp", index_path)
+            ids = [db.index_to_docstore_id[i] for i in range(len(db.index_to_docstore_id))]
+            files.write_file(
+                files.get_abs_path(abs_dir, "index_ids.json"), json.dumps(ids)
+            )
+
+    @staticmethod
+    def _get_comparator(condition: str, log_errors: bool = True):
         def comparator(data: dict[str, Any]):
             try:
                 result = simple_eval(condition, names=data)
                 return result
             except Exception as e:
-                PrintStyle.error(f"Error evaluating condition: {e}")
+                if log_errors:
+                    PrintStyle.error(f"Error evaluating condition: {e}")
                 return False
 
         return comparator
@@ -408,6 +715,14 @@ class Memory:
         )  # float precision can cause values like 1.0000000596046448
         return res
 
+    @staticmethod
+    def _embedding_model_id(memory_subdir: str) -> str:
+        emb_set_file = files.get_abs_path(Memory._abs_db_dir(memory_subdir), "embedding.json")
+        if not files.exists(emb_set_file):
+            return ""
+        embedding_set = json.loads(files.read_file(emb_set_file))
+        return f"{embedding_set['model_provider']}/{embedding_set['model_name']}"
+
     @staticmethod
     def _abs_db_dir(memory_subdir: str) -> str:
         return files.get_abs_path("memory", memory_subdir)
@@ -428,6 +743,50 @@ class Memory:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+class RemoteMemory:
+    """Memory of a task worker process, calls run in the main process.
+    Two processes writing the same index and docstore would lose each other's memories."""
+
+    # methods of Memory that may be called remotely
+    METHODS = (
+        "search_similarity_threshold",
+        "delete_documents_by_query",
+        "delete_documents_by_ids",
+        "delete_documents_by_filter",
+        "update_documents_by_filter",
+        "get_documents_by_ids",
+        "insert_text",
+        "insert_documents",
+    )
+
+    def __init__(self, call: Callable[[str, tuple, dict], Awaitable[Any]]):
+        self._call = call
+
+    async def search_similarity_threshold(self, *args, **kwargs) -> list[Document]:
+        return await self._call("search_similarity_threshold", args, kwargs)
+
+    async def delete_documents_by_query(self, *args, **kwargs) -> list[Document]:
+        return await self._call("delete_documents_by_query", args, kwargs)
+
+    async def delete_documents_by_ids(self, *args, **kwargs) -> list[Document]:
+        return await self._call("delete_documents_by_ids", args, kwargs)
+
+    async def delete_documents_by_filter(self, *args, **kwargs) -> int:
+        return await self._call("delete_documents_by_filter", args, kwargs)
+
+    async def update_documents_by_filter(self, *args, **kwargs) -> int:
+        return await self._call("update_documents_by_filter", args, kwargs)
+
+    async def get_documents_by_ids(self, *args, **kwargs) -> list[Document]:
+        return await self._call("get_documents_by_ids", args, kwargs)
+
+    async def insert_text(self, *args, **kwargs) -> str:
+        return await self._call("insert_text", args, kwargs)
+
+    async def insert_documents(self, *args, **kwargs) -> list[str]:
+        return await self._call("insert_documents", args, kwargs)
+
+
 def get_memory_subdir_abs(agent: Agent) -> str:
     return files.get_abs_path("memory", agent.config.memory_subdir or "default")
 
@@ -441,4 +800,10 @@ def get_custom_knowledge_subdir_abs(agent: Agent) -> str:
 
 def reload():
     # clear the memory index, this will force all DBs to reload
+    # running compactions finish first, they write the files the new instances read.
+    # dbs are left open for Memory wrappers still in use, closed when collected
+    for compaction in list(Memory.compacting.values()):
+        compaction.join()
     Memory.index = {}
+    Memory.last_used = {}
+    Memory.preloaded = set()
@@ -0,0 +1,101 @@
+import json
+import struct
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Iterator
+
+import numpy as np
+
+# Columnar memory export format, written and read one row group at a time:
+#   magic | u32 version | u32 header length | header json
+#   row groups: u32 row count | per column: u64 length + zlib(json list)
+#               | u64 length + float32 vectors (rows x dim)
+#   u32 0 as end marker
+
+MAGIC = b"A0MEMCOL"
+VERSION = 1
+ROW_GROUP_SIZE = 10_000
+COLUMNS = ("id", "area", "timestamp", "metadata", "text")
+
+
+@dataclass
+class RowGroup:
+    id: list[str] = field(default_factory=list)
+    area: list[str] = field(default_factory=list)
+    timestamp: list[str] = field(default_factory=list)
+    metadata: list[dict[str, Any]] = field(default_factory=list)
+    text: list[str] = field(default_factory=list)
+    vector: np.ndarray | None = None
+
+    def __len__(self):
+        return len(self.id)
+
+    def full_metadata(self, i: int) -> dict[str, Any]:
+        return {
+            **self.metadata[i],
+            "id": self.id[i],
+            "area": self.area[i],
+            "timestamp": self.timestamp[i],
+        }
+
+
+class ColumnarWriter:
+    def __init__(self, file: BinaryIO, embedding_model: str, dim: int):
+        self.file = file
+        self.dim = dim
+        self.rows = 0
+        header = json.dumps(
+            {"embedding_model": embedding_model, "dim": dim, "columns": COLUMNS}
+        ).encode("utf-8")
+        file.write(MAGIC + struct.pack("<II", VERSION, len(header)) + header)
+
+    def write(self, group: RowGroup):
+        if not len(group):
+            return
+        vectors = np.ascontiguousarray(group.vector, dtype=np.float32)
+        if vectors.shape != (len(group), self.dim):
+            raise ValueError(
+                f"Expected vectors of shape {(len(group), self.dim)}, got {vectors.shape}"
+            )
+        self.file.write(struct.pack("<I", len(group)))
+        for column in COLUMNS:
+            data = zlib.compress(
+                json.dumps(getattr(group, column), default=str).encode("utf-8")
+            )
+            self.file.write(struct.pack("<Q", len(data)) + data)
+        data = vectors.tobytes()
+        self.file.write(struct.pack("<Q", len(data)) + data)
+        self.rows += len(group)
+
+    def close(self):
+        self.file.write(struct.pack("<I", 0))
+
+
+class ColumnarReader:
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a memory export file")
+        version, header_len = struct.unpack("<II", file.read(8))
+        if version > VERSION:
+            raise ValueError(f"Unsupported memory export version {version}")
+        header = json.loads(file.read(header_len))
+        self.embedding_model: str = header["embedding_model"]
+        self.dim: int = header["dim"]
+
+    def __iter__(self) -> Iterator[RowGroup]:
+        while True:
+            (rows,) = struct.unpack("<I", self.file.read(4))
+            if not rows:
+                return
+            group = RowGroup()
+            for column in COLUMNS:
+                (length,) = struct.unpack("<Q", self.file.read(8))
+                setattr(
+                    group, column, json.loads(zlib.decompress(self.file.read(length)))
+                )
+            (length,) = struct.unpack("<Q", self.file.read(8))
+            group.vector = np.frombuffer(
+                self.file.read(length), dtype=np.float32
+            ).reshape(rows, self.dim)
+            yield group
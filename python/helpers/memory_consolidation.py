@@ -163,7 +163,7 @@ class MemoryConsolidator:
             # Filter out None values and ensure all IDs are strings
             memory_ids_to_check = [str(id) for id in memory_ids_to_check if id is not None]
             db = await Memory.get(self.agent)
-            still_existing = db.db.get_by_ids(memory_ids_to_check)
+            still_existing = await db.get_documents_by_ids(memory_ids_to_check)
             existing_ids = {doc.metadata.get('id') for doc in still_existing}
 
             # Filter out deleted memories
@@ -297,7 +297,7 @@ class MemoryConsolidator:
 
             # Retrieve original memories to extract their metadata
             if memory_ids:
-                original_memories = await db.db.aget_by_ids(memory_ids)
+                original_memories = await db.get_documents_by_ids(memory_ids)
 
                 # Merge ALL metadata fields from original memories
                 for memory in original_memories:
@@ -346,7 +346,8 @@ class MemoryConsolidator:
             query=new_memory,
             limit=self.config.max_similar_memories,
             threshold=self.config.similarity_threshold,
-            filter=f"area == '{area}'"
+            filter=f"area == '{area}'",
+            hybrid=False,
         )
         all_similar.extend(semantic_similar)
 
@@ -359,7 +360,8 @@ class MemoryConsolidator:
                     query=query.strip(),
                     limit=max(3, self.config.max_similar_memories // queries_count),
                     threshold=self.config.similarity_threshold,
-                    filter=f"area == '{area}'"
+                    filter=f"area == '{area}'",
+                    hybrid=False,
                 )
                 all_similar.extend(keyword_similar)
 
@@ -647,7 +649,7 @@ class MemoryConsolidator:
         # Step 1: Validate similarity scores for replacement safety
         if result.memories_to_remove:
             # Get the memories to be removed and check their similarity scores
-            memories_to_check = await db.db.aget_by_ids(result.memories_to_remove)
+            memories_to_check = await db.get_documents_by_ids(result.memories_to_remove)
 
             unsafe_replacements = []
             for memory in memories_to_check:
@@ -732,7 +734,7 @@ class MemoryConsolidator:
 
             if memory_id and new_content:
                 # Validate that the memory exists before attempting to delete it
-                existing_docs = await db.db.aget_by_ids([memory_id])
+                existing_docs = await db.get_documents_by_ids([memory_id])
                 if not existing_docs:
                     PrintStyle().warning(f"Memory ID {memory_id} not found during update, skipping")
                     continue
@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator
+
+# this module is imported by worker processes, keep its imports light
+
+# pages extracted per worker call, also the unit yielded to the caller
+PAGE_BATCH_SIZE = 8
+# max. parallel extraction workers
+MAX_WORKERS = 4
+# resolution used to render pages without a text layer for OCR
+OCR_DPI = 200
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+        # never fork the threaded web server, a child could inherit locks held by other
+        # threads. forkserver forks workers from a clean single threaded process, spawn
+        # (available everywhere) starts them fresh. Workers are kept, their startup is paid once.
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        _executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(method)
+        )
+    return _executor
+
+
+def page_count(path: str) -> int:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def extract_pages(path: str, start: int, end: int) -> str:
+    # text layer and markdown tables per page, OCR only for pages without text
+    import fitz
+
+    pages = []
+    with fitz.open(path) as doc:
+        for i in range(start, min(end, doc.page_count)):
+            page = doc[i]
+            text = page.get_text()
+            try:
+                for table in page.find_tables().tables:
+                    text += "\n" + table.to_markdown()
+            except Exception:
+                pass  # table detection is best effort
+            if not text.strip():
+                text = _ocr_page(page)
+            pages.append(text)
+    return "\n".join(pages)
+
+
+def _ocr_page(page) -> str:
+    import pytesseract
+    from PIL import Image
+
+    pix = page.get_pixmap(dpi=OCR_DPI)
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    return pytesseract.image_to_string(image)
+
+
+def ocr_page_count(path: str) -> int:
+    import pdf2image
+
+    return int(pdf2image.pdfinfo_from_path(path)["Pages"])
+
+
+def ocr_pages(path: str, start: int, end: int) -> str:
+    # fallback for PDFs PyMuPDF can not open, rasterized by poppler
+    import pdf2image
+    import pytesseract
+
+    images = pdf2image.convert_from_path(path, first_page=start + 1, last_page=end)  # type: ignore
+    return "\n\n".join(pytesseract.image_to_string(image) for image in images)
+
+
+async def iter_pdf_pages(
+    path: str, batch_size: int = PAGE_BATCH_SIZE, ocr_fallback: bool = False
+) -> AsyncIterator[str]:
+    """Extract a PDF in page batches on the worker pool, yielding them in page order
+    as they finish. Only a few batches are in flight, so memory is bounded by the
+    batch size rather than the document size."""
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    count_fn, extract_fn = (
+        (ocr_page_count, ocr_pages) if ocr_fallback else (page_count, extract_pages)
+    )
+
+    total = await loop.run_in_executor(executor, count_fn, path)
+    batches = [(i, min(i + batch_size, total)) for i in range(0, total, batch_size)]
+    max_in_flight = MAX_WORKERS * 2
+    pending: list[asyncio.Future[str]] = []
+
+    try:
+        for start, end in batches:
+            pending.append(
+                loop.run_in_executor(executor, extract_fn, path, start, end)
+            )
+            if len(pending) >= max_in_flight:
+                yield await pending.pop(0)
+        while pending:
+            yield await pending.pop(0)
+    finally:
+        for future in pending:
+            future.cancel()
@@ -1,17 +1,70 @@
 from collections import OrderedDict
 from datetime import datetime
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterator
+import gzip
+import io
+import os
+import threading
+import time
 import uuid
-from agent import Agent, AgentConfig, AgentContext, AgentContextType
-from python.helpers import files, history
+import weakref
+import zlib
+from agent import Agent, AgentConfig, AgentContext, AgentContextType, drop_document_store
+from python.helpers import chat_codec, chat_journal, chat_search, files, history, settings
 import json
 from initialize import initialize_agent
 
+from python.helpers.localization import Localization
 from python.helpers.log import Log, LogItem
 
 CHATS_FOLDER = "tmp/chats"
 LOG_SIZE = 1000
 CHAT_FILE_NAME = "chat.json"
+# binary snapshot, chat.json of earlier versions is read and replaced by it, see chat_codec
+CHAT_BINARY_FILE_NAME = "chat.bin"
+# small per chat index entry, lets the chat list render without loading chats
+CHAT_META_FILE_NAME = "meta.json"
+# streamed chat exports, gzip compressed JSON lines:
+#   {"format": EXPORT_FORMAT, "version": n, "context": {...}}   id and context fields
+#   {"agent": {...}}                                           one line per agent
+#   {"log": {...}}                                             log guid and progress
+#   {"log_item": {...}}                                        one line per log item
+EXPORT_FORMAT = "agent-zero-chat"
+EXPORT_VERSION = 1
+EXPORT_CHUNK_SIZE = 64 * 1024
+# unloaded chats are restored on next access, limits are in settings:
+#   chat_idle_timeout minutes without access, chat_memory_max_chats, chat_memory_max_mb
+# chats used within this many seconds are never unloaded
+CHAT_EVICT_MIN_IDLE = 60
+# history size estimate for the memory limit
+APPROX_BYTES_PER_TOKEN = 4
+
+# journal state of chats saved by this process, by context id
+_journals: dict[str, "_ChatJournal"] = {}
+_journals_lock = threading.RLock()
+# index entries of saved chats not loaded in memory, by context id
+_unloaded: dict[str, dict[str, Any]] = {}
+# counters since start, see get_memory_stats
+_memory_stats: dict[str, Any] = {
+    "evictions": 0,
+    "evictions_idle": 0,
+    "evictions_count": 0,
+    "evictions_size": 0,
+    "evicted_bytes": 0,
+    "reloads": 0,
+    "reload_ms": 0.0,
+}
+# set in task worker processes, their saves go to the process owning the chat files
+_save_handler: Callable[[AgentContext], None] | None = None
+# chats are indexed for search when saved, chat folders are compared with the index
+# once after load_tmp_chats, chats that could not be read are not tried again
+_search_synced = False
+_search_failed: set[str] = set()
+_search_lock = threading.Lock()
+# last size estimate per loaded context with the state it was made for
+_size_estimates: "weakref.WeakKeyDictionary[AgentContext, tuple[tuple, int]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 def get_chat_folder_path(ctxid: str):
@@ -28,16 +81,142 @@ def get_chat_folder_path(ctxid: str):
 
 
 def save_tmp_chat(context: AgentContext):
-    """Save context to the chats folder"""
+    """Save context to the chats folder, appending only what changed since the last save"""
     # Skip saving BACKGROUND contexts as they should be ephemeral
     if context.type == AgentContextType.BACKGROUND:
         return
+    if _save_handler:
+        _save_handler(context)
+        return
 
-    path = _get_chat_file_path(context.id)
+    with _journals_lock:
+        journal = _journals.get(context.id)
+        if journal is None or not journal.is_for(context):
+            _save_snapshot(context)
+            return
+
+        journal_path = _get_journal_file_path(context.id)
+        if not os.path.exists(journal_path):
+            _save_snapshot(context)
+            return
+
+        meta = journal.meta
+        records = journal.diff(context)
+        journal.size += chat_journal.append(journal_path, records, binary=True)
+        for record in records:
+            if record["op"] == "log":
+                _index_chat_log(context.id, record["guid"], record["items"])
+        if chat_journal.should_compact(journal.size, journal.snapshot_size):
+            _save_snapshot(context)
+        elif journal.meta != meta:
+            _write_chat_meta(context)
+
+
+def _save_snapshot(context: AgentContext):
+    # full rewrite of the snapshot, starts a new empty journal
+    journal = _ChatJournal(context)
+    # binary snapshots keep histories as objects, so loading parses them only once
+    data = _serialize_context(context, native_history=True)
+    data["journal"] = journal.snapshot_id
+    path = _get_chat_binary_file_path(context.id)
+    content = chat_codec.encode(data)
     files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    with open(path + ".tmp", "wb") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+    chat_journal.start_journal(
+        _get_journal_file_path(context.id), journal.snapshot_id, binary=True
+    )
+    if os.path.exists(_get_chat_file_path(context.id)):
+        os.remove(_get_chat_file_path(context.id))  # migrated from chat.json
+    journal.snapshot_size = len(content)
+    _journals[context.id] = journal
+    _write_chat_meta(context)
+    # items cut off at LOG_SIZE are dropped from the index as well
+    _index_chat_log(context.id, data["log"]["guid"], data["log"]["logs"], full=True)
+
+
+def _index_chat_log(
+    ctxid: str, guid: str, items: list[dict[str, Any]], full: bool = False
+) -> bool:
+    # the search index is derived from the chat files, failing to update it never fails a save
+    try:
+        chat_search.get().update(ctxid, guid, items, full)
+    except Exception as e:
+        print(f"Error indexing chat {ctxid}: {e}")
+        return False
+    _search_failed.discard(ctxid)
+    return True
+
+
+def search_chats(query: str, limit: int = chat_search.SEARCH_LIMIT, ctxid: str = ""):
+    """Full-text search over the logs of all saved chats"""
+    index = chat_search.get()
+    _sync_search_index(index)
+    return index.search(query, limit, ctxid)
+
+
+def _sync_search_index(index: chat_search.ChatSearchIndex):
+    # chats saved before the index existed or restored from a backup are read once,
+    # deleted ones dropped. Later changes are indexed by saves and remove_chat.
+    global _search_synced
+    with _search_lock:
+        if _search_synced:
+            return
+        folders = set(files.list_files(CHATS_FOLDER, "*"))
+        indexed = index.indexed_ids()
+        for missing in folders - indexed - _search_failed:
+            try:
+                log = _read_chat_data(missing)["log"]
+            except Exception as e:
+                print(f"Error indexing chat {missing}: {e}")
+                _search_failed.add(missing)
+                continue
+            if not _index_chat_log(missing, log["guid"], log["logs"], full=True):
+                _search_failed.add(missing)
+        for removed in indexed - folders:
+            index.remove(removed)
+        _search_synced = True
+
+
+def set_save_handler(handler: Callable[[AgentContext], None] | None):
+    """Send saves of this process elsewhere instead of writing chat files"""
+    global _save_handler
+    _save_handler = handler
+
+
+def get_chat_state(context: AgentContext) -> dict[str, Any]:
+    """Agents and metadata of a context without its log, see update_chat"""
+    data = _serialize_context(context, native_history=True)
+    del data["log"]
+    return data
+
+
+def update_chat(context: AgentContext, data: dict[str, Any]):
+    """Apply agents saved by another process to a loaded context and save it"""
+    with _journals_lock:
+        context.name = data.get("name", context.name)
+        if data.get("last_message"):
+            context.last_message = datetime.fromisoformat(data["last_message"])
+        _set_agents(context, data.get("agents", []), data.get("streaming_agent", 0))
+        save_tmp_chat(context)
+
+
+def _write_chat_meta(context: AgentContext):
+    path = _get_chat_meta_file_path(context.id)
+    files.write_file(path + ".tmp", json.dumps(_get_chat_meta(context)))
+    os.replace(path + ".tmp", path)
+
+
+def _get_chat_meta(context: AgentContext) -> dict[str, Any]:
+    meta = _serialize_context_meta(context)
+    return {
+        "id": context.id,
+        "name": meta["name"],
+        "created_at": meta["created_at"],
+        "last_message": meta["last_message"],
+        "type": meta["type"],
+    }
 
 
 def save_tmp_chats():
@@ -50,29 +229,282 @@ def save_tmp_chats():
 
 
 def load_tmp_chats():
-    """Load all contexts from the chats folder"""
+    """Index all contexts in the chats folder, each one is loaded on first access"""
+    global _search_synced
     _convert_v080_chats()
+    _search_synced = False  # the folders may have been replaced by a restore
     folders = files.list_files(CHATS_FOLDER, "*")
-    json_files = []
-    for folder_name in folders:
-        json_files.append(_get_chat_file_path(folder_name))
 
     ctxids = []
-    for file in json_files:
+    for ctxid in folders:
         try:
-            js = files.read_file(file)
-            data = json.loads(js)
-            ctx = _deserialize_context(data)
-            ctxids.append(ctx.id)
+            meta = _read_chat_meta(ctxid)
         except Exception as e:
-            print(f"Error loading chat {file}: {e}")
+            print(f"Error loading chat {ctxid}: {e}")
+            continue
+        with _journals_lock:
+            # chats restored from a backup replace the loaded ones
+            if AgentContext.get(ctxid, load=False):
+                AgentContext.remove(ctxid)
+                _journals.pop(ctxid, None)
+            _unloaded[ctxid] = meta
+        ctxids.append(ctxid)
     return ctxids
 
 
+def read_chat(ctxid: str) -> AgentContext:
+    """Saved context with its journal replayed, e.g. for task workers. Unlike load_chat it is
+    not tracked as a loaded chat of this process"""
+    return _deserialize_context(_read_chat_data(ctxid))
+
+
+def load_chat(ctxid: str) -> AgentContext | None:
+    """Restore a saved context that is not loaded yet"""
+    with _journals_lock:
+        context = AgentContext.get(ctxid, load=False)
+        if context or ctxid not in _unloaded:
+            return context
+        start = time.perf_counter()
+        try:
+            data = _read_chat_data(ctxid)
+            context = _deserialize_context(data)
+        except Exception as e:
+            print(f"Error loading chat {ctxid}: {e}")
+            return None
+        del _unloaded[ctxid]
+        logs = data["log"]["logs"]
+        if logs and logs[0].get("no", 0) != 0:
+            # a log saved past LOG_SIZE is numbered from 0 again, indexed items move with it
+            _index_chat_log(
+                ctxid, context.log.guid, [item.output() for item in context.log.logs], full=True
+            )
+        if not os.path.exists(_get_chat_binary_file_path(ctxid)):
+            _save_snapshot(context)  # migrate chat.json to the binary format
+        _memory_stats["reloads"] += 1
+        _memory_stats["reload_ms"] += (time.perf_counter() - start) * 1000
+        return context
+
+
+async def unload_chat(context: AgentContext):
+    """Save a context and free its memory, it is restored on next access"""
+    with _journals_lock:
+        save_tmp_chat(context)
+        AgentContext.remove(context.id)
+        _journals.pop(context.id, None)
+        drop_document_store(context.id)
+        meta = _get_chat_meta(context)
+        meta["size"] = _get_chat_size(context.id)
+        _unloaded[context.id] = meta
+    await _close_sessions(context)
+
+
+async def unload_idle_chats(
+    timeout: float | None = None,
+    max_chats: int | None = None,
+    max_bytes: int | None = None,
+) -> list[str]:
+    """Unload least recently used contexts that are idle or over the count and size limits, never running ones"""
+    limits = _get_memory_limits()
+    timeout = limits["idle_timeout"] if timeout is None else timeout
+    max_chats = limits["max_chats"] if max_chats is None else max_chats
+    max_bytes = limits["max_bytes"] if max_bytes is None else max_bytes
+
+    now = time.time()
+    loaded = [c for c in AgentContext.all() if c.type != AgentContextType.BACKGROUND]
+    sizes = {c.id: _estimate_context_size(c) for c in loaded}
+    count = len(loaded)
+    total = sum(sizes.values())
+
+    unloaded = []
+    for context in sorted(loaded, key=lambda c: c.last_access):
+        idle = now - context.last_access
+        if idle < CHAT_EVICT_MIN_IDLE:
+            break  # the rest was used even more recently
+        if timeout and idle >= timeout:
+            reason = "idle"
+        elif max_chats and count > max_chats:
+            reason = "count"
+        elif max_bytes and total > max_bytes:
+            reason = "size"
+        else:
+            break
+        if context.task and context.task.is_alive():
+            continue
+        await unload_chat(context)
+        unloaded.append(context.id)
+        count -= 1
+        total -= sizes[context.id]
+        _memory_stats["evictions"] += 1
+        _memory_stats[f"evictions_{reason}"] += 1
+        _memory_stats["evicted_bytes"] += sizes[context.id]
+    return unloaded
+
+
+def get_memory_stats() -> dict[str, Any]:
+    """Loaded chats against the eviction limits, and evictions and reloads since start"""
+    loaded = [c for c in AgentContext.all() if c.type != AgentContextType.BACKGROUND]
+    stats = dict(_memory_stats)
+    stats["reload_avg_ms"] = (
+        round(stats["reload_ms"] / stats["reloads"], 2) if stats["reloads"] else 0.0
+    )
+    stats["reload_ms"] = round(stats["reload_ms"], 2)
+    with _journals_lock:
+        unloaded = len(_unloaded)
+    return {
+        "loaded": len(loaded),
+        "loaded_bytes": sum(_estimate_context_size(c) for c in loaded),
+        "unloaded": unloaded,
+        **_get_memory_limits(),
+        **stats,
+    }
+
+
+def _get_memory_limits() -> dict[str, Any]:
+    set = settings.get_settings()
+    return {
+        "idle_timeout": set["chat_idle_timeout"] * 60,
+        "max_chats": set["chat_memory_max_chats"],
+        "max_bytes": set["chat_memory_max_mb"] * 1024 * 1024,
+    }
+
+
+def _estimate_context_size(context: AgentContext) -> int:
+    # rough footprint of what unloading frees, history tokens and log text,
+    # recomputed only for chats whose log or histories changed since the last estimate
+    agents = _get_agents(context)
+    key = (
+        context.log.guid,
+        context.log.version,
+        tuple(_history_state(agent.history) for agent in agents),
+    )
+    cached = _size_estimates.get(context)
+    if cached and cached[0] == key:
+        return cached[1]
+    size = sum(
+        agent.history.get_tokens() * APPROX_BYTES_PER_TOKEN
+        for agent in agents
+    )
+    for item in context.log.logs:
+        size += len(item.heading or "") + len(item.content or "")
+    _size_estimates[context] = (key, size)
+    return size
+
+
+def _history_state(hist: history.History) -> tuple:
+    # changes with added messages, new topics and compression
+    return (
+        id(hist),
+        len(hist.bulks),
+        len(hist.topics),
+        id(hist.current),
+        len(hist.current.messages),
+    )
+
+
+async def _close_sessions(context: AgentContext):
+    # terminal sessions of code_execution_tool are not saved, end their processes
+    for agent in _get_agents(context):
+        state = agent.get_data("_cet_state")
+        if not state:
+            continue
+        for shell in state.shells.values():
+            try:
+                await shell.close()
+            except Exception as e:
+                print(f"Error closing shell of chat {context.id}: {e}")
+
+
+def get_unloaded_chat_ids() -> list[str]:
+    with _journals_lock:
+        return list(_unloaded.keys())
+
+
+def get_unloaded_chats() -> list[dict[str, Any]]:
+    """Index entries of saved contexts not loaded, shaped like AgentContext.serialize"""
+    with _journals_lock:
+        entries = list(_unloaded.values())
+    localization = Localization.get()
+    return [
+        {
+            "id": meta["id"],
+            "name": meta.get("name"),
+            "created_at": localization.serialize_datetime(
+                datetime.fromisoformat(meta["created_at"])
+            ),
+            "no": 0,
+            "log_guid": "",
+            "log_version": 0,
+            "log_length": 0,
+            "paused": False,
+            "last_message": localization.serialize_datetime(
+                datetime.fromisoformat(meta["last_message"])
+            ),
+            "type": meta.get("type", AgentContextType.USER.value),
+            "size": meta.get("size", 0),
+            "loaded": False,
+        }
+        for meta in entries
+    ]
+
+
+def _read_chat_data(ctxid: str) -> dict[str, Any]:
+    path = _get_chat_binary_file_path(ctxid)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = chat_codec.decode(f.read())
+    else:
+        data = json.loads(files.read_file(_get_chat_file_path(ctxid)))
+    return chat_journal.replay(data, _get_journal_file_path(ctxid), LOG_SIZE)
+
+
+def _read_chat_meta(ctxid: str) -> dict[str, Any]:
+    path = _get_chat_meta_file_path(ctxid)
+    if os.path.exists(path):
+        meta = json.loads(files.read_file(path))
+    else:
+        # chats saved before the index existed are read once
+        data = _read_chat_data(ctxid)
+        epoch = datetime.fromtimestamp(0).isoformat()
+        meta = {
+            "id": ctxid,
+            "name": data.get("name"),
+            "created_at": data.get("created_at", epoch),
+            "last_message": data.get("last_message", epoch),
+            "type": data.get("type", AgentContextType.USER.value),
+        }
+        files.write_file(path, json.dumps(meta))
+    meta["size"] = _get_chat_size(ctxid)
+    return meta
+
+
+def _get_chat_size(ctxid: str) -> int:
+    size = 0
+    for path in (
+        _get_chat_binary_file_path(ctxid),
+        _get_chat_file_path(ctxid),
+        _get_journal_file_path(ctxid),
+    ):
+        if os.path.exists(path):
+            size += os.path.getsize(path)
+    return size
+
+
 def _get_chat_file_path(ctxid: str):
     return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_FILE_NAME)
 
 
+def _get_chat_binary_file_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_BINARY_FILE_NAME)
+
+
+def _get_journal_file_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, chat_journal.JOURNAL_FILE_NAME)
+
+
+def _get_chat_meta_file_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_META_FILE_NAME)
+
+
 def _convert_v080_chats():
     json_files = files.list_files(CHATS_FOLDER, "*.json")
     for file in json_files:
@@ -101,22 +533,70 @@ def export_json_chat(context: AgentContext):
     return js
 
 
+def export_chat_stream(context: AgentContext) -> Iterator[bytes]:
+    """Export context as gzip compressed chunks, serialized one agent and log item at a time"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    buffer = bytearray()
+    for line in _iter_export_lines(context):
+        buffer += compressor.compress((line + "\n").encode("utf-8"))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += compressor.flush()
+    yield bytes(buffer)
+
+
+def import_chat_stream(file: BinaryIO) -> str:
+    """Load a chat from a streamed export or a plain JSON export, returns the new context id"""
+    compressed = file.read(2) == b"\x1f\x8b"
+    file.seek(0)
+    text = io.TextIOWrapper(
+        gzip.GzipFile(fileobj=file) if compressed else file, encoding="utf-8"
+    )
+
+    first_line = text.readline()
+    try:
+        first = json.loads(first_line)
+    except json.JSONDecodeError:
+        first = None  # formatted JSON spanning lines
+    if not isinstance(first, dict) or first.get("format") != EXPORT_FORMAT:
+        # plain JSON export, as written by export_json_chat
+        rest = text.read()
+        data = first if first is not None and not rest.strip() else json.loads(first_line + rest)
+    else:
+        if first.get("version", 0) > EXPORT_VERSION:
+            raise ValueError(f"Unsupported chat export version {first['version']}")
+        data = {**first["context"], "agents": [], "log": {"logs": []}}
+        for line in text:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "agent" in record:
+                data["agents"].append(record["agent"])
+            elif "log" in record:
+                data["log"].update(record["log"])
+            elif "log_item" in record:
+                data["log"]["logs"].append(record["log_item"])
+
+    data.pop("id", None)  # remove id to get new
+    return _deserialize_context(data).id
+
+
 def remove_chat(ctxid):
     """Remove a chat or task context"""
+    with _journals_lock:
+        _journals.pop(ctxid, None)
+        _unloaded.pop(ctxid, None)
     path = get_chat_folder_path(ctxid)
     files.delete_dir(path)
+    try:
+        chat_search.get().remove(ctxid)
+    except Exception as e:
+        print(f"Error removing chat {ctxid} from search index: {e}")
 
 
-def _serialize_context(context: AgentContext):
-    # serialize agents
-    agents = []
-    agent = context.agent0
-    while agent:
-        agents.append(_serialize_agent(agent))
-        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
-
+def _serialize_context_meta(context: AgentContext):
     return {
-        "id": context.id,
         "name": context.name,
         "created_at": (
             context.created_at.isoformat() if context.created_at
@@ -127,18 +607,67 @@ def _serialize_context(context: AgentContext):
             context.last_message.isoformat() if context.last_message
             else datetime.fromtimestamp(0).isoformat()
         ),
-        "agents": agents,
         "streaming_agent": (
             context.streaming_agent.number if context.streaming_agent else 0
         ),
+    }
+
+
+def _get_agents(context: AgentContext) -> list[Agent]:
+    agents = []
+    agent = context.agent0
+    while agent:
+        agents.append(agent)
+        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+    return agents
+
+
+def _serialize_agent_data(agent: Agent):
+    return {k: v for k, v in agent.data.items() if not k.startswith("_")}
+
+
+def _serialize_context(context: AgentContext, native_history: bool = False):
+    return {
+        "id": context.id,
+        **_serialize_context_meta(context),
+        "agents": [
+            _serialize_agent(agent, native_history) for agent in _get_agents(context)
+        ],
         "log": _serialize_log(context.log),
     }
 
 
-def _serialize_agent(agent: Agent):
-    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
+def _iter_export_lines(context: AgentContext) -> Iterator[str]:
+    def line(record):
+        return _safe_json_serialize(record, ensure_ascii=False)
+
+    yield line(
+        {
+            "format": EXPORT_FORMAT,
+            "version": EXPORT_VERSION,
+            "context": {"id": context.id, **_serialize_context_meta(context)},
+        }
+    )
+    for agent in _get_agents(context):
+        yield line({"agent": _serialize_agent(agent)})
+    log = context.log
+    yield line(
+        {
+            "log": {
+                "guid": log.guid,
+                "progress": log.progress,
+                "progress_no": log.progress_no,
+            }
+        }
+    )
+    for item in log.logs[-LOG_SIZE:]:
+        yield line({"log_item": item.output()})
+
+
+def _serialize_agent(agent: Agent, native_history: bool = False):
+    data = _serialize_agent_data(agent)
 
-    history = agent.history.serialize()
+    history = agent.history.to_dict() if native_history else agent.history.serialize()
 
     return {
         "number": agent.number,
@@ -184,17 +713,20 @@ def _deserialize_context(data):
         # streaming_agent=straming_agent,
     )
 
-    agents = data.get("agents", [])
-    agent0 = _deserialize_agents(agents, config, context)
+    _set_agents(context, data.get("agents", []), data.get("streaming_agent", 0))
+
+    return context
+
+
+def _set_agents(context: AgentContext, agents: list[dict[str, Any]], streaming: int):
+    agent0 = _deserialize_agents(agents, context.config, context)
     streaming_agent = agent0
-    while streaming_agent and streaming_agent.number != data.get("streaming_agent", 0):
+    while streaming_agent and streaming_agent.number != streaming:
         streaming_agent = streaming_agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
 
     context.agent0 = agent0
     context.streaming_agent = streaming_agent
 
-    return context
-
 
 def _deserialize_agents(
     agents: list[dict[str, Any]], config: AgentConfig, context: AgentContext
@@ -255,12 +787,162 @@ def _deserialize_log(data: dict[str, Any]) -> "Log":
                 temp=item_data.get("temp", False),
             )
         )
-        log.updates.append(i)
+        log.touch(i)
         i += 1
 
     return log
 
 
+class _ChatJournal:
+    # remembers what was last written for a context, so saves only append what changed
+    # objects are compared by identity and summaries by length, that is enough to detect
+    # appended messages cheaply, anything else rewrites the affected part as a whole
+
+    def __init__(self, context: AgentContext):
+        self.context = weakref.ref(context)
+        self.snapshot_id = chat_journal.new_snapshot_id()
+        self.snapshot_size = 0
+        self.size = 0
+        self.meta: str | None = None
+        self.agents: list[int] | None = None
+        self.agent_data: dict[int, str] = {}
+        self.histories: dict[int, tuple] = {}
+        self.log_guid: str | None = None
+        self.log_version = 0
+        self.log_progress: tuple | None = None
+        self.diff(context)  # the snapshot covers the current state
+
+    def is_for(self, context: AgentContext) -> bool:
+        return self.context() is context
+
+    def diff(self, context: AgentContext) -> list[dict[str, Any]]:
+        records = []
+
+        meta = _serialize_context_meta(context)
+        meta_js = _safe_json_serialize(meta, ensure_ascii=False)
+        if meta_js != self.meta:
+            self.meta = meta_js
+            records.append(_journal_record("context", meta))
+
+        agents = _get_agents(context)
+        numbers = [agent.number for agent in agents]
+        if numbers != self.agents:
+            self.agents = numbers
+            records.append(_journal_record("agents", {"numbers": numbers}))
+
+        for agent in agents:
+            data = _serialize_agent_data(agent)
+            data_js = _safe_json_serialize(data, ensure_ascii=False)
+            if data_js != self.agent_data.get(agent.number):
+                self.agent_data[agent.number] = data_js
+                records.append(
+                    _journal_record("agent_data", {"number": agent.number, "data": data})
+                )
+            records += self._diff_history(agent)
+
+        record = self._diff_log(context.log)
+        if record:
+            records.append(record)
+        return records
+
+    def _diff_history(self, agent: Agent) -> list[dict[str, Any]]:
+        hist = agent.history
+        structure = (
+            hist,
+            tuple((b, len(b.summary), len(b.records)) for b in hist.bulks),
+            tuple((t, len(t.summary), len(t.messages)) for t in hist.topics),
+        )
+        current = (hist.current, len(hist.current.summary))
+        messages = _message_states(hist.current)
+        prev = self.histories.get(agent.number)
+        self.histories[agent.number] = (structure, current, messages)
+        if prev is None:
+            return [self._history_record(agent)]
+
+        prev_structure, prev_current, prev_messages = prev
+        if (structure, current) == (prev_structure, prev_current):
+            record = self._messages_record(agent, prev_messages, messages)
+            return [record] if record else []
+
+        # a user message moves the current topic to topics and starts a new one
+        topic = prev_current[0]
+        if (
+            structure[:2] == prev_structure[:2]
+            and structure[2]
+            == prev_structure[2] + ((topic, prev_current[1], len(topic.messages)),)
+            and not current[1]
+        ):
+            records = []
+            record = self._messages_record(agent, prev_messages, _message_states(topic))
+            if record:
+                records.append(record)
+            records.append(_journal_record("new_topic", {"number": agent.number}))
+            record = self._messages_record(agent, [], messages)
+            if record:
+                records.append(record)
+            return records
+
+        # compression and summaries rewrite the history, it is bounded by the context window
+        return [self._history_record(agent)]
+
+    def _history_record(self, agent: Agent) -> dict[str, Any]:
+        hist = agent.history.to_dict()
+        return _journal_record("history", {"number": agent.number, "history": hist})
+
+    def _messages_record(
+        self, agent: Agent, prev: list[tuple], messages: list[tuple]
+    ) -> dict[str, Any] | None:
+        # from the first message that was changed or added in the current topic
+        start = 0
+        for old, new in zip(prev, messages):
+            if old != new:
+                break
+            start += 1
+        if start == len(messages) == len(prev):
+            return None
+        return _journal_record(
+            "history_append",
+            {
+                "number": agent.number,
+                "start": start,
+                "messages": [m.to_dict() for m, _ in messages[start:]],
+            },
+        )
+
+    def _diff_log(self, log: Log) -> dict[str, Any] | None:
+        reset = log.guid != self.log_guid
+        version = log.version
+        if reset:
+            self.log_guid = log.guid
+            nos = range(max(0, len(log.logs) - LOG_SIZE), len(log.logs))
+        else:
+            nos = log.changed(self.log_version, version)
+        self.log_version = version
+
+        progress = (log.progress, log.progress_no)
+        if not reset and not nos and progress == self.log_progress:
+            return None
+        self.log_progress = progress
+        return _journal_record(
+            "log",
+            {
+                "guid": log.guid,
+                "reset": reset,
+                "items": [log.logs[no].output() for no in nos],
+                "progress": log.progress,
+                "progress_no": log.progress_no,
+            },
+        )
+
+
+def _message_states(topic: history.Topic) -> list[tuple]:
+    return [(m, len(m.summary)) for m in topic.messages]
+
+
+def _journal_record(op: str, data: dict[str, Any]) -> dict[str, Any]:
+    return {"op": op, **data}
+
+
 def _safe_json_serialize(obj, **kwargs):
     def serializer(o):
         if isinstance(o, dict):
@@ -26,6 +26,7 @@ class Settings(TypedDict):
     chat_model_rl_requests: int
     chat_model_rl_input: int
     chat_model_rl_output: int
+    chat_model_stream_fps: int
 
     util_model_provider: str
     util_model_name: str
@@ -57,6 +58,16 @@ class Settings(TypedDict):
     agent_memory_subdir: str
     agent_knowledge_subdir: str
 
+    chat_idle_timeout: int
+    chat_memory_max_chats: int
+    chat_memory_max_mb: int
+
+    scheduler_max_workers: int
+    scheduler_isolation: bool
+    scheduler_task_memory_mb: int
+    scheduler_task_cpu_seconds: int
+    scheduler_worker_max_runs: int
+
     memory_recall_enabled: bool
     memory_recall_delayed: bool
     memory_recall_interval: int
@@ -253,6 +264,16 @@ def convert_out(settings: Settings) -> SettingsOutput:
         }
     )
 
+    chat_model_fields.append(
+        {
+            "id": "chat_model_stream_fps",
+            "title": "Stream updates per second",
+            "description": "Limits how often the streamed response is parsed and pushed to the UI. Lower values save CPU on long responses. Set to 0 to update on every chunk.",
+            "type": "number",
+            "value": settings["chat_model_stream_fps"],
+        }
+    )
+
     chat_model_fields.append(
         {
             "id": "chat_model_kwargs",
@@ -612,6 +633,86 @@ def convert_out(settings: Settings) -> SettingsOutput:
         }
     )
 
+    agent_fields.append(
+        {
+            "id": "chat_idle_timeout",
+            "title": "Unload idle chats after (minutes)",
+            "description": "Chats not opened for this long are saved and unloaded from memory, they are restored when opened again. Running chats are never unloaded. 0 disables the timeout.",
+            "type": "number",
+            "value": settings["chat_idle_timeout"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "chat_memory_max_chats",
+            "title": "Max chats in memory",
+            "description": "Least recently used chats are unloaded when more chats are loaded. 0 means no limit.",
+            "type": "number",
+            "value": settings["chat_memory_max_chats"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "chat_memory_max_mb",
+            "title": "Max chat memory (MB)",
+            "description": "Least recently used chats are unloaded when the estimated size of loaded chats is larger. 0 means no limit.",
+            "type": "number",
+            "value": settings["chat_memory_max_mb"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "scheduler_max_workers",
+            "title": "Max concurrent scheduled tasks",
+            "description": "Scheduled tasks due while this many are running wait in a queue, tasks with higher priority start first.",
+            "type": "number",
+            "value": settings["scheduler_max_workers"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "scheduler_isolation",
+            "title": "Run scheduled tasks in worker processes",
+            "description": "Scheduled tasks run in separate processes, so a runaway task cannot slow down chats. Workers start with the settings they were created with.",
+            "type": "switch",
+            "value": settings["scheduler_isolation"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "scheduler_task_memory_mb",
+            "title": "Task worker memory limit (MB)",
+            "description": "Resident memory a task worker process may use during a run before it is killed, 0 for no limit.",
+            "type": "number",
+            "value": settings["scheduler_task_memory_mb"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "scheduler_task_cpu_seconds",
+            "title": "Task worker CPU time limit (seconds)",
+            "description": "CPU time a task may use in its worker process before the worker is killed, 0 for no limit. Not enforced on Windows.",
+            "type": "number",
+            "value": settings["scheduler_task_cpu_seconds"],
+        }
+    )
+
+    agent_fields.append(
+        {
+            "id": "scheduler_worker_max_runs",
+            "title": "Task worker runs before restart",
+            "description": "Task worker processes are replaced with fresh ones after this many runs, 0 to keep them.",
+            "type": "number",
+            "value": settings["scheduler_worker_max_runs"],
+        }
+    )
+
     agent_section: SettingsSection = {
         "id": "agent",
         "title": "Agent Config",
@@ -1342,6 +1443,7 @@ def get_default_settings() -> Settings:
         chat_model_rl_requests=0,
         chat_model_rl_input=0,
         chat_model_rl_output=0,
+        chat_model_stream_fps=10,
         util_model_provider="openrouter",
         util_model_name="openai/gpt-4.1-mini",
         util_model_api_base="",
@@ -1386,6 +1488,14 @@ def get_default_settings() -> Settings:
         agent_profile="agent0",
         agent_memory_subdir="default",
         agent_knowledge_subdir="custom",
+        chat_idle_timeout=30,
+        chat_memory_max_chats=50,
+        chat_memory_max_mb=512,
+        scheduler_max_workers=4,
+        scheduler_isolation=False,
+        scheduler_task_memory_mb=4096,
+        scheduler_task_cpu_seconds=1800,
+        scheduler_worker_max_runs=20,
         rfc_auto_docker=True,
         rfc_url="localhost",
         rfc_password="",
@@ -0,0 +1,48 @@
+import threading
+import time
+import weakref
+
+# Process wide change counter for the web UI.
+# Anything the UI shows (logs, contexts, tasks, notifications) calls notify() when it changes,
+# /poll answers unchanged state with not_modified and caches its lists per version,
+# stream handlers block in wait() on one shared condition, so idle clients cost no work.
+# Changes of one chat's log pass the log as source, they only wake streams of that chat
+# in wait_for(), everything else (lists, tasks, notifications) wakes all of them.
+
+# starts from the clock, so versions clients saw before a restart are never reused
+_seq: int = int(time.time() * 1000)
+_shared_seq: int = _seq
+# seq of the last change per source
+_source_seqs: "weakref.WeakKeyDictionary[object, int]" = weakref.WeakKeyDictionary()
+_cond = threading.Condition()
+
+
+def notify(source: object | None = None):
+    global _seq, _shared_seq
+    with _cond:
+        _seq += 1
+        if source is None:
+            _shared_seq = _seq
+        else:
+            _source_seqs[source] = _seq
+        _cond.notify_all()
+
+
+def get_seq() -> int:
+    return _seq
+
+
+def wait(seq: int, timeout: float | None = None) -> int:
+    # blocks until something changed after seq or timeout, returns the current seq
+    with _cond:
+        _cond.wait_for(lambda: _seq != seq, timeout)
+        return _seq
+
+
+def wait_for(seq: int, source: object, timeout: float | None = None) -> bool:
+    # blocks until a shared change or a change of source after seq, or timeout,
+    # returns whether there was one. Changes of other sources only recheck the condition.
+    with _cond:
+        return _cond.wait_for(
+            lambda: _shared_seq > seq or _source_seqs.get(source, 0) > seq, timeout
+        )
@@ -0,0 +1,305 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+from flask import Request, Response, send_file
+from werkzeug.exceptions import NotFound
+
+import brotli
+
+from python.helpers import files
+from python.helpers.print_style import PrintStyle
+
+# Web UI static files with content hash URLs and precompressed copies.
+#   /js/api.<hash>.js       hashed name, cached by browsers for good
+#   /vendor/x.js?v=<hash>   vendor libraries find their other files from their own
+#                           script name (ace), they keep it and are versioned by query
+#   /js/api.js              plain name, revalidated with the ETag on every use
+# index.html references hashed URLs and maps module imports to them with an import map,
+# so a module is never loaded twice under two URLs.
+
+WEBUI_FOLDER = "webui"
+# compressed copies by content hash, reused across restarts
+CACHE_FOLDER = "tmp/static"
+HASH_LENGTH = 12
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".txt", ".map", ".ttf"}
+# smaller files gain less than the header overhead
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# generated pages are compressed per request, faster levels
+HTML_GZIP_LEVEL = 6
+HTML_BROTLI_QUALITY = 5
+QUERY_VERSIONED = ("vendor/",)
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+_HASHED_NAME = re.compile(r"^(.+)\.([0-9a-f]{%d})(\.[A-Za-z0-9]+)$" % HASH_LENGTH)
+_URL_ATTR = re.compile(r"(\s(?:src|href)=)([\"'])([^\"'{}]+)\2")
+_HEAD_TAG = re.compile(r"<head(\s[^>]*)?>", re.IGNORECASE)
+
+
+@dataclass
+class Asset:
+    path: str  # relative to the webui folder, with / separators
+    hash: str
+    size: int
+    mtime: float
+
+    @property
+    def compressible(self) -> bool:
+        return (
+            os.path.splitext(self.path)[1].lower() in COMPRESSIBLE
+            and self.size >= MIN_COMPRESS_SIZE
+        )
+
+
+_assets: dict[str, Asset] = {}
+_scanned = False
+_lock = threading.RLock()
+_precompress_thread: threading.Thread | None = None
+# last compressed page per (etag, encoding)
+_html_cache: dict[tuple[str, str], bytes] = {}
+
+
+def get_asset(path: str) -> Asset | None:
+    """Asset for a path relative to webui, rehashed when the file changed since last use"""
+    _ensure_scanned()
+    full = _full_path(path)
+    try:
+        stat = os.stat(full) if full else None
+    except OSError:
+        stat = None
+    with _lock:
+        if stat is None or not os.path.isfile(full):  # type: ignore
+            _assets.pop(path, None)
+            return None
+        asset = _assets.get(path)
+        if asset is None or asset.size != stat.st_size or asset.mtime != stat.st_mtime:
+            asset = _hash_file(path, full, stat)  # type: ignore
+            _assets[path] = asset
+        return asset
+
+
+def url_for(path: str) -> str:
+    """Content hash URL of a webui file, the plain path for unknown files"""
+    path = path.lstrip("/")
+    asset = get_asset(path)
+    if asset is None:
+        return "/" + path
+    if path.startswith(QUERY_VERSIONED):
+        return f"/{path}?v={asset.hash}"
+    root, ext = os.path.splitext(path)
+    return f"/{root}.{asset.hash}{ext}"
+
+
+def resolve(url_path: str, version: str | None = None) -> tuple[Asset | None, bool]:
+    """Asset for a requested URL path and whether the URL pins its current content"""
+    url_path = url_path.lstrip("/")
+    asset = get_asset(url_path)
+    if asset:
+        return asset, version == asset.hash
+    match = _HASHED_NAME.match(url_path)
+    if match:
+        asset = get_asset(match.group(1) + match.group(3))
+        if asset:
+            # an outdated hash gets the current content, but only until revalidated
+            return asset, match.group(2) == asset.hash
+    return None, False
+
+
+def send_asset(url_path: str, request: Request) -> Response:
+    asset, immutable = resolve(url_path, request.args.get("v"))
+    if asset is None:
+        raise NotFound()
+    encoding = ""
+    path = _full_path(asset.path)
+    if asset.compressible:
+        for enc in _accepted_encodings(request):
+            compressed = _compressed_path(asset, enc)
+            if os.path.exists(compressed):
+                encoding, path = enc, compressed
+                break
+    response = send_file(
+        path,  # type: ignore
+        mimetype=_mimetype(asset.path),
+        etag=f"{asset.hash}-{encoding or 'identity'}",
+        conditional=True,
+        last_modified=asset.mtime,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.compressible:
+        response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = CACHE_IMMUTABLE if immutable else CACHE_REVALIDATE
+    return response
+
+
+def rewrite_html(html: str) -> str:
+    """Point src and href of local files to hashed URLs and add an import map for modules"""
+
+    def replace(match: re.Match) -> str:
+        url = match.group(3)
+        if url.startswith(("http:", "https:", "//", "#", "data:", "mailto:")) or "?" in url:
+            return match.group(0)
+        path = url[2:] if url.startswith("./") else url.lstrip("/")
+        if get_asset(path) is None:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}{url_for(path)}{match.group(2)}"
+
+    html = _URL_ATTR.sub(replace, html)
+    imports = {"/" + path: url_for(path) for path in _module_paths()}
+    importmap = f'\n    <script type="importmap">{json.dumps({"imports": imports})}</script>'
+    head = _HEAD_TAG.search(html)
+    if head:
+        html = html[: head.end()] + importmap + html[head.end():]
+    return html
+
+
+def send_html(html: str, request: Request) -> Response:
+    """Generated page, compressed for the client and revalidated with an ETag"""
+    content = html.encode("utf-8")
+    etag = hashlib.sha256(content).hexdigest()[:HASH_LENGTH * 2]
+    encoding = next(iter(_accepted_encodings(request)), "")
+    if encoding:
+        key = (etag, encoding)
+        compressed = _html_cache.get(key)
+        if compressed is None:
+            compressed = _compress(content, encoding, fast=True)
+            _html_cache.clear()
+            _html_cache[key] = compressed
+        content = compressed
+    response = Response(content, mimetype="text/html")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = CACHE_REVALIDATE
+    response.set_etag(f"{etag}-{encoding or 'identity'}")
+    return response.make_conditional(request)
+
+
+def start_precompress():
+    """Compress changed assets in the background, served uncompressed until done"""
+    global _precompress_thread
+    with _lock:
+        if _precompress_thread and _precompress_thread.is_alive():
+            return
+        _precompress_thread = threading.Thread(
+            target=precompress, name="StaticPrecompress", daemon=True
+        )
+        _precompress_thread.start()
+
+
+def precompress() -> dict[str, int]:
+    _ensure_scanned()
+    with _lock:
+        assets = [asset for asset in _assets.values() if asset.compressible]
+    stats = {"files": 0, "compressed": 0, "bytes": 0, "compressed_bytes": 0}
+    for asset in assets:
+        stats["files"] += 1
+        content = None
+        for encoding in _encodings():
+            path = _compressed_path(asset, encoding)
+            if os.path.exists(path):
+                continue
+            if content is None:
+                with open(_full_path(asset.path), "rb") as f:  # type: ignore
+                    content = f.read()
+            compressed = _compress(content, encoding)
+            if len(compressed) >= len(content):
+                continue  # not worth it, served as is
+            files.make_dirs(path)
+            with open(path + ".tmp", "wb") as f:
+                f.write(compressed)
+            os.replace(path + ".tmp", path)
+            stats["compressed"] += 1
+            stats["bytes"] += len(content)
+            stats["compressed_bytes"] += len(compressed)
+    # copies of old versions
+    keep = {os.path.basename(_compressed_path(a, e)) for a in assets for e in _encodings()}
+    folder = files.get_abs_path(CACHE_FOLDER)
+    for name in os.listdir(folder) if os.path.isdir(folder) else []:
+        if name not in keep:
+            os.remove(os.path.join(folder, name))
+    if stats["compressed"]:
+        PrintStyle().print(
+            f"Static assets: compressed {stats['compressed']} files, "
+            f"{stats['bytes'] // 1024} KB to {stats['compressed_bytes'] // 1024} KB"
+        )
+    return stats
+
+
+def _ensure_scanned():
+    global _scanned
+    if _scanned:
+        return
+    with _lock:
+        if _scanned:
+            return
+        root = files.get_abs_path(WEBUI_FOLDER)
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                path = os.path.relpath(full, root).replace(os.sep, "/")
+                _assets[path] = _hash_file(path, full, os.stat(full))
+        _scanned = True
+
+
+def _hash_file(path: str, full: str, stat: os.stat_result) -> Asset:
+    digest = hashlib.sha256()
+    with open(full, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return Asset(path, digest.hexdigest()[:HASH_LENGTH], stat.st_size, stat.st_mtime)
+
+
+def _module_paths() -> list[str]:
+    _ensure_scanned()
+    with _lock:
+        return sorted(
+            path
+            for path in _assets
+            if path.endswith(".js") and not path.startswith(QUERY_VERSIONED)
+        )
+
+
+def _full_path(path: str) -> str | None:
+    root = files.get_abs_path(WEBUI_FOLDER)
+    full = os.path.normpath(os.path.join(root, path))
+    # no way out of the webui folder
+    if not full.startswith(root + os.sep):
+        return None
+    return full
+
+
+def _compressed_path(asset: Asset, encoding: str) -> str:
+    ext = "br" if encoding == "br" else "gz"
+    return files.get_abs_path(CACHE_FOLDER, f"{asset.hash}.{ext}")
+
+
+def _encodings() -> list[str]:
+    # preferred first, gzip for clients without brotli
+    return ["br", "gzip"]
+
+
+def _accepted_encodings(request: Request) -> list[str]:
+    accepted = request.accept_encodings
+    return [enc for enc in _encodings() if accepted[enc] > 0]
+
+
+def _compress(content: bytes, encoding: str, fast: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=HTML_BROTLI_QUALITY if fast else BROTLI_QUALITY)
+    # mtime 0, the same content always gives the same bytes
+    return gzip.compress(content, HTML_GZIP_LEVEL if fast else GZIP_LEVEL, mtime=0)
+
+
+def _mimetype(path: str) -> str:
+    if path.endswith((".js", ".mjs")):
+        return "text/javascript"  # some systems map .js to text/plain, modules would not load
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
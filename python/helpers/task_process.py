@@ -0,0 +1,338 @@
+import asyncio
+import atexit
+import multiprocessing
+import threading
+from multiprocessing.connection import Connection
+from typing import Any
+
+import psutil
+
+try:
+    import resource  # limits are not available on Windows
+except ImportError:
+    resource = None
+
+from agent import AgentContext
+from python.helpers import errors, memory, persist_chat, settings
+from python.helpers.log import Log
+from python.helpers.print_style import PrintStyle
+
+# worker messages, all tuples starting with the kind:
+#   main -> worker: ("run", ctxid, log_len, cpu_seconds), ("stop",)
+#                   ("memory", ok, result or error text)
+#   worker -> main: ("log", items, progress, progress_no, progress_active)
+#                   ("save", chat state), ("memory", method, args, kwargs)
+#                   ("done", result), ("error", text)
+# seconds between log updates sent by a running worker
+LOG_INTERVAL = 0.25
+# seconds between memory checks of a running worker
+MEMORY_CHECK_INTERVAL = 1.0
+# seconds a stopped worker gets to exit before it is killed
+STOP_TIMEOUT = 5
+
+_instance: "TaskProcessPool | None" = None
+_instance_lock = threading.Lock()
+
+
+def get() -> "TaskProcessPool":
+    global _instance
+    with _instance_lock:
+        if _instance is None:
+            _instance = TaskProcessPool()
+        return _instance
+
+
+def enabled() -> bool:
+    return bool(settings.get_settings()["scheduler_isolation"])
+
+
+class TaskProcessError(Exception):
+    pass
+
+
+class TaskProcessPool:
+    """Runs agent monologues of scheduled tasks in worker processes.
+    The main process keeps the chat, workers stream log items and agent state back to it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._workers: set[_Worker] = set()
+        self._stats = {"started": 0, "recycled": 0, "killed": 0, "runs": 0, "failed": 0}
+        # non daemon workers are joined at exit, they must be stopped first
+        atexit.register(self.close)
+
+    async def run(self, context: AgentContext) -> Any:
+        """Run the monologue of a saved context in a worker, returns its result"""
+        current_settings = settings.get_settings()
+        worker = self._acquire()
+        ok = False
+        try:
+            result = await worker.run(
+                context,
+                int(current_settings["scheduler_task_memory_mb"]),
+                int(current_settings["scheduler_task_cpu_seconds"]),
+            )
+            ok = True
+            return result
+        finally:
+            self._release(worker, ok, int(current_settings["scheduler_worker_max_runs"]))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "idle": len(self._idle),
+                **self._stats,
+            }
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self) -> "_Worker":
+        with self._lock:
+            self._stats["runs"] += 1
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._workers.discard(worker)
+            self._stats["started"] += 1
+            worker = _Worker()
+            self._workers.add(worker)
+            return worker
+
+    def _release(self, worker: "_Worker", ok: bool, max_runs: int):
+        with self._lock:
+            if not ok:
+                # a failed worker may be out of memory or mid-run, it is not reused
+                self._stats["failed"] += 1
+                self._stats["killed"] += 1
+                self._workers.discard(worker)
+                worker.kill()
+            elif max_runs and worker.runs >= max_runs:
+                self._stats["recycled"] += 1
+                self._workers.discard(worker)
+                threading.Thread(target=worker.stop, daemon=True).start()
+            else:
+                self._idle.append(worker)
+
+
+class _Worker:
+    def __init__(self):
+        # spawn, forking the threaded web server could copy held locks into the child
+        mp = multiprocessing.get_context("spawn")
+        self.conn, child = mp.Pipe()
+        self.process = mp.Process(
+            target=_worker_main, args=(child,), name="TaskWorker", daemon=False
+        )
+        self.process.start()
+        child.close()
+        self.runs = 0
+
+    async def run(self, context: AgentContext, memory_mb: int, cpu_seconds: int) -> Any:
+        self.runs += 1
+        self.conn.send(("run", context.id, len(context.log.logs), cpu_seconds))
+        while True:
+            msg = await asyncio.to_thread(self._recv, memory_mb)
+            kind = msg[0]
+            if kind == "log":
+                _apply_log(context.log, *msg[1:])
+            elif kind == "save":
+                persist_chat.update_chat(context, msg[1])
+            elif kind == "memory":
+                self.conn.send(("memory", *await _call_memory(context, *msg[1:])))
+            elif kind == "done":
+                return msg[1]
+            elif kind == "error":
+                raise TaskProcessError(msg[1])
+
+    def _recv(self, memory_mb: int) -> tuple:
+        try:
+            while not self.conn.poll(MEMORY_CHECK_INTERVAL):
+                self._check_memory(memory_mb)
+            self._check_memory(memory_mb)
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(STOP_TIMEOUT)
+            raise TaskProcessError(
+                f"Task worker exited with code {self.process.exitcode}, "
+                "it may have exceeded its CPU time limit"
+            )
+
+    def _check_memory(self, memory_mb: int):
+        # resident memory, an address space limit fails on memory that is only reserved
+        if memory_mb <= 0:
+            return
+        try:
+            rss = psutil.Process(self.process.pid).memory_info().rss
+        except psutil.Error:
+            return  # exited, reported by recv
+        if rss > memory_mb * 1024 * 1024:
+            self.kill()
+            raise TaskProcessError(
+                f"Task worker used {rss // (1024 * 1024)} MB, more than its memory limit "
+                f"of {memory_mb} MB, and was killed"
+            )
+
+    def stop(self):
+        try:
+            self.conn.send(("stop",))
+        except (EOFError, OSError):
+            pass
+        self.process.join(STOP_TIMEOUT)
+        self.kill()
+
+    def kill(self):
+        # a thread still waiting in _recv gets EOF and releases the connection
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(STOP_TIMEOUT)
+
+
+async def _call_memory(context: AgentContext, method: str, args: tuple, kwargs: dict) -> tuple[bool, Any]:
+    # memory of a worker, the index and docstore files are only written by this process
+    if method not in memory.RemoteMemory.METHODS:
+        return False, f"Memory method not allowed: {method}"
+    try:
+        db = await memory.Memory.get(context.streaming_agent or context.agent0)
+        return True, await getattr(db, method)(*args, **kwargs)
+    except Exception as e:
+        return False, errors.format_error(e)
+
+
+def _log_message(log: Log, start: int, end: int, offset: int) -> tuple:
+    """Log message of the changes between two log versions, item numbers shifted by offset"""
+    items = log.output(start, end)
+    for item in items:
+        item["no"] += offset
+    progress_no = log.progress_no + offset if log.progress_no > 0 else log.progress_no
+    return ("log", items, log.progress, progress_no, log.progress_active)
+
+
+def _apply_log(log: Log, items: list[dict[str, Any]], progress: str, progress_no: int, active: bool):
+    for item in items:
+        fields = {
+            "type": item["type"],
+            "heading": item["heading"],
+            "content": item["content"],
+            "kvps": item["kvps"],
+            "temp": item["temp"],
+        }
+        if item["no"] < len(log.logs):
+            log.logs[item["no"]].update(**fields)
+        else:
+            log.log(id=item["id"], **fields)
+    log.set_progress(progress, progress_no, active)
+
+
+def _worker_main(conn: Connection):
+    import initialize
+    from python.helpers import dotenv, runtime
+
+    runtime.initialize()
+    dotenv.load_dotenv()
+    # tools of the MCP servers, as in the web process
+    mcp_init = initialize.initialize_mcp()
+    send_lock = threading.Lock()
+    memory_lock = threading.Lock()
+
+    def send(*msg):
+        with send_lock:
+            conn.send(msg)
+
+    def call_memory(method: str, args: tuple, kwargs: dict) -> Any:
+        # one call at a time, the reply is the next message from the main process
+        with memory_lock:
+            send("memory", method, args, kwargs)
+            _, ok, result = conn.recv()
+        if not ok:
+            raise TaskProcessError(result)
+        return result
+
+    async def remote_memory(method: str, args: tuple, kwargs: dict) -> Any:
+        return await asyncio.to_thread(call_memory, method, args, kwargs)
+
+    # the main process owns the chat and memory files, saves and memory calls are sent to it
+    persist_chat.set_save_handler(
+        lambda context: send("save", persist_chat.get_chat_state(context))
+    )
+    memory.set_remote_call(remote_memory)
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return  # main process is gone
+        if msg[0] == "stop":
+            return
+        _, ctxid, log_len, cpu_seconds = msg
+        if mcp_init is not None:
+            try:
+                mcp_init.result_sync()
+            except Exception as e:
+                PrintStyle.error(f"Task worker: MCP initialization failed: {e}")
+            mcp_init = None
+        _set_limits(cpu_seconds)
+        try:
+            send("done", asyncio.run(_run(ctxid, log_len, send)))
+        except BaseException as e:
+            send("error", errors.format_error(e))
+
+
+async def _run(ctxid: str, log_len: int, send) -> Any:
+    context = persist_chat.read_chat(ctxid)
+    log = context.log
+    # saved logs keep the last LOG_SIZE items, shift numbers to match the main process
+    offset = log_len - len(log.logs)
+    version = log.version
+    done = threading.Event()
+
+    def flush():
+        nonlocal version
+        end = log.version
+        send(*_log_message(log, version, end, offset))
+        version = end
+
+    def stream():
+        # from a thread, so tools blocking the event loop do not stop the updates
+        while not done.wait(LOG_INTERVAL):
+            if log.version != version:
+                flush()
+
+    streamer = threading.Thread(target=stream, daemon=True)
+    streamer.start()
+    try:
+        agent = context.streaming_agent or context.agent0
+        result = await agent.monologue()
+    finally:
+        done.set()
+        streamer.join()
+        flush()
+        send("save", persist_chat.get_chat_state(context))
+        AgentContext.remove(ctxid)
+    return result
+
+
+def _set_limits(cpu_seconds: int):
+    # memory is watched by the main process, see _Worker._check_memory
+    if resource is None:
+        return
+    # soft limit only, the next run may raise it again
+    cpu = resource.RLIM_INFINITY
+    if cpu_seconds > 0:
+        # the limit is on total process CPU time, count from what earlier runs used
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+    _set_soft_limit(resource.RLIMIT_CPU, cpu)
+
+
+def _set_soft_limit(limit: int, value: int):
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY and (value == resource.RLIM_INFINITY or value > hard):
+        value = hard
+    resource.setrlimit(limit, (value, hard))
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from datetime import datetime, timezone, timedelta
 import os
 import random
@@ -13,19 +14,30 @@ import nest_asyncio
 nest_asyncio.apply()
 
 from crontab import CronTab
-from pydantic import BaseModel, Field, PrivateAttr
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter
 
 from agent import Agent, AgentContext, UserMessage
 from initialize import initialize_agent
 from python.helpers.persist_chat import save_tmp_chat
 from python.helpers.print_style import PrintStyle
-from python.helpers.defer import DeferredTask
-from python.helpers.files import get_abs_path, make_dirs, read_file, write_file
+from python.helpers.files import get_abs_path, read_file
 from python.helpers.localization import Localization
+from python.helpers import settings, state_monitor, task_process, worker_pool
+from python.helpers.task_store import TaskStore
+from python.helpers.timer_heap import TimerHeap
 import pytz
 from typing import Annotated
 
 SCHEDULER_FOLDER = "tmp/scheduler"
+# one row per task, see TaskStore
+TASKS_DB_FILE = "tasks.db"
+# task list of earlier versions and of backups, imported into TASKS_DB_FILE
+TASKS_JSON_FILE = "tasks.json"
+
+# set when the task list changes, wakes the job loop to re-plan its timers
+_wakeup = threading.Event()
+# due runs waiting for a free worker, later ones are dropped
+MAX_QUEUED_RUNS = 100
 
 # ----------------------
 # Task Models
@@ -39,6 +51,13 @@ class TaskState(str, Enum):
     ERROR = "error"
 
 
+class TaskConcurrency(str, Enum):
+    # what happens when a task is due while it still runs, see WorkerPool
+    SKIP = worker_pool.POLICY_SKIP
+    QUEUE = worker_pool.POLICY_QUEUE
+    REPLACE = worker_pool.POLICY_REPLACE
+
+
 class TaskType(str, Enum):
     AD_HOC = "adhoc"
     SCHEDULED = "scheduled"
@@ -128,6 +147,9 @@ class BaseTask(BaseModel):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_run: datetime | None = None
     last_result: str | None = None
+    # waiting tasks with higher priority start first when all scheduler workers are busy
+    priority: int = Field(default=0)
+    concurrency: TaskConcurrency = Field(default=TaskConcurrency.SKIP)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -174,6 +196,7 @@ class BaseTask(BaseModel):
                 if value is not None:
                     setattr(self, key, value)
                     self.updated_at = datetime.now(timezone.utc)
+        state_monitor.notify()
 
     def check_schedule(self, frequency_seconds: float = 60.0) -> bool:
         return False
@@ -181,6 +204,10 @@ class BaseTask(BaseModel):
     def get_next_run(self) -> datetime | None:
         return None
 
+    def get_next_run_after(self, after: datetime) -> datetime | None:
+        # first launch time later than after, used by the scheduler timers
+        return None
+
     def get_next_run_minutes(self) -> int | None:
         next_run = self.get_next_run()
         if next_run is None:
@@ -352,6 +379,12 @@ class ScheduledTask(BaseTask):
             crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
             return crontab.next(now=datetime.now(timezone.utc), return_datetime=True)  # type: ignore
 
+    def get_next_run_after(self, after: datetime) -> datetime | None:
+        with self._lock:
+            crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
+            task_timezone = pytz.timezone(self.schedule.timezone or Localization.get().get_timezone())
+            return crontab.next(now=after.astimezone(task_timezone), return_datetime=True)  # type: ignore
+
 
 class PlannedTask(BaseTask):
     type: Literal[TaskType.PLANNED] = TaskType.PLANNED
@@ -404,6 +437,11 @@ class PlannedTask(BaseTask):
         with self._lock:
             return self.plan.get_next_launch_time()
 
+    def get_next_run_after(self, after: datetime) -> datetime | None:
+        # planned launches are not skipped, a missed one runs as soon as possible
+        with self._lock:
+            return self.plan.get_next_launch_time()
+
     async def on_run(self):
         with self._lock:
             # Get the next launch time and set it as in_progress
@@ -450,75 +488,110 @@ class SchedulerTaskList(BaseModel):
 
     @classmethod
     def get(cls) -> "SchedulerTaskList":
-        path = get_abs_path(SCHEDULER_FOLDER, "tasks.json")
         if cls.__instance is None:
-            if not exists(path):
-                make_dirs(path)
-                cls.__instance = asyncio.run(cls(tasks=[]).save())
-            else:
-                cls.__instance = cls.model_validate_json(read_file(path))
-        else:
-            asyncio.run(cls.__instance.reload())
+            cls.__instance = cls(tasks=[])
+        asyncio.run(cls.__instance.reload())
         return cls.__instance
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._lock = threading.RLock()
+        self._store = TaskStore(get_abs_path(SCHEDULER_FOLDER, TASKS_DB_FILE))
+        # json of each task as stored, by uuid, only changed tasks are written or parsed
+        self._rows: dict[str, str] = {}
+        # bumped when the stored tasks change, reloads of unchanged tasks do not signal the UI
+        self._version = 0
+        # store version of the last reload, changes with writes of other processes
+        self._data_version: int | None = None
+        # changes not yet seen by the scheduler timers, see take_timer_changes
+        self._changed_uuids: set[str] = set()
+        self._changed_all = False
 
     async def reload(self) -> "SchedulerTaskList":
-        path = get_abs_path(SCHEDULER_FOLDER, "tasks.json")
-        if exists(path):
-            with self._lock:
-                data = self.__class__.model_validate_json(read_file(path))
-                self.tasks.clear()
-                self.tasks.extend(data.tasks)
+        with self._lock:
+            self._migrate_json()
+            self._data_version = self._store.data_version()
+            rows = self._store.load()
+            current = {task.uuid: task for task in self.tasks}
+            tasks = []
+            for task_uuid, data in rows:
+                task = current.get(task_uuid)
+                if task is None or self._rows.get(task_uuid) != data:
+                    task = _task_adapter.validate_json(data)
+                tasks.append(task)
+            self.tasks.clear()
+            self.tasks.extend(tasks)
+            if dict(rows) != self._rows:
+                self._rows = dict(rows)
+                # written elsewhere, all timers are planned again
+                self._changed(None)
+        return self
+
+    async def reload_if_changed(self) -> "SchedulerTaskList":
+        # tasks written by another process, or a tasks.json restored from a backup
+        if self._store.data_version() != self._data_version or exists(_get_tasks_json_path()):
+            await self.reload()
         return self
 
     async def add_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> "SchedulerTaskList":
         with self._lock:
             self.tasks.append(task)
-            await self.save()
+            await self.save_task(task)
         return self
 
     async def save(self) -> "SchedulerTaskList":
+        """Write the tasks that changed since they were loaded or saved"""
         with self._lock:
-            # Debug: check for AdHocTasks with null tokens before saving
-            for task in self.tasks:
-                if isinstance(task, AdHocTask):
-                    if task.token is None or task.token == "":
-                        PrintStyle(italic=True, font_color="red", padding=False).print(
-                            f"WARNING: AdHocTask {task.name} ({task.uuid}) has a null or empty token before saving: '{task.token}'"
-                        )
-                        # Generate a new token to prevent errors
-                        task.token = str(random.randint(1000000000000000000, 9999999999999999999))
-                        PrintStyle(italic=True, font_color="red", padding=False).print(
-                            f"Fixed: Generated new token '{task.token}' for task {task.name}"
-                        )
-
-            path = get_abs_path(SCHEDULER_FOLDER, "tasks.json")
-            if not exists(path):
-                make_dirs(path)
-
-            # Get the JSON string before writing
-            json_data = self.model_dump_json()
-
-            # Debug: check if 'null' appears as token value in JSON
-            if '"type": "adhoc"' in json_data and '"token": null' in json_data:
-                PrintStyle(italic=True, font_color="red", padding=False).print(
-                    "ERROR: Found null token in JSON output for an adhoc task"
-                )
+            rows = {task.uuid: _dump_task(task) for task in self.tasks}
+            changed = [(task_uuid, data) for task_uuid, data in rows.items() if self._rows.get(task_uuid) != data]
+            removed = [task_uuid for task_uuid in self._rows if task_uuid not in rows]
+            if changed or removed:
+                self._store.write(changed, removed)
+                self._rows = rows
+                self._changed([task_uuid for task_uuid, _ in changed] + removed)
+        return self
 
-            write_file(path, json_data)
+    async def save_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> "SchedulerTaskList":
+        """Write one task, a state change is a single row update"""
+        with self._lock:
+            data = _dump_task(task)
+            if self._rows.get(task.uuid) != data:
+                self._store.write([(task.uuid, data)])
+                self._rows[task.uuid] = data
+                self._changed([task.uuid])
+        return self
 
-            # Debug: Verify after saving
-            if exists(path):
-                loaded_json = read_file(path)
-                if '"type": "adhoc"' in loaded_json and '"token": null' in loaded_json:
-                    PrintStyle(italic=True, font_color="red", padding=False).print(
-                        "ERROR: Null token persisted in JSON file for an adhoc task"
-                    )
+    def _changed(self, uuids: list[str] | None):
+        # None when the changed tasks are not known
+        if uuids is None:
+            self._changed_all = True
+        else:
+            self._changed_uuids.update(uuids)
+        self._version += 1
+        state_monitor.notify()
+        _wakeup.set()
 
-        return self
+    def take_timer_changes(self) -> tuple[bool, set[str]]:
+        """Tasks changed since the last call, as (all changed, changed uuids)"""
+        with self._lock:
+            changes = (self._changed_all, self._changed_uuids)
+            self._changed_all = False
+            self._changed_uuids = set()
+        return changes
+
+    def _migrate_json(self):
+        # tasks.json of earlier versions or restored from a backup is the whole task list,
+        # it replaces the stored tasks once and is kept as tasks.json.migrated
+        path = _get_tasks_json_path()
+        if not exists(path):
+            return
+        data = json.loads(read_file(path) or "{}")
+        tasks = [_task_adapter.validate_python(task) for task in data.get("tasks", [])]
+        self._store.replace([(task.uuid, _dump_task(task)) for task in tasks])
+        os.replace(path, path + ".migrated")
+        PrintStyle(italic=True, font_color="green", padding=False).print(
+            f"Scheduler: imported {len(tasks)} task(s) from {TASKS_JSON_FILE}"
+        )
 
     async def update_task_by_uuid(
         self,
@@ -547,7 +620,7 @@ class SchedulerTaskList(BaseModel):
             updater_func(task)
 
             # Save the changes
-            await self.save()
+            await self.save_task(task)
 
             return task
 
@@ -586,7 +659,10 @@ class SchedulerTaskList(BaseModel):
     async def remove_task_by_uuid(self, task_uuid: str) -> "SchedulerTaskList":
         with self._lock:
             self.tasks = [task for task in self.tasks if task.uuid != task_uuid]
-            await self.save()
+            if task_uuid in self._rows:
+                self._store.write([], [task_uuid])
+                del self._rows[task_uuid]
+                self._changed([task_uuid])
         return self
 
     async def remove_task_by_name(self, name: str) -> "SchedulerTaskList":
@@ -596,6 +672,11 @@ class SchedulerTaskList(BaseModel):
         return self
 
 
+_task_adapter: TypeAdapter[Union[ScheduledTask, AdHocTask, PlannedTask]] = TypeAdapter(
+    Annotated[Union[ScheduledTask, AdHocTask, PlannedTask], Field(discriminator="type")]
+)
+
+
 class TaskScheduler:
 
     _tasks: SchedulerTaskList
@@ -613,6 +694,17 @@ class TaskScheduler:
         if not hasattr(self, '_initialized'):
             self._tasks = SchedulerTaskList.get()
             self._printer = PrintStyle(italic=True, font_color="green", padding=False)
+            # next launch time of each task by uuid, re-armed for the tasks that change
+            self._timers = TimerHeap()
+            self._timers_planned = False
+            # launch times up to here were handled, cron times missed by up to a minute still run
+            self._last_tick = datetime.now(timezone.utc) - timedelta(seconds=60)
+            # runs are queued when more tasks are due than workers, one thread runs them all
+            self._pool = worker_pool.WorkerPool(
+                max_workers=_get_max_workers(),
+                max_queue=MAX_QUEUED_RUNS,
+                thread_name=self.__class__.__name__,
+            )
             self._initialized = True
 
     async def reload(self):
@@ -646,10 +738,71 @@ class TaskScheduler:
     def find_task_by_name(self, name: str) -> list[Union[ScheduledTask, AdHocTask, PlannedTask]]:
         return self._tasks.find_task_by_name(name)
 
-    async def tick(self):
-        for task in await self._tasks.get_due_tasks():
+    async def tick(self) -> float | None:
+        """Run tasks due since the last tick, returns seconds until the next launch time"""
+        await self._tasks.reload_if_changed()
+        now = datetime.now(timezone.utc)
+        self._update_timers()
+        due = self._timers.pop_due(now.timestamp())
+        self._last_tick = now
+        tasks = []
+        for task_uuid in due:
+            task = self.get_task_by_uuid(task_uuid)
+            # tasks not idle are re-armed by the task list change that ends their run
+            if task is None or not _is_runnable(task):
+                continue
+            next_run = self._get_next_run(task, now)
+            # a planned launch is consumed by the run, it is re-armed with the run's state change
+            if next_run and next_run > now:
+                self._timers.set(task.uuid, next_run.timestamp())
+            tasks.append(task)
+        # tasks due together take free workers by priority
+        for task in sorted(tasks, key=lambda task: -task.priority):
             await self._run_task(task)
 
+        deadline = self._timers.next_deadline()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - datetime.now(timezone.utc).timestamp())
+
+    async def wait(self, timeout: float | None = None):
+        """Sleep until timeout or a change of the task list"""
+        # the job loop runs in its own event loop, changes come from other threads
+        await asyncio.to_thread(_wakeup.wait, timeout)
+        _wakeup.clear()
+
+    def _update_timers(self):
+        changed_all, changed = self._tasks.take_timer_changes()
+        if changed_all or not self._timers_planned:
+            self._timers_planned = True
+            self._timers.clear()
+            for task in self._tasks.get_tasks():
+                self._arm_timer(task)
+            return
+        for task_uuid in changed:
+            task = self.get_task_by_uuid(task_uuid)
+            if task is None:
+                self._timers.remove(task_uuid)
+            else:
+                self._arm_timer(task)
+
+    def _arm_timer(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]):
+        next_run = None
+        if _is_runnable(task):
+            # tasks created after the last tick do not catch up on earlier cron times
+            next_run = self._get_next_run(task, max(self._last_tick, task.created_at))
+        if next_run:
+            self._timers.set(task.uuid, next_run.timestamp())
+        else:
+            self._timers.remove(task.uuid)
+
+    def _get_next_run(self, task: Union[ScheduledTask, AdHocTask, PlannedTask], after: datetime) -> datetime | None:
+        try:
+            return task.get_next_run_after(after)
+        except Exception as e:
+            self._printer.print(f"Scheduler Task '{task.name}' has an invalid schedule: {e}")
+            return None
+
     async def run_task_by_uuid(self, task_uuid: str, task_context: str | None = None):
         # First reload tasks to ensure we have the latest state
         await self._tasks.reload()
@@ -677,14 +830,21 @@ class TaskScheduler:
             if not task:
                 raise ValueError(f"Task with UUID '{task_uuid}' not found after state reset")
 
-        # Run the task
-        await self._run_task(task, task_context)
+        # Run the task, it may wait for a free worker
+        return self._check_submitted(task, await self._run_task(task, task_context))
 
     async def run_task_by_name(self, name: str, task_context: str | None = None):
         task = self._tasks.get_task_by_name(name)
         if task is None:
             raise ValueError(f"Task with name {name} not found")
-        await self._run_task(task, task_context)
+        return self._check_submitted(task, await self._run_task(task, task_context))
+
+    def _check_submitted(self, task: Union[ScheduledTask, AdHocTask, PlannedTask], result: str) -> str:
+        if result == worker_pool.SKIPPED:
+            raise ValueError(f"Task '{task.name}' is already running")
+        if result == worker_pool.REJECTED:
+            raise ValueError(f"Task '{task.name}' was not queued, too many runs are waiting for a worker")
+        return result
 
     async def save(self):
         await self._tasks.save()
@@ -744,7 +904,8 @@ class TaskScheduler:
             raise ValueError(f"Context ID mismatch for task {task.name}: context {context.id} != task {task.context_id}")
         save_tmp_chat(context)
 
-    async def _run_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask], task_context: str | None = None):
+    async def _run_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask], task_context: str | None = None) -> str:
+        """Submit a run to the worker pool, returns the worker_pool submit result"""
 
         async def _run_task_wrapper(task_uuid: str, task_context: str | None = None):
 
@@ -831,7 +992,11 @@ class TaskScheduler:
                 # This ensures the task context is saved and can be found by polling
                 await self._persist_chat(current_task, context)
 
-                result = await agent.monologue()
+                if task_process.enabled():
+                    # the worker reloads the chat saved above and sends it back as it changes
+                    result = await task_process.get().run(context)
+                else:
+                    result = await agent.monologue()
 
                 # Success
                 self._printer.print(f"Scheduler Task '{current_task.name}' completed: {result}")
@@ -845,6 +1010,12 @@ class TaskScheduler:
                     self._printer.print(f"Fixing task state consistency: '{current_task.name}' state is not IDLE after success")
                     await self.update_task(task_uuid, state=TaskState.IDLE)
 
+            except asyncio.CancelledError:
+                # replaced by a newer run, see TaskConcurrency.REPLACE
+                self._printer.print(f"Scheduler Task '{current_task.name}' cancelled")
+                await self.update_task(task_uuid, state=TaskState.IDLE)
+                raise
+
             except Exception as e:
                 # Error
                 self._printer.print(f"Scheduler Task '{current_task.name}' failed: {e}")
@@ -866,12 +1037,30 @@ class TaskScheduler:
                 # Make one final save to ensure all states are persisted
                 await self._tasks.save()
 
-        deferred_task = DeferredTask(thread_name=self.__class__.__name__)
-        deferred_task.start_task(_run_task_wrapper, task.uuid, task_context)
+        self._pool.max_workers = _get_max_workers()
+        result = self._pool.submit(
+            task.uuid,
+            lambda: _run_task_wrapper(task.uuid, task_context),
+            priority=task.priority,
+            policy=task.concurrency.value,
+        )
+        if result in (worker_pool.QUEUED, worker_pool.REPLACED):
+            self._printer.print(f"Scheduler Task '{task.name}' {result}, waiting for a free worker")
+        elif result in (worker_pool.SKIPPED, worker_pool.REJECTED):
+            self._printer.print(f"Scheduler Task '{task.name}' {result}, already running or queue full")
 
         # Ensure background execution doesn't exit immediately on async await, especially in script contexts
         # This helps prevent premature exits when running from non-event-loop contexts
         asyncio.create_task(asyncio.sleep(0.1))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Worker pool load, queue depth and wait times of task runs since start"""
+        stats = self._pool.stats()
+        stats["isolation"] = task_process.enabled()
+        if stats["isolation"]:
+            stats["processes"] = task_process.get().stats()
+        return stats
 
     def serialize_all_tasks(self) -> list[Dict[str, Any]]:
         """
@@ -895,6 +1084,34 @@ class TaskScheduler:
 # Task Serialization Helpers
 # ----------------------
 
+def _get_max_workers() -> int:
+    return max(1, settings.get_settings()["scheduler_max_workers"])
+
+
+def _is_runnable(task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> bool:
+    # a running task can be due again when its runs are queued or replaced
+    return task.state == TaskState.IDLE or (
+        task.state == TaskState.RUNNING and task.concurrency != TaskConcurrency.SKIP
+    )
+
+
+def _get_tasks_json_path() -> str:
+    return get_abs_path(SCHEDULER_FOLDER, TASKS_JSON_FILE)
+
+
+def _dump_task(task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> str:
+    if isinstance(task, AdHocTask) and not task.token:
+        PrintStyle(italic=True, font_color="red", padding=False).print(
+            f"WARNING: AdHocTask {task.name} ({task.uuid}) has a null or empty token before saving: '{task.token}'"
+        )
+        # Generate a new token to prevent errors
+        task.token = str(random.randint(1000000000000000000, 9999999999999999999))
+        PrintStyle(italic=True, font_color="red", padding=False).print(
+            f"Fixed: Generated new token '{task.token}' for task {task.name}"
+        )
+    return task.model_dump_json()
+
+
 def serialize_datetime(dt: Optional[datetime]) -> Optional[str]:
     """
     Serialize a datetime object to ISO format string in the user's timezone.
@@ -1041,7 +1258,9 @@ def serialize_task(task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> Dict[s
         "last_run": serialize_datetime(task.last_run),
         "next_run": serialize_datetime(task.get_next_run()),
         "last_result": task.last_result,
-        "context_id": task.context_id
+        "context_id": task.context_id,
+        "priority": task.priority,
+        "concurrency": task.concurrency,
     }
 
     # Add type-specific fields
@@ -0,0 +1,61 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable
+
+
+class TaskStore:
+    """Scheduler tasks as JSON rows in SQLite, a change of one task writes one row"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        # tasks are saved from scheduler threads, access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (uuid TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def load(self) -> list[tuple[str, str]]:
+        """(uuid, json) of all tasks in the order they were added"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT uuid, data FROM tasks ORDER BY rowid"
+            ).fetchall()
+
+    def write(self, rows: Iterable[tuple[str, str]], removed: Iterable[str] = ()):
+        """Upsert (uuid, json) rows and delete removed uuids in one transaction"""
+        with self._lock, self._conn:
+            # an update keeps the rowid, so tasks keep their order
+            self._conn.executemany(
+                "INSERT INTO tasks (uuid, data) VALUES (?, ?) "
+                "ON CONFLICT (uuid) DO UPDATE SET data = excluded.data",
+                rows,
+            )
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE uuid = ?", ((uuid,) for uuid in removed)
+            )
+
+    def replace(self, rows: Iterable[tuple[str, str]]):
+        """Replace all tasks with (uuid, json) rows in one transaction"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.executemany("INSERT INTO tasks (uuid, data) VALUES (?, ?)", rows)
+
+    def export_json(self) -> str:
+        """All tasks as a tasks.json of earlier versions, read in one statement"""
+        return json.dumps({"tasks": [json.loads(data) for _, data in self.load()]}, indent=4)
+
+    def data_version(self) -> int:
+        # changes when another connection commits, writes of this one do not count
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
@@ -0,0 +1,62 @@
+import heapq
+import itertools
+from typing import Hashable
+
+
+class TimerHeap:
+    """Min-heap of deadlines by key, setting a key again replaces its deadline"""
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, Hashable]] = []
+        # key -> (deadline, entry no) of its live heap entry, replaced ones are skipped lazily
+        self._entries: dict[Hashable, tuple[float, int]] = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def set(self, key: Hashable, deadline: float):
+        no = next(self._counter)
+        self._entries[key] = (deadline, no)
+        heapq.heappush(self._heap, (deadline, no, key))
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._compact()
+
+    def remove(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> float | None:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[Hashable]:
+        """Keys with deadline at or before now, earliest first, they are removed"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, no, key = heapq.heappop(self._heap)
+            if self._entries.get(key) == (deadline, no):
+                del self._entries[key]
+                due.append(key)
+        return due
+
+    def _drop_stale(self):
+        while self._heap:
+            deadline, no, key = self._heap[0]
+            if self._entries.get(key) == (deadline, no):
+                return
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = [(d, no, key) for key, (d, no) in self._entries.items()]
+        heapq.heapify(self._heap)
@@ -1,5 +1,9 @@
-from typing import Any, List, Sequence
+import asyncio
+from collections.abc import Mapping
+from typing import Any, Callable, Iterable, List, Sequence
+import threading
 import uuid
+import numpy as np
 from langchain_community.vectorstores import FAISS
 
 # faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
@@ -15,21 +19,260 @@ from langchain_community.vectorstores.utils import (
 )
 from langchain.embeddings import CacheBackedEmbeddings
 
+from python.helpers.query_cache import QueryCache
+from python.helpers.disk_docstore import DiskDocstore
+from python.helpers.keyword_index import (
+    KeywordIndex,
+    metadata_filter,
+    reciprocal_rank_fusion,
+)
 from agent import Agent
 
 
 class MyFaiss(FAISS):
+    # set while the index is memory-mapped read-only from this file
+    mmap_path: str | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # serializes index changes with searches, compaction runs in a background thread
+        self._lock = threading.RLock()
+        # deleted ids, hidden until compaction removed their vectors and documents
+        self.tombstones: set[str] = set()
+        # bumped on every insert and delete, invalidates cached query results
+        self.version = 0
+        self.query_cache = QueryCache()
+        # keyword postings of in-memory docstores, a DiskDocstore keeps them in its file
+        self.keyword_index: KeywordIndex | None = None
+        if not isinstance(self.docstore, DiskDocstore):
+            self.keyword_index = KeywordIndex()
+            self.keyword_index.add_many(
+                (id, doc.page_content) for id, doc in self.docstore._dict.items()  # type: ignore
+            )
+
+    def bump_version(self):
+        self.version += 1
+
+    def ensure_writable(self):
+        # mmapped indexes can not be modified, load a writable copy on first write
+        if self.mmap_path:
+            self.index = faiss.read_index(self.mmap_path)
+            self.mmap_path = None
+
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
-        return [self.docstore._dict[id] for id in (ids if isinstance(ids, list) else [ids]) if id in self.docstore._dict]  # type: ignore
+        return [self.docstore._dict[id] for id in (ids if isinstance(ids, list) else [ids]) if id in self.docstore._dict and id not in self.tombstones]  # type: ignore
 
     async def aget_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         return self.get_by_ids(ids)
 
-    def get_all_docs(self) -> dict[str, Document]:
+    def get_all_docs(self) -> Mapping[str, Document]:
+        if self.tombstones:
+            return LiveDocs(self.docstore._dict, self.tombstones)  # type: ignore
         return self.docstore._dict  # type: ignore
 
+    def tombstone(self, ids: Iterable[str]):
+        # O(1) delete, excluded from results until compact() removes it physically
+        ids = set(ids)
+        with self._lock:
+            # a new set, readers iterating the old one are not disturbed
+            self.tombstones = self.tombstones | ids
+            self.bump_version()
+        if self.keyword_index is not None:
+            self.keyword_index.remove(ids)
+
+    def release_tombstones(self, ids: Iterable[str]):
+        # only once their documents are deleted from the docstore, until then
+        # the ids keep them hidden from get_all_docs and metadata searches
+        with self._lock:
+            self.tombstones = self.tombstones - set(ids)
+
+    def tombstone_ratio(self) -> float:
+        return len(self.tombstones) / max(1, len(self.index_to_docstore_id))
+
+    def compact(self) -> list[str]:
+        # physically remove tombstoned vectors, docstore cleanup is left to the caller,
+        # which calls release_tombstones() after it
+        with self._lock:
+            ids = set(self.tombstones)
+            positions = [i for i, id in self.index_to_docstore_id.items() if id in ids]
+            if positions:
+                self.ensure_writable()
+                self.index.remove_ids(np.array(positions, dtype=np.int64))
+                removed = set(positions)
+                remaining = [
+                    id
+                    for i, id in sorted(self.index_to_docstore_id.items())
+                    if i not in removed
+                ]
+                self.index_to_docstore_id = dict(enumerate(remaining))
+            return list(ids)
+
+    def live_filter(
+        self, filter: Callable[[dict[str, Any]], bool] | None
+    ) -> Callable[[dict[str, Any]], bool] | None:
+        if not self.tombstones:
+            return filter
+        tombstones = self.tombstones
+        return lambda metadata: metadata.get("id") not in tombstones and (
+            filter is None or bool(filter(metadata))
+        )
+
+    def similarity_search_with_score_by_vector(self, *args: Any, **kwargs: Any):
+        with self._lock:
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+
+    async def asearch_threshold(
+        self,
+        query: str,
+        k: int,
+        score_threshold: float,
+        filter: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> List[Document]:
+        kwargs = {}
+        if self.tombstones:
+            # filtered searches only look at fetch_k candidates, leave room for tombstones
+            kwargs["fetch_k"] = max(20, k) + len(self.tombstones)
+        return await self.asearch(
+            query,
+            search_type="similarity_score_threshold",
+            k=k,
+            score_threshold=score_threshold,
+            filter=self.live_filter(filter),
+            **kwargs,
+        )
+
+    def set_docstore(self, docstore: DiskDocstore):
+        # documents moved to disk, their keyword postings too
+        self.docstore = docstore
+        self.keyword_index = None
+
+    def keyword_search(
+        self, query: str, k: int, filter: Callable[[str], bool] | None = None
+    ) -> list[tuple[str, float]]:
+        tombstones = self.tombstones
+        if tombstones:
+            # postings of deleted documents stay on disk until compaction
+            id_filter = filter
+            filter = lambda id: id not in tombstones and (id_filter is None or id_filter(id))
+        if self.keyword_index is None:
+            return self.docstore.keyword_search(query, limit=k, filter=filter)  # type: ignore
+        return self.keyword_index.search(query, limit=k, filter=filter)
+
+    # keep the keyword index in sync with inserts and deletes
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: List[dict] | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        with self._lock:
+            self.ensure_writable()
+            ids = super().add_texts(texts, metadatas=metadatas, ids=ids, **kwargs)
+            self.bump_version()
+        if self.keyword_index is not None:
+            self.keyword_index.add_many(zip(ids, texts))
+        return ids
+
+    async def aadd_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: List[dict] | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        # embed outside of the lock, FAISS.aadd_texts would hold it while awaiting
+        embeddings = await self._aembed_documents(texts)
+        return self.add_embeddings(
+            zip(texts, embeddings), metadatas=metadatas, ids=ids, **kwargs
+        )
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[tuple[str, List[float]]],
+        metadatas: List[dict] | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        text_embeddings = list(text_embeddings)
+        with self._lock:
+            self.ensure_writable()
+            ids = super().add_embeddings(
+                text_embeddings, metadatas=metadatas, ids=ids, **kwargs
+            )
+            self.bump_version()
+        if self.keyword_index is not None:
+            self.keyword_index.add_many(zip(ids, (t for t, _ in text_embeddings)))
+        return ids
+
+    def delete(self, ids: List[str] | None = None, **kwargs: Any) -> bool | None:
+        with self._lock:
+            self.ensure_writable()
+            result = super().delete(ids, **kwargs)
+            self.bump_version()
+        if ids and self.keyword_index is not None:
+            self.keyword_index.remove(ids)
+        return result
+
+    async def ahybrid_search(
+        self,
+        query: str,
+        k: int,
+        score_threshold: float,
+        filter: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> List[Document]:
+        # vector results above threshold
+        vector_docs = await self.asearch_threshold(
+            query, k=k, score_threshold=score_threshold, filter=filter
+        )
+        # exact keyword matches, mostly identifiers the embedding misses
+        all_docs = self.get_all_docs()
+        keyword_hits = await asyncio.to_thread(
+            self.keyword_search, query, k, metadata_filter(all_docs, filter)
+        )
+        if not keyword_hits:
+            return vector_docs
+
+        # fuse both rankings, docs found by both rise to the top
+        by_id = {doc.metadata.get("id", ""): doc for doc in vector_docs}
+        fused = reciprocal_rank_fusion(
+            [list(by_id.keys()), [id for id, _ in keyword_hits]], limit=k
+        )
+        return [by_id[id] if id in by_id else all_docs[id] for id in fused]
+
+
+class LiveDocs(Mapping):
+    # docstore view without tombstoned documents
+    def __init__(self, docs: Mapping[str, Document], tombstones: set[str]):
+        self.docs = docs
+        self.tombstones = tombstones
+
+    def __getitem__(self, id: str) -> Document:
+        if id in self.tombstones:
+            raise KeyError(id)
+        return self.docs[id]
+
+    def __contains__(self, id: object) -> bool:
+        return id not in self.tombstones and id in self.docs
+
+    def __iter__(self):
+        return (id for id in self.docs if id not in self.tombstones)
+
+    def __len__(self) -> int:
+        return len(self.docs) - len(self.tombstones)
+
+    def items(self):  # type: ignore
+        return (
+            (id, doc) for id, doc in self.docs.items() if id not in self.tombstones
+        )
+
+    def values(self):  # type: ignore
+        return (doc for _, doc in self.items())
+
 
 class VectorDB:
 
@@ -77,9 +320,8 @@ class VectorDB:
     ):
         comparator = get_comparator(filter) if filter else None
 
-        return await self.db.asearch(
+        return await self.db.ahybrid_search(
             query,
-            search_type="similarity_score_threshold",
             k=limit,
             score_threshold=threshold,
             filter=comparator,
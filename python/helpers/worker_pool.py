@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Hashable
+
+from python.helpers.defer import DeferredTask
+
+# what submit does when a job with the same key is running
+POLICY_SKIP = "skip"  # drop the new job
+POLICY_QUEUE = "queue"  # run it after the running one
+POLICY_REPLACE = "replace"  # cancel the running one, run the new one next
+
+# submit results
+STARTED = "started"
+QUEUED = "queued"
+SKIPPED = "skipped"
+REPLACED = "replaced"
+REJECTED = "rejected"
+
+Job = Callable[[], Coroutine[Any, Any, Any]]
+
+
+@dataclass
+class _Run:
+    deferred: DeferredTask
+    task: "asyncio.Task | None" = None
+    cancelled: bool = False
+
+
+class WorkerPool:
+    """Runs coroutine jobs on a background event loop, at most max_workers at once.
+    Jobs over capacity wait in a priority queue, higher priority first, then in submit order.
+    One job per key runs at a time and at most one more waits for it."""
+
+    def __init__(self, max_workers: int, max_queue: int = 100, thread_name: str = "WorkerPool"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.thread_name = thread_name
+        self._lock = threading.RLock()
+        # (-priority, submit no, key)
+        self._queue: list[tuple[int, int, Hashable]] = []
+        # key -> (job, submit time) waiting in the queue
+        self._pending: dict[Hashable, tuple[Job, float]] = {}
+        self._running: dict[Hashable, _Run] = {}
+        self._counter = itertools.count()
+        self._stats = {
+            "started": 0,
+            "completed": 0,
+            "skipped": 0,
+            "replaced": 0,
+            "rejected": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    def submit(self, key: Hashable, job: Job, priority: int = 0, policy: str = POLICY_SKIP) -> str:
+        with self._lock:
+            running = key in self._running
+            if key in self._pending:
+                if policy != POLICY_REPLACE:
+                    self._stats["skipped"] += 1
+                    return SKIPPED
+                # the waiting job is replaced, the running one too
+                self._pending[key] = (job, self._pending[key][1])
+            elif running and policy == POLICY_SKIP:
+                self._stats["skipped"] += 1
+                return SKIPPED
+            elif len(self._pending) >= self.max_queue:
+                self._stats["rejected"] += 1
+                return REJECTED
+            else:
+                self._pending[key] = (job, time.time())
+                heapq.heappush(self._queue, (-priority, next(self._counter), key))
+
+            result = QUEUED
+            if running and policy == POLICY_REPLACE:
+                self._cancel(self._running[key])
+                self._stats["replaced"] += 1
+                result = REPLACED
+            self._dispatch()
+            if key in self._pending:
+                self._stats["queued"] += 1
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._pending))
+                return result
+            return STARTED if result == QUEUED else result
+
+    def is_running(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._running
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            waited = stats["started"]
+            stats["wait_ms_avg"] = round(stats["wait_ms_total"] / waited, 2) if waited else 0.0
+            stats["wait_ms_max"] = round(stats["wait_ms_max"], 2)
+            del stats["wait_ms_total"]
+            now = time.time()
+            oldest = min((submitted for _, submitted in self._pending.values()), default=now)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": len(self._running),
+                "queue_depth": len(self._pending),
+                "oldest_wait_ms": round((now - oldest) * 1000, 2),
+                **stats,
+            }
+
+    def _dispatch(self):
+        # start waiting jobs while workers are free, a job waits while its key runs
+        blocked = []
+        while self._queue and len(self._running) < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            key = entry[2]
+            if key in self._running:
+                blocked.append(entry)
+                continue
+            job, submitted = self._pending.pop(key)
+            self._start(key, job, submitted)
+        for entry in blocked:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, key: Hashable, job: Job, submitted: float):
+        wait_ms = (time.time() - submitted) * 1000
+        self._stats["started"] += 1
+        self._stats["wait_ms_total"] += wait_ms
+        self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+        run = _Run(DeferredTask(thread_name=self.thread_name))
+        # registered before it starts, the job may finish before start_task returns
+        self._running[key] = run
+        run.deferred.start_task(self._run, key, run, job)
+
+    def _cancel(self, run: _Run):
+        # the key is released when the job has unwound, so the next one never overlaps it
+        run.cancelled = True
+        loop = run.deferred.event_loop_thread.loop
+        if run.task and loop:
+            loop.call_soon_threadsafe(run.task.cancel)
+
+    async def _run(self, key: Hashable, run: _Run, job: Job):
+        run.task = asyncio.current_task()
+        try:
+            if not run.cancelled:
+                await job()
+        finally:
+            with self._lock:
+                if self._running.get(key) is run:
+                    del self._running[key]
+                self._stats["completed"] += 1
+                self._dispatch()
@@ -0,0 +1,92 @@
+"""
+Tests for serving the Flask app over ASGI.
+"""
+
+import asyncio
+import threading
+
+import httpx
+from flask import Flask, Response, session
+
+from python.helpers.asgi_server import FlaskAsgi
+
+
+def _app() -> Flask:
+    app = Flask("test_asgi_server")
+    app.secret_key = "test"
+
+    @app.route("/session/set", methods=["POST"])
+    async def session_set():
+        session["user"] = "alice"
+        return "ok"
+
+    @app.route("/session/get")
+    async def session_get():
+        return session.get("user", "")
+
+    @app.route("/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    @app.route("/fail_sync")
+    def fail_sync():
+        raise RuntimeError("boom")
+
+    @app.route("/stream")
+    def stream():
+        return Response((f"chunk{i}\n" for i in range(3)), mimetype="text/plain")
+
+    @app.route("/thread")
+    async def thread():
+        return str(threading.get_ident())
+
+    @app.route("/blocking_thread")
+    async def blocking_thread():
+        return str(threading.get_ident())
+
+    return app
+
+
+def _request(asgi: FlaskAsgi, *calls: tuple[str, str]) -> list[httpx.Response]:
+    async def run():
+        transport = httpx.ASGITransport(app=asgi)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.request(method, url) for method, url in calls]
+
+    # the loop runs in this thread
+    return asyncio.run(run())
+
+
+class TestFlaskAsgi:
+
+    def test_session_round_trip(self):
+        asgi = FlaskAsgi(_app())
+        set_response, get_response = _request(asgi, ("POST", "/session/set"), ("GET", "/session/get"))
+        assert set_response.status_code == 200
+        assert "session" in set_response.cookies
+        assert get_response.text == "alice"
+        asgi.shutdown()
+
+    def test_exceptions_are_500(self):
+        asgi = FlaskAsgi(_app(), blocking={"fail"})
+        for response in _request(asgi, ("GET", "/fail"), ("GET", "/fail_sync")):
+            assert response.status_code == 500
+        asgi.shutdown()
+
+        asgi = FlaskAsgi(_app())
+        assert _request(asgi, ("GET", "/fail"))[0].status_code == 500
+        asgi.shutdown()
+
+    def test_streamed_body(self):
+        asgi = FlaskAsgi(_app())
+        response = _request(asgi, ("GET", "/stream"))[0]
+        assert response.status_code == 200
+        assert response.text == "chunk0\nchunk1\nchunk2\n"
+        asgi.shutdown()
+
+    def test_blocking_views_run_off_the_loop(self):
+        asgi = FlaskAsgi(_app(), blocking={"blocking_thread"})
+        on_loop, off_loop = _request(asgi, ("GET", "/thread"), ("GET", "/blocking_thread"))
+        assert int(on_loop.text) == threading.get_ident()
+        assert int(off_loop.text) != threading.get_ident()
+        asgi.shutdown()
@@ -0,0 +1,40 @@
+"""
+Tests for the binary chat snapshot and journal encoding.
+"""
+
+import pytest
+
+from python.helpers import chat_codec
+
+
+class TestChatCodec:
+
+    def test_snapshot_roundtrip(self):
+        data = {
+            "id": "ctx",
+            "agents": [{"number": 0, "data": {"n": 1}, "history": "x" * 10_000}],
+            "log": {"logs": [{"no": 0, "content": "ünïcode"}]},
+            "skipped": object(),
+        }
+        raw = chat_codec.encode(data)
+
+        assert chat_codec.is_binary(raw)
+        assert len(raw) < 1000
+        decoded = chat_codec.decode(raw)
+        assert decoded["agents"] == data["agents"]
+        assert decoded["log"] == data["log"]
+        assert decoded["skipped"] is None
+
+    def test_records_stop_at_torn_write(self):
+        raw = chat_codec.journal_header()
+        raw += chat_codec.encode_record({"op": "start"})
+        raw += chat_codec.encode_record({"op": "context", "name": "a"})
+        torn = chat_codec.encode_record({"op": "context", "name": "b"})
+
+        records = list(chat_codec.decode_records(raw + torn[:-3]))
+
+        assert records == [{"op": "start"}, {"op": "context", "name": "a"}]
+
+    def test_rejects_other_files(self):
+        with pytest.raises(ValueError):
+            chat_codec.decode(b'{"id": "ctx"}')
@@ -0,0 +1,115 @@
+"""
+Tests for replaying the append-only chat journal onto a chat.json snapshot.
+"""
+
+import json
+
+import pytest
+
+from python.helpers import chat_journal
+
+
+def _snapshot(snapshot_id="s1"):
+    history = {
+        "_cls": "History",
+        "bulks": [],
+        "topics": [],
+        "current": {
+            "_cls": "Topic",
+            "summary": "",
+            "messages": [{"_cls": "Message", "ai": False, "content": "hi"}],
+        },
+    }
+    return {
+        "id": "ctx",
+        "name": "chat",
+        "journal": snapshot_id,
+        "agents": [{"number": 0, "data": {}, "history": json.dumps(history)}],
+        "log": {
+            "guid": "g1",
+            "logs": [{"no": 0, "type": "user", "content": "hi"}],
+            "progress": "",
+            "progress_no": 0,
+        },
+    }
+
+
+def _write(path, snapshot_id, ops, binary=False):
+    chat_journal.start_journal(str(path), snapshot_id, binary)
+    chat_journal.append(str(path), ops, binary)
+
+
+class TestChatJournal:
+
+    def test_replay_appends_and_updates(self, tmp_path):
+        path = tmp_path / chat_journal.JOURNAL_FILE_NAME
+        message = {"_cls": "Message", "ai": True, "content": "hello"}
+        _write(
+            path,
+            "s1",
+            [
+                {"op": "context", "name": "renamed"},
+                {"op": "history_append", "number": 0, "start": 1, "messages": [message]},
+                # replaced from the same index again, e.g. after a crash and resave
+                {"op": "history_append", "number": 0, "start": 1, "messages": [message]},
+                {"op": "new_topic", "number": 0},
+                {"op": "history_append", "number": 0, "start": 0, "messages": [message]},
+                {"op": "agents", "numbers": [0, 1]},
+                {"op": "agent_data", "number": 1, "data": {"x": 1}},
+                {
+                    "op": "log",
+                    "guid": "g1",
+                    "items": [
+                        {"no": 0, "type": "user", "content": "hi!"},
+                        {"no": 1, "type": "response", "content": "hello"},
+                    ],
+                    "progress": "done",
+                    "progress_no": 1,
+                },
+            ],
+        )
+
+        data = chat_journal.replay(_snapshot(), str(path))
+
+        assert data["name"] == "renamed"
+        history = json.loads(data["agents"][0]["history"])
+        topic = history["topics"][0]
+        assert [m["content"] for m in topic["messages"]] == ["hi", "hello"]
+        assert [m["content"] for m in history["current"]["messages"]] == ["hello"]
+        assert data["agents"][1] == {"number": 1, "data": {"x": 1}, "history": ""}
+        assert [item["content"] for item in data["log"]["logs"]] == ["hi!", "hello"]
+        assert data["log"]["progress"] == "done"
+
+    def test_log_reset_and_size(self, tmp_path):
+        path = tmp_path / chat_journal.JOURNAL_FILE_NAME
+        items = [{"no": i, "type": "info", "content": str(i)} for i in range(5)]
+        _write(path, "s1", [{"op": "log", "guid": "g2", "reset": True, "items": items}])
+
+        data = chat_journal.replay(_snapshot(), str(path), log_size=3)
+
+        assert data["log"]["guid"] == "g2"
+        assert [item["content"] for item in data["log"]["logs"]] == ["2", "3", "4"]
+
+    def test_ignores_stale_journal_and_torn_lines(self, tmp_path):
+        path = tmp_path / chat_journal.JOURNAL_FILE_NAME
+        _write(path, "old", [{"op": "context", "name": "stale"}])
+        assert chat_journal.replay(_snapshot(), str(path))["name"] == "chat"
+
+        _write(path, "s1", [{"op": "context", "name": "new"}])
+        with open(path, "a") as f:
+            f.write('{"op": "context", "na')
+        assert chat_journal.replay(_snapshot(), str(path))["name"] == "new"
+
+    def test_binary_journal(self, tmp_path):
+        pytest.importorskip("msgpack")
+        path = tmp_path / chat_journal.JOURNAL_FILE_NAME
+        _write(path, "s1", [{"op": "context", "name": "binary"}], binary=True)
+        with open(path, "ab") as f:
+            f.write(b"\x40\x00\x00\x00torn")
+
+        assert chat_journal.replay(_snapshot(), str(path))["name"] == "binary"
+
+    def test_should_compact(self):
+        assert not chat_journal.should_compact(1000, 10_000)
+        assert chat_journal.should_compact(chat_journal.COMPACT_MIN_SIZE + 1, 0)
+        assert chat_journal.should_compact(6_000_000, 10_000_000)
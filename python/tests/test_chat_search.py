@@ -0,0 +1,58 @@
+"""
+Tests for the full-text index over saved chat logs.
+"""
+
+from python.helpers.chat_search import ChatSearchIndex
+
+
+def _item(no, content, heading=""):
+    return {"no": no, "type": "agent", "heading": heading, "content": content}
+
+
+class TestChatSearchIndex:
+
+    def test_search_returns_chat_position_and_snippet(self, tmp_path):
+        index = ChatSearchIndex(str(tmp_path / "search.sqlite"))
+        index.update("a", "g1", [_item(0, "deploying the docker image"), _item(1, "all done")])
+        index.update("b", "g2", [_item(0, "the docker daemon failed to start")])
+
+        results = index.search("docker")
+        assert {(r["ctxid"], r["no"]) for r in results} == {("a", 0), ("b", 0)}
+        assert "**docker**" in results[0]["snippet"]
+        assert [r["ctxid"] for r in index.search("docker daemon")] == ["b"]
+        assert [r["ctxid"] for r in index.search("docker", ctxid="a")] == ["a"]
+        index.close()
+
+    def test_update_replaces_items_and_resets_on_new_log(self, tmp_path):
+        index = ChatSearchIndex(str(tmp_path / "search.sqlite"))
+        index.update("a", "g1", [_item(0, "streaming partial"), _item(1, "other")])
+        index.update("a", "g1", [_item(0, "streaming finished")])
+        assert index.search("partial") == []
+        assert index.search("finished")[0]["no"] == 0
+        assert index.search("other")[0]["no"] == 1
+
+        index.update("a", "g2", [_item(0, "fresh log")])
+        assert index.search("other") == []
+
+        index.remove("a")
+        assert index.search("fresh") == []
+        assert index.indexed_ids() == set()
+        index.close()
+
+    def test_full_update_replaces_renumbered_log(self, tmp_path):
+        index = ChatSearchIndex(str(tmp_path / "search.sqlite"))
+        index.update("a", "g1", [_item(0, "first"), _item(1, "second"), _item(2, "third")])
+        # the saved log kept its last two items, numbered from 0 again on load
+        index.update("a", "g1", [_item(0, "second"), _item(1, "third")], full=True)
+        assert index.search("first") == []
+        assert [r["no"] for r in index.search("second")] == [0]
+        assert [r["no"] for r in index.search("third")] == [1]
+        index.close()
+
+    def test_query_syntax_is_escaped(self, tmp_path):
+        index = ChatSearchIndex(str(tmp_path / "search.sqlite"))
+        index.update("a", "g1", [_item(0, 'error in "main.py" AND NOT (x) *')])
+        assert index.search('"main.py"')[0]["ctxid"] == "a"
+        assert index.search("NOT (x) *")[0]["ctxid"] == "a"
+        assert index.search("   ") == []
+        index.close()
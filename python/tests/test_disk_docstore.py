@@ -0,0 +1,71 @@
+"""
+Tests for the SQLite backed docstore used by Memory.
+"""
+
+from langchain_core.documents import Document
+
+from python.helpers.disk_docstore import DiskDocstore
+
+
+class TestDiskDocstore:
+
+    def test_add_search_delete(self, tmp_path):
+        store = DiskDocstore(str(tmp_path))
+        store.add(
+            {
+                "a": Document(page_content="alpha", metadata={"area": "main"}),
+                "b": Document(page_content="beta", metadata={"area": "fragments"}),
+            }
+        )
+
+        doc = store.search("a")
+        assert isinstance(doc, Document)
+        assert doc.page_content == "alpha"
+        assert doc.metadata == {"area": "main"}
+        assert isinstance(store.search("missing"), str)
+
+        store.delete(["a"])
+        assert "a" not in store._dict
+        assert len(store._dict) == 1
+
+    def test_persists_between_instances(self, tmp_path):
+        DiskDocstore(str(tmp_path)).add({"a": Document(page_content="alpha")})
+        assert DiskDocstore.exists(str(tmp_path))
+        assert DiskDocstore(str(tmp_path))._dict["a"].page_content == "alpha"
+
+    def test_dict_view_iterates_in_batches(self, tmp_path):
+        store = DiskDocstore(str(tmp_path))
+        store.add({str(i): Document(page_content=f"doc {i}") for i in range(25)})
+        items = list(store.iter_items(batch_size=10))
+        assert len(items) == 25
+        assert set(store._dict) == {str(i) for i in range(25)}
+        assert store._dict.get("missing") is None
+
+    def test_keyword_search_follows_add_and_delete(self, tmp_path):
+        store = DiskDocstore(str(tmp_path))
+        store.add(
+            {
+                "a": Document(page_content="The deployment failed with error ERR_4711"),
+                "b": Document(page_content="Deployment pipeline runs nightly"),
+                "c": Document(page_content="Function parse_config reads settings"),
+            }
+        )
+        assert store.keyword_search("why did ERR_4711 happen in deployment", limit=5)[0][0] == "a"
+        assert [id for id, _ in store.keyword_search("parse", limit=5)] == ["c"]
+        # only common words of the query match
+        assert store.keyword_search("deployment ERR_9999", limit=5) == []
+        assert store.keyword_search("deployment", limit=5, filter=lambda id: id == "b")[0][0] == "b"
+
+        store.add({"c": Document(page_content="completely different text")})
+        assert store.keyword_search("parse_config", limit=5) == []
+        store.delete(["a"])
+        assert store.keyword_search("ERR_4711", limit=5) == []
+
+    def test_keywords_of_earlier_docstores_are_indexed_on_open(self, tmp_path):
+        store = DiskDocstore(str(tmp_path))
+        store.add({"a": Document(page_content="error ERR_4711")})
+        with store._conn:
+            store._conn.execute("DROP TABLE docs_fts_vocab")
+            store._conn.execute("DROP TABLE docs_fts")
+        store.close()
+        assert DiskDocstore(str(tmp_path)).keyword_search("ERR_4711", limit=5)[0][0] == "a"
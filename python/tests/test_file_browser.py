@@ -0,0 +1,50 @@
+import os
+
+from python.helpers import file_browser
+from python.helpers.file_browser import FileBrowser
+
+
+def _tree(tmp_path):
+    (tmp_path / "b_dir").mkdir()
+    (tmp_path / "A_dir").mkdir()
+    (tmp_path / "b_dir" / "inner.txt").write_bytes(b"x" * 30)
+    for i, name in enumerate(["c.py", "a.txt", "B.py", "d.md"]):
+        (tmp_path / name).write_bytes(b"x" * (10 - i))
+    os.symlink(tmp_path / "a.txt", tmp_path / "link.txt")
+    return FileBrowser(), str(tmp_path).lstrip("/")
+
+
+def test_listing_is_sorted_filtered_and_paged(tmp_path):
+    browser, path = _tree(tmp_path)
+    first = browser.get_files(path, limit=3)
+    assert [e["name"] for e in first["entries"]] == ["A_dir", "b_dir", "a.txt"]
+    assert first["total"] == 7 and first["next_cursor"]
+    assert first["entries"][0]["is_dir"] and first["entries"][0]["size"] == 0
+
+    # a file added before the cursor does not shift the next page
+    (tmp_path / "0.txt").write_text("")
+    second = browser.get_files(path, cursor=first["next_cursor"], limit=3)
+    assert [e["name"] for e in second["entries"]] == ["B.py", "c.py", "d.md"]
+    last = browser.get_files(path, cursor=second["next_cursor"], limit=3)
+    assert [e["name"] for e in last["entries"]] == ["link.txt"] and not last["next_cursor"]
+    assert last["entries"][0]["is_symlink"] and last["entries"][0]["size"] == 9
+
+    by_size = browser.get_files(path, sort_by="size", direction="desc", filter="*.py")
+    assert [e["name"] for e in by_size["entries"]] == ["c.py", "B.py"]
+    assert [e["name"] for e in browser.get_files(path, filter="DIR")["entries"]] == ["A_dir", "b_dir"]
+
+
+def test_dir_size_is_cached_until_folder_changes(tmp_path, monkeypatch):
+    browser, path = _tree(tmp_path)
+    monkeypatch.setattr(file_browser, "_dir_cache", {})
+    result = browser.get_dir_size(path)
+    assert result == {"path": path, "size": 30 + 10 + 9 + 8 + 7, "files": 5, "complete": True}
+
+    scans = []
+    scan = file_browser._scan_dir_size
+    monkeypatch.setattr(file_browser, "_scan_dir_size", lambda *a: scans.append(a[0]) or scan(*a))
+    assert browser.get_dir_size(path)["size"] == 64 and not scans
+
+    (tmp_path / "b_dir" / "new.bin").write_bytes(b"x" * 100)
+    assert browser.get_dir_size(path)["size"] == 164
+    assert scans == [str(tmp_path / "b_dir")]
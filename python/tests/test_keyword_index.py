@@ -0,0 +1,81 @@
+"""
+Tests for the BM25 keyword index and reciprocal rank fusion.
+"""
+
+from python.helpers.keyword_index import (
+    KeywordIndex,
+    metadata_filter,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+class _Doc:
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+
+class TestTokenize:
+
+    def test_compound_identifiers_kept_whole(self):
+        tokens = tokenize("Call get_settings() on ERR-1234")
+        assert "get_settings" in tokens
+        assert "get" in tokens and "settings" in tokens
+        assert "err-1234" in tokens
+
+    def test_stopwords_dropped(self):
+        assert tokenize("the and of") == []
+
+
+class TestKeywordIndex:
+
+    def _index(self):
+        index = KeywordIndex()
+        index.add("a", "The deployment failed with error ERR_4711 in the pipeline")
+        index.add("b", "Deployment pipeline runs nightly and deploys the app")
+        index.add("c", "Function parse_config reads settings from disk")
+        return index
+
+    def test_exact_identifier_ranks_first(self):
+        hits = self._index().search("why did ERR_4711 happen in deployment", limit=5)
+        assert hits[0][0] == "a"
+
+    def test_common_words_only_do_not_match(self):
+        # "deployment" alone does not cover the weight of the unknown identifier
+        hits = self._index().search("deployment ERR_9999", limit=5)
+        assert hits == []
+
+    def test_remove_updates_postings(self):
+        index = self._index()
+        index.remove(["c"])
+        assert "c" not in index
+        assert index.search("parse_config", limit=5) == []
+        assert "parse_config" not in index.postings
+
+    def test_readd_replaces_document(self):
+        index = self._index()
+        index.add("c", "completely different text")
+        assert index.search("parse_config", limit=5) == []
+        assert len(index) == 3
+
+    def test_filter_and_limit(self):
+        index = self._index()
+        docs = {"a": _Doc({"area": "main"}), "b": _Doc({"area": "fragments"})}
+        hits = index.search(
+            "deployment pipeline",
+            limit=5,
+            filter=metadata_filter(docs, lambda m: m["area"] == "fragments"),
+        )
+        assert [id for id, _ in hits] == ["b"]
+        assert len(index.search("deployment pipeline", limit=1)) == 1
+
+
+class TestReciprocalRankFusion:
+
+    def test_shared_results_rise(self):
+        fused = reciprocal_rank_fusion([["x", "y", "z"], ["z", "w"]])
+        assert fused[0] == "z"
+        assert set(fused) == {"x", "y", "z", "w"}
+
+    def test_limit(self):
+        assert reciprocal_rank_fusion([["x", "y"], ["y"]], limit=1) == ["y"]
@@ -0,0 +1,58 @@
+"""
+Tests for coalesced log updates and stream throttling.
+"""
+
+from python.helpers.log import Log, StreamThrottle
+
+
+class TestLogUpdates:
+
+    def test_streamed_updates_are_coalesced(self):
+        log = Log()
+        first = log.log(type="agent", heading="first")
+        second = log.log(type="agent", heading="second")
+        for i in range(100):
+            first.stream(content=str(i))
+
+        # one entry per item, no matter how often it was updated
+        assert len(log.updates) == 2
+        assert log.version == 102
+
+        out = log.output(start=0)
+        assert [item["no"] for item in out] == [0, 1]
+        assert out[0]["content"] == "".join(str(i) for i in range(100))
+
+        # only items changed after the client's version
+        version = log.version
+        second.update(content="done")
+        assert [item["no"] for item in log.output(start=version)] == [1]
+        assert log.output(start=log.version) == []
+
+    def test_output_up_to_version(self):
+        log = Log()
+        log.log(type="info", heading="a")
+        version = log.version
+        log.log(type="info", heading="b")
+        assert [item["heading"] for item in log.output(start=0, end=version)] == ["a"]
+
+    def test_reset(self):
+        log = Log()
+        log.log(type="info", heading="a")
+        guid = log.guid
+        log.reset()
+        assert log.guid != guid
+        assert log.version == 0
+        assert log.output() == []
+
+
+class TestStreamThrottle:
+
+    def test_throttle(self):
+        throttle = StreamThrottle(fps=1)
+        assert throttle.ready()
+        assert not throttle.ready()
+        assert throttle.pending
+
+        unlimited = StreamThrottle(fps=0)
+        assert unlimited.ready() and unlimited.ready()
+        assert not unlimited.pending
@@ -0,0 +1,57 @@
+"""
+Tests for the columnar memory export format.
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from python.helpers.memory_columnar import ColumnarReader, ColumnarWriter, RowGroup
+
+
+def _group(start: int, count: int, dim: int) -> RowGroup:
+    return RowGroup(
+        id=[f"id{i}" for i in range(start, start + count)],
+        area=["main"] * count,
+        timestamp=["2025-01-01 00:00:00"] * count,
+        metadata=[{"source_file": f"f{i}.md"} for i in range(start, start + count)],
+        text=[f"text {i}" for i in range(start, start + count)],
+        vector=np.arange(count * dim, dtype=np.float32).reshape(count, dim) + start,
+    )
+
+
+class TestColumnarFormat:
+
+    def test_roundtrip_row_groups(self):
+        buffer = io.BytesIO()
+        writer = ColumnarWriter(buffer, "huggingface/model", dim=4)
+        writer.write(_group(0, 3, 4))
+        writer.write(_group(3, 2, 4))
+        writer.close()
+        assert writer.rows == 5
+
+        buffer.seek(0)
+        reader = ColumnarReader(buffer)
+        assert reader.embedding_model == "huggingface/model"
+        assert reader.dim == 4
+
+        groups = list(reader)
+        assert [len(g) for g in groups] == [3, 2]
+        assert groups[1].id == ["id3", "id4"]
+        assert np.array_equal(groups[0].vector, _group(0, 3, 4).vector)
+        assert groups[0].full_metadata(1) == {
+            "source_file": "f1.md",
+            "id": "id1",
+            "area": "main",
+            "timestamp": "2025-01-01 00:00:00",
+        }
+
+    def test_rejects_wrong_vector_shape(self):
+        writer = ColumnarWriter(io.BytesIO(), "m", dim=8)
+        with pytest.raises(ValueError):
+            writer.write(_group(0, 2, 4))
+
+    def test_rejects_foreign_file(self):
+        with pytest.raises(ValueError):
+            ColumnarReader(io.BytesIO(b"not an export"))
@@ -0,0 +1,38 @@
+"""
+Tests for the versioned LRU used to cache memory search results.
+"""
+
+from python.helpers.query_cache import QueryCache
+
+
+class TestQueryCache:
+
+    def test_hit_and_version_invalidation(self):
+        cache = QueryCache(max_size=4)
+        assert cache.get("q", 0) is None
+        cache.put("q", 0, ["doc"])
+        assert cache.get("q", 0) == ["doc"]
+
+        # the store changed since the entry was cached
+        assert cache.get("q", 1) is None
+        assert len(cache) == 0
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == round(1 / 3, 4)
+
+    def test_lru_eviction(self):
+        cache = QueryCache(max_size=2)
+        cache.put("a", 0, 1)
+        cache.put("b", 0, 2)
+        cache.get("a", 0)  # a is now most recently used
+        cache.put("c", 0, 3)
+        assert cache.get("b", 0) is None
+        assert cache.get("a", 0) == 1
+        assert cache.get("c", 0) == 3
+
+    def test_ttl_expiry(self):
+        cache = QueryCache(ttl=0)
+        cache.put("q", 0, 1)
+        assert cache.get("q", 0) is None
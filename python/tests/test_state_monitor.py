@@ -0,0 +1,48 @@
+"""
+Tests for the change signal used by pushed UI updates.
+"""
+
+import threading
+import time
+
+from python.helpers import state_monitor
+from python.helpers.log import Log
+
+
+class TestStateMonitor:
+
+    def test_wait_times_out_without_changes(self):
+        seq = state_monitor.get_seq()
+        start = time.monotonic()
+        assert state_monitor.wait(seq, 0.05) == seq
+        assert time.monotonic() - start >= 0.04
+
+    def test_wait_wakes_on_notify(self):
+        seq = state_monitor.get_seq()
+        timer = threading.Timer(0.01, state_monitor.notify)
+        timer.start()
+        assert state_monitor.wait(seq, 5) != seq
+        timer.join()
+
+    def test_log_changes_notify(self):
+        log = Log()
+        seq = state_monitor.get_seq()
+        item = log.log(type="info", content="a")
+        assert state_monitor.wait(seq, 0) != seq
+
+        seq = state_monitor.get_seq()
+        item.update(content="b")
+        assert state_monitor.get_seq() != seq
+
+    def test_wait_for_ignores_other_sources(self):
+        mine, other = Log(), Log()
+        seq = state_monitor.get_seq()
+        other.log(type="info", content="elsewhere")
+        assert not state_monitor.wait_for(seq, mine, 0.05)
+
+        mine.log(type="info", content="here")
+        assert state_monitor.wait_for(seq, mine, 0)
+
+        seq = state_monitor.get_seq()
+        state_monitor.notify()  # shared changes concern every stream
+        assert state_monitor.wait_for(seq, mine, 0)
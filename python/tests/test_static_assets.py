@@ -0,0 +1,45 @@
+import json
+import re
+
+from python.helpers import static_assets
+
+
+def _webui(tmp_path, monkeypatch):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "js" / "api.js").write_text("export const a = 1;")
+    (tmp_path / "vendor" / "lib.js").write_text("var lib = 1;")
+    (tmp_path / "index.css").write_text("body {}")
+    monkeypatch.setattr(static_assets, "WEBUI_FOLDER", str(tmp_path))
+    monkeypatch.setattr(static_assets, "_assets", {})
+    monkeypatch.setattr(static_assets, "_scanned", False)
+
+
+def test_hashed_urls_resolve_to_current_content(tmp_path, monkeypatch):
+    _webui(tmp_path, monkeypatch)
+    url = static_assets.url_for("js/api.js")
+    assert re.fullmatch(r"/js/api\.[0-9a-f]{12}\.js", url)
+    asset, immutable = static_assets.resolve(url)
+    assert asset and asset.path == "js/api.js" and immutable
+
+    # an edited file gets a new hash, the old URL is no longer pinned
+    (tmp_path / "js" / "api.js").write_text("export const a = 2;")
+    asset, immutable = static_assets.resolve(url)
+    assert asset and not immutable
+    assert static_assets.url_for("js/api.js") != url
+    assert static_assets.resolve("../outside.js") == (None, False)
+
+
+def test_rewrite_html_uses_hashed_urls_and_import_map(tmp_path, monkeypatch):
+    _webui(tmp_path, monkeypatch)
+    html = static_assets.rewrite_html(
+        '<head><link href="index.css"><script type="module" src="./js/api.js"></script>'
+        '<script src="vendor/lib.js"></script><a href="https://x.org/a.js"></a></head>'
+    )
+    api = static_assets.url_for("js/api.js")
+    assert f'src="{api}"' in html
+    assert f'href="{static_assets.url_for("index.css")}"' in html
+    assert re.search(r'src="/vendor/lib\.js\?v=[0-9a-f]{12}"', html)
+    assert 'href="https://x.org/a.js"' in html
+    importmap = re.search(r'<script type="importmap">(.*?)</script>', html)
+    assert importmap and json.loads(importmap.group(1))["imports"] == {"/js/api.js": api}
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from python.helpers import task_process
+from python.helpers.log import Log
+from python.helpers.task_process import TaskProcessError
+
+
+def test_log_changes_of_a_truncated_worker_log_land_on_main_items():
+    main = Log()
+    for heading in ["a", "b", "c", "d", "e"]:
+        main.log(type="agent", heading=heading)
+    # the saved chat the worker loads keeps only the last items
+    worker = Log()
+    items = [worker.log(type="agent", heading=heading) for heading in ["c", "d", "e"]]
+    offset = len(main.logs) - len(worker.logs)
+    version = worker.version
+    items[2].update(heading="e2")
+    worker.log(type="agent", heading="f")
+
+    message = task_process._log_message(worker, version, worker.version, offset)
+    task_process._apply_log(main, *message[1:])
+
+    assert [item.heading for item in main.logs] == ["a", "b", "c", "d", "e2", "f"]
+    assert main.progress_no == worker.progress_no + 2
+
+
+def test_spawned_worker_round_trip():
+    worker = task_process._Worker()
+    try:
+        context = SimpleNamespace(id="no-such-chat", log=Log())
+        # the worker reports the missing chat back and stays up for the next run
+        for _ in range(2):
+            with pytest.raises(TaskProcessError):
+                asyncio.run(worker.run(context, memory_mb=0, cpu_seconds=0))
+        assert worker.process.is_alive()
+        assert worker.runs == 2
+
+        # any python process uses more than a megabyte
+        with pytest.raises(TaskProcessError, match="memory limit"):
+            asyncio.run(worker.run(context, memory_mb=1, cpu_seconds=0))
+        assert not worker.process.is_alive()
+    finally:
+        worker.stop()
+
+
+def test_worker_memory_calls_are_limited_to_memory_methods():
+    ok, error = asyncio.run(task_process._call_memory(SimpleNamespace(), "_save_db", (), {}))
+    assert not ok and "_save_db" in error
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from python.helpers import task_scheduler, worker_pool
+from python.helpers.task_scheduler import (
+    PlannedTask,
+    ScheduledTask,
+    SchedulerTaskList,
+    TaskPlan,
+    TaskSchedule,
+    TaskScheduler,
+    TaskState,
+)
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_scheduler, "SCHEDULER_FOLDER", str(tmp_path))
+    monkeypatch.setattr(task_scheduler, "_get_max_workers", lambda: 1)
+    tasks = SchedulerTaskList(tasks=[])
+    monkeypatch.setattr(SchedulerTaskList, "get", classmethod(lambda cls: tasks))
+    scheduler = TaskScheduler()
+    scheduler.runs = []
+    scheduler.submit_result = worker_pool.STARTED
+
+    async def run_task(task, task_context=None):
+        scheduler.runs.append(task.uuid)
+        return scheduler.submit_result
+
+    monkeypatch.setattr(scheduler, "_run_task", run_task)
+    yield scheduler
+    tasks._store.close()
+
+
+def _every_minute(name: str, created_at: datetime) -> ScheduledTask:
+    schedule = TaskSchedule(minute="*", hour="*", day="*", month="*", weekday="*", timezone="UTC")
+    return ScheduledTask(name=name, system_prompt="", prompt="", schedule=schedule, created_at=created_at)
+
+
+def test_due_task_runs_once_across_its_state_changes(scheduler):
+    now = datetime.now(timezone.utc)
+    task = _every_minute("a", now - timedelta(hours=1))
+    scheduler._last_tick = now - timedelta(minutes=2)
+    asyncio.run(scheduler._tasks.add_task(task))
+
+    asyncio.run(scheduler.tick())
+    # the run saves the task as running, then as idle again
+    asyncio.run(scheduler.update_task(task.uuid, state=TaskState.RUNNING))
+    asyncio.run(scheduler.tick())
+    asyncio.run(scheduler.update_task(task.uuid, state=TaskState.IDLE))
+    asyncio.run(scheduler.tick())
+
+    assert scheduler.runs == [task.uuid]
+    assert scheduler._timers.get(task.uuid) > now.timestamp()
+
+
+def test_missed_launch_times_do_not_catch_up(scheduler):
+    now = datetime.now(timezone.utc)
+    old = _every_minute("old", now - timedelta(days=1))
+    new = _every_minute("new", now)
+    scheduler._last_tick = now - timedelta(hours=1)
+    asyncio.run(scheduler._tasks.add_task(old))
+    asyncio.run(scheduler._tasks.add_task(new))
+
+    asyncio.run(scheduler.tick())
+    asyncio.run(scheduler.tick())
+
+    # an hour of missed minutes runs once, the new task waits for its first launch time
+    assert scheduler.runs == [old.uuid]
+
+
+def test_edit_wakes_and_rearms_only_that_task(scheduler):
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    planned = PlannedTask(name="p", system_prompt="", prompt="", plan=TaskPlan.create(todo=[later]))
+    other = _every_minute("other", datetime.now(timezone.utc))
+    asyncio.run(scheduler._tasks.add_task(planned))
+    asyncio.run(scheduler._tasks.add_task(other))
+    asyncio.run(scheduler.tick())
+    assert scheduler.runs == []
+    # a full rebuild of the timers would plan this one again
+    sentinel = (datetime.now(timezone.utc) + timedelta(days=1)).timestamp()
+    scheduler._timers.set(other.uuid, sentinel)
+
+    task_scheduler._wakeup.clear()
+    soon = datetime.now(timezone.utc) - timedelta(seconds=1)
+    asyncio.run(scheduler.update_task(planned.uuid, plan=TaskPlan.create(todo=[soon])))
+    assert task_scheduler._wakeup.is_set()
+
+    asyncio.run(scheduler.tick())
+    assert scheduler.runs == [planned.uuid]
+    assert scheduler._timers.get(other.uuid) == sentinel
+
+
+def test_run_on_demand_reports_queued_and_refuses_skipped(scheduler):
+    task = _every_minute("a", datetime.now(timezone.utc))
+    asyncio.run(scheduler._tasks.add_task(task))
+
+    scheduler.submit_result = worker_pool.QUEUED
+    assert asyncio.run(scheduler.run_task_by_uuid(task.uuid)) == worker_pool.QUEUED
+    for result in (worker_pool.SKIPPED, worker_pool.REJECTED):
+        scheduler.submit_result = result
+        with pytest.raises(ValueError):
+            asyncio.run(scheduler.run_task_by_uuid(task.uuid))
@@ -0,0 +1,35 @@
+import json
+
+from python.helpers.task_store import TaskStore
+
+
+def test_write_keeps_order_and_deletes(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    store.write([("a", '{"v": 1}'), ("b", '{"v": 2}'), ("c", '{"v": 3}')])
+    store.write([("a", '{"v": 4}')], removed=["b"])
+    assert store.load() == [("a", '{"v": 4}'), ("c", '{"v": 3}')]
+    store.close()
+
+
+def test_data_version_tracks_other_connections(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    store = TaskStore(path)
+    other = TaskStore(path)
+    version = store.data_version()
+    store.write([("a", "{}")])
+    assert store.data_version() == version
+    other.write([("b", "{}")])
+    assert store.data_version() != version
+    assert [uuid for uuid, _ in store.load()] == ["a", "b"]
+    store.close()
+    other.close()
+
+
+def test_replace_drops_tasks_missing_from_export(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    store.write([("a", '{"uuid": "a"}'), ("b", '{"uuid": "b"}')])
+    exported = store.export_json()
+    store.write([("c", '{"uuid": "c"}')])
+    store.replace([(task["uuid"], json.dumps(task)) for task in json.loads(exported)["tasks"]])
+    assert [uuid for uuid, _ in store.load()] == ["a", "b"]
+    store.close()
@@ -0,0 +1,34 @@
+from python.helpers.timer_heap import TimerHeap
+
+
+def test_pop_due_in_deadline_order():
+    timers = TimerHeap()
+    timers.set("b", 20)
+    timers.set("a", 10)
+    timers.set("c", 30)
+    assert timers.next_deadline() == 10
+    assert timers.pop_due(25) == ["a", "b"]
+    assert len(timers) == 1
+    assert timers.next_deadline() == 30
+    assert timers.pop_due(25) == []
+
+
+def test_set_replaces_and_remove_drops_deadline():
+    timers = TimerHeap()
+    timers.set("a", 10)
+    timers.set("a", 50)
+    timers.set("b", 20)
+    timers.remove("b")
+    assert timers.next_deadline() == 50
+    assert timers.pop_due(40) == []
+    assert timers.pop_due(50) == ["a"]
+    assert timers.next_deadline() is None
+
+
+def test_stale_entries_are_compacted():
+    timers = TimerHeap()
+    for i in range(1000):
+        timers.set("a", i)
+    assert len(timers._heap) < 100
+    assert timers.get("a") == 999
+    assert timers.pop_due(1000) == ["a"]
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from python.helpers import worker_pool
+from python.helpers.worker_pool import WorkerPool
+
+
+def _wait_idle(pool: WorkerPool, timeout: float = 5):
+    end = time.time() + timeout
+    while time.time() < end:
+        stats = pool.stats()
+        if not stats["running"] and not stats["queue_depth"]:
+            return
+        time.sleep(0.01)
+    raise TimeoutError(pool.stats())
+
+
+def _job(log: list, name: str, release: threading.Event | None = None):
+    async def run():
+        log.append(("start", name))
+        try:
+            while release is not None and not release.is_set():
+                await asyncio.sleep(0.01)
+        finally:
+            log.append(("end", name))
+
+    return run
+
+
+def test_limits_workers_and_runs_queue_by_priority():
+    pool = WorkerPool(max_workers=1, thread_name="test_pool_priority")
+    log, release = [], threading.Event()
+    assert pool.submit("a", _job(log, "a", release)) == worker_pool.STARTED
+    assert pool.submit("low", _job(log, "low"), priority=0) == worker_pool.QUEUED
+    assert pool.submit("high", _job(log, "high"), priority=5) == worker_pool.QUEUED
+    assert pool.stats()["queue_depth"] == 2
+    release.set()
+    _wait_idle(pool)
+    assert [name for event, name in log if event == "start"] == ["a", "high", "low"]
+    stats = pool.stats()
+    assert stats["started"] == 3 and stats["max_queue_depth"] == 2
+    assert stats["wait_ms_max"] > 0
+
+
+def test_policies_for_running_key():
+    pool = WorkerPool(max_workers=2, thread_name="test_pool_policies")
+    log, release = [], threading.Event()
+    pool.submit("t", _job(log, "first", release))
+    assert pool.submit("t", _job(log, "skipped")) == worker_pool.SKIPPED
+    assert pool.submit("t", _job(log, "next"), policy=worker_pool.POLICY_QUEUE) == worker_pool.QUEUED
+    # only one job per key waits
+    assert pool.submit("t", _job(log, "again"), policy=worker_pool.POLICY_QUEUE) == worker_pool.SKIPPED
+    release.set()
+    _wait_idle(pool)
+    assert log == [("start", "first"), ("end", "first"), ("start", "next"), ("end", "next")]
+
+    log.clear()
+    never = threading.Event()
+    pool.submit("t", _job(log, "old", never))
+    time.sleep(0.05)
+    assert pool.submit("t", _job(log, "new"), policy=worker_pool.POLICY_REPLACE) == worker_pool.REPLACED
+    _wait_idle(pool)
+    assert log == [("start", "old"), ("end", "old"), ("start", "new"), ("end", "new")]
+    assert pool.stats()["replaced"] == 1
+
+
+def test_rejects_when_queue_is_full():
+    pool = WorkerPool(max_workers=1, max_queue=1, thread_name="test_pool_reject")
+    log, release = [], threading.Event()
+    pool.submit("a", _job(log, "a", release))
+    assert pool.submit("b", _job(log, "b")) == worker_pool.QUEUED
+    assert pool.submit("c", _job(log, "c")) == worker_pool.REJECTED
+    release.set()
+    _wait_idle(pool)
+    assert pool.stats()["rejected"] == 1
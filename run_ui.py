@@ -9,8 +9,7 @@ import threading
 from flask import Flask, request, Response, session
 from flask_basicauth import BasicAuth
 import initialize
-from python.helpers import files, git, mcp_server, fasta2a_server
-from python.helpers.files import get_abs_path
+from python.helpers import files, git, mcp_server, fasta2a_server, static_assets
 from python.helpers import runtime, dotenv, process
 from python.helpers.extract_tools import load_classes_from_folder
 from python.helpers.api import ApiHandler
@@ -25,7 +24,8 @@ if hasattr(time, 'tzset'):
     time.tzset()
 
 # initialize the internal Flask server
-webapp = Flask("app", static_folder=get_abs_path("./webui"), static_url_path="/")
+# webui files are served by serve_static, with content hash URLs and precompressed copies
+webapp = Flask("app", static_folder=None)
 webapp.secret_key = os.getenv("FLASK_SECRET_KEY") or secrets.token_hex(32)
 webapp.config.update(
     JSON_SORT_KEYS=False,
@@ -164,7 +164,13 @@ async def serve_index():
         version_no=gitinfo["version"],
         version_time=gitinfo["commit_time"]
     )
-    return index
+    index = static_assets.rewrite_html(index)
+    return static_assets.send_html(index, request)
+
+
+@webapp.route("/<path:filename>", methods=["GET"])
+def serve_static(filename):
+    return static_assets.send_asset(filename, request)
 
 
 def run():
@@ -188,6 +194,11 @@ def run():
         runtime.get_arg("host") or dotenv.get_dotenv_value("WEB_UI_HOST") or "localhost"
     )
     server = None
+    # ASGI serves handlers from one event loop, WSGI from a thread per request
+    asgi = (
+        runtime.get_arg("server") or dotenv.get_dotenv_value("WEB_UI_SERVER") or ""
+    ).lower() == "asgi"
+    blocking_endpoints = set()
 
     def register_api_handler(app, handler: type[ApiHandler]):
         name = handler.__module__.split(".")[-1]
@@ -211,29 +222,48 @@ def run():
             handler_wrap,
             methods=handler.get_methods(),
         )
+        if handler.is_blocking():
+            blocking_endpoints.add(f"/{name}")
+
+    # compressed copies of changed webui files, served uncompressed until ready
+    static_assets.start_precompress()
 
     # initialize and register API handlers
     handlers = load_classes_from_folder("python/api", "*.py", ApiHandler)
     for handler in handlers:
         register_api_handler(webapp, handler)
 
-    # add the webapp, mcp, and a2a to the app
-    middleware_routes = {
-        "/mcp": ASGIMiddleware(app=mcp_server.DynamicMcpProxy.get_instance()),  # type: ignore
-        "/a2a": ASGIMiddleware(app=fasta2a_server.DynamicA2AProxy.get_instance()),  # type: ignore
-    }
+    PrintStyle().debug(f"Starting server at http://{host}:{port} ...")
 
-    app = DispatcherMiddleware(webapp, middleware_routes)  # type: ignore
+    if asgi:
+        from python.helpers.asgi_server import AsgiServer, FlaskAsgi
+
+        # mcp and a2a are ASGI apps, mounted without the WSGI bridge
+        asgi_app = FlaskAsgi(
+            webapp,
+            mounts={
+                "/mcp": mcp_server.DynamicMcpProxy.get_instance(),  # type: ignore
+                "/a2a": fasta2a_server.DynamicA2AProxy.get_instance(),  # type: ignore
+            },
+            blocking=blocking_endpoints,
+        )
+        server = AsgiServer(asgi_app, host=host, port=port)
+    else:
+        # add the webapp, mcp, and a2a to the app
+        middleware_routes = {
+            "/mcp": ASGIMiddleware(app=mcp_server.DynamicMcpProxy.get_instance()),  # type: ignore
+            "/a2a": ASGIMiddleware(app=fasta2a_server.DynamicA2AProxy.get_instance()),  # type: ignore
+        }
 
-    PrintStyle().debug(f"Starting server at http://{host}:{port} ...")
+        app = DispatcherMiddleware(webapp, middleware_routes)  # type: ignore
 
-    server = make_server(
-        host=host,
-        port=port,
-        app=app,
-        request_handler=NoRequestLoggingWSGIRequestHandler,
-        threaded=True,
-    )
+        server = make_server(
+            host=host,
+            port=port,
+            app=app,
+            request_handler=NoRequestLoggingWSGIRequestHandler,
+            threaded=True,
+        )
     process.set_server(server)
     server.log_startup()
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Web UI API Load Test
+
+Sends GET requests to API endpoints at increasing concurrency and reports
+throughput and latency per level. Compare the WSGI server with the ASGI
+serving mode (run_ui.py --server=asgi) on the same machine:
+
+    python tests/performance/api_load_test.py --start wsgi asgi
+    python tests/performance/api_load_test.py --url http://localhost:50001
+
+/health runs in the blocking thread pool under ASGI, /csrf_token on the event loop.
+
+Usage:
+    python tests/performance/api_load_test.py [--url URL | --start MODE ...]
+        [--paths /health /csrf_token] [--concurrency 1 8 32 128] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).parent.parent.parent
+# seconds to wait for a started server to answer
+START_TIMEOUT = 120
+
+
+async def run_level(session, url: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+async def run_load(base_url: str, paths: list[str], levels: list[int], requests: int, auth):
+    # no connection limit, the server is what is measured
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, auth=auth) as session:
+        for path in paths:
+            url = base_url.rstrip("/") + path
+            print(f"\n{url}")
+            print(f"{'conc':>6} {'reqs':>7} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            # warm up imports and caches of the endpoint
+            await run_level(session, url, 4, 20)
+            for level in levels:
+                r = await run_level(session, url, level, max(requests, level))
+                print(
+                    f"{r['concurrency']:>6} {r['requests']:>7} {r['errors']:>7} "
+                    f"{r['rps']:>9.1f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f}"
+                )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(url: str, server: subprocess.Popen):
+    end = time.time() + START_TIMEOUT
+    async with aiohttp.ClientSession() as session:
+        while time.time() < end:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                async with session.get(url + "/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not start in {START_TIMEOUT} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the web UI API")
+    parser.add_argument("--url", default="http://localhost:50001", help="Running server to test")
+    parser.add_argument("--start", nargs="+", choices=["wsgi", "asgi"], help="Start run_ui.py in these modes and test each")
+    parser.add_argument("--paths", nargs="+", default=["/health", "/csrf_token"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--user", default=os.getenv("AUTH_LOGIN"), help="Basic auth login")
+    parser.add_argument("--password", default=os.getenv("AUTH_PASSWORD"), help="Basic auth password")
+    args = parser.parse_args()
+
+    auth = aiohttp.BasicAuth(args.user, args.password) if args.user and args.password else None
+
+    if not args.start:
+        asyncio.run(run_load(args.url, args.paths, args.concurrency, args.requests, auth))
+        return
+
+    for mode in args.start:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        print(f"\n=== {mode} server at {url} ===")
+        server = subprocess.Popen(
+            [sys.executable, "run_ui.py", f"--port={port}", "--host=127.0.0.1", f"--server={mode}"],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(wait_ready(url, server))
+            asyncio.run(run_load(url, args.paths, args.concurrency, args.requests, auth))
+        finally:
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
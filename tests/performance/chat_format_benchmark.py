@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Chat Persistence Format Benchmark
+
+Compares the JSON chat snapshot (chat.json) with the binary encoding
+(chat.bin, msgpack + zstd) on synthetic chats: file size, save time and
+load time including parsing the agent histories.
+
+Usage:
+    python tests/performance/chat_format_benchmark.py [--messages 2000] [--rounds 5]
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from python.helpers import chat_codec
+
+
+def build_chat(messages: int, image_every: int = 50, native_history: bool = False) -> dict:
+    """Chat snapshot shaped like persist_chat._serialize_context output,
+    binary snapshots keep the history as an object instead of a JSON string"""
+    rng = os.urandom
+    topic_messages = []
+    for i in range(messages):
+        if i % image_every == image_every - 1:
+            # attachments are embedded as base64, they do not compress
+            content = {
+                "raw_content": [
+                    {"type": "text", "text": f"screenshot {i}"},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": "data:image/png;base64,"
+                            + base64.b64encode(rng(30_000)).decode()
+                        },
+                    },
+                ]
+            }
+        elif i % 2:
+            content = f"Tool output {i}:\n" + "\n".join(
+                f"{j:04d} drwxr-xr-x  root  /usr/lib/python3/{i}/{j}" for j in range(40)
+            )
+        else:
+            content = {
+                "thoughts": [f"step {i}", "checking the result of the last tool"],
+                "tool_name": "code_execution_tool",
+                "tool_args": {"runtime": "terminal", "code": f"ls -la /tmp/{i}"},
+            }
+        topic_messages.append(
+            {
+                "_cls": "Message",
+                "ai": bool(i % 2 == 0),
+                "content": content,
+                "summary": "",
+                "tokens": 200,
+            }
+        )
+    history = {
+        "_cls": "History",
+        "bulks": [],
+        "topics": [],
+        "current": {"_cls": "Topic", "summary": "", "messages": topic_messages},
+    }
+    logs = [
+        {
+            "no": i,
+            "id": None,
+            "type": "tool" if i % 2 else "agent",
+            "heading": f"step {i}",
+            "content": f"log output {i} " * 20,
+            "temp": False,
+            "kvps": {"tool_name": "code_execution_tool", "runtime": "terminal"},
+        }
+        for i in range(min(messages, 1000))
+    ]
+    return {
+        "id": "benchmark",
+        "name": "benchmark chat",
+        "created_at": "2026-01-01T00:00:00",
+        "type": "user",
+        "last_message": "2026-01-01T00:00:00",
+        "agents": [
+            {
+                "number": 0,
+                "data": {"iteration_no": messages},
+                "history": (
+                    history if native_history else json.dumps(history, ensure_ascii=False)
+                ),
+            }
+        ],
+        "streaming_agent": 0,
+        "log": {"guid": "g", "logs": logs, "progress": "", "progress_no": 0},
+    }
+
+
+def save_json(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def load_json(raw: bytes) -> dict:
+    data = json.loads(raw)
+    for agent in data["agents"]:
+        json.loads(agent["history"])  # deserialize_history
+    return data
+
+
+def load_binary(raw: bytes) -> dict:
+    return chat_codec.decode(raw)
+
+
+def measure(func, arg, rounds: int) -> tuple[float, object]:
+    samples = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def run(messages: int, rounds: int) -> list[dict]:
+    results = []
+    for name, save, load, native_history in (
+        ("json", save_json, load_json, False),
+        ("binary", chat_codec.encode, load_binary, True),
+    ):
+        data = build_chat(messages, native_history=native_history)
+        save_ms, raw = measure(save, data, rounds)
+        load_ms, _ = measure(load, raw, rounds)
+        results.append(
+            {
+                "format": name,
+                "size_kb": round(len(raw) / 1024, 1),
+                "save_ms": round(save_ms, 2),
+                "load_ms": round(load_ms, 2),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat persistence format benchmark")
+    parser.add_argument("--messages", type=int, nargs="+", default=[200, 2000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    all_results = {}
+    for messages in args.messages:
+        all_results[messages] = run(messages, args.rounds)
+
+    if args.json:
+        print(json.dumps(all_results, indent=2))
+        return 0
+
+    print(f"{'messages':>9} {'format':>7} {'size KB':>10} {'save ms':>9} {'load ms':>9}")
+    for messages, results in all_results.items():
+        for r in results:
+            print(
+                f"{messages:>9} {r['format']:>7} {r['size_kb']:>10} "
+                f"{r['save_ms']:>9} {r['load_ms']:>9}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+File Browser Listing Benchmark
+
+Lists synthetic directories of increasing size and reports time and JSON
+payload of one listing request:
+
+- ls: the previous listing, `ls -la` in a subprocess, a stat per parsed
+  name and every entry sent to the browser, sorted there
+- scandir: FileBrowser.get_files, os.scandir, sorted and filtered on the
+  server, one page of FileBrowser.PAGE_SIZE entries
+
+Also times the on-demand folder size of a nested tree, cold and again from
+the per-folder cache.
+
+Usage:
+    python tests/performance/file_browser_benchmark.py [--files 1000 10000 50000] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from python.helpers import file_browser
+from python.helpers.file_browser import FileBrowser
+
+
+def ls_listing(full_path: Path) -> dict:
+    """The listing before scandir, kept here for comparison"""
+    result = subprocess.run(["ls", "-la", str(full_path)], capture_output=True, text=True, timeout=30)
+    entries = []
+    for line in result.stdout.strip().split("\n")[1:]:
+        if line.endswith(" .") or line.endswith(" .."):
+            continue
+        parts = line.split()
+        if len(parts) < 9:
+            continue
+        name = " ".join(parts[8:]).split(" -> ")[0]
+        path = full_path / name
+        stat_info = path.stat()
+        is_dir = path.is_dir()
+        entries.append({
+            "name": name,
+            "path": str(path.relative_to("/")),
+            "modified": datetime.fromtimestamp(stat_info.st_mtime).isoformat(),
+            "type": "folder" if is_dir else "unknown",
+            "size": 0 if is_dir else stat_info.st_size,
+            "is_dir": is_dir,
+        })
+        if len(entries) > 10000:
+            break
+    return {"entries": entries}
+
+
+def make_flat(root: Path, count: int):
+    root.mkdir()
+    for i in range(count):
+        (root / f"file_{i:06d}.txt").write_bytes(b"x" * (i % 4096))
+
+
+def make_tree(root: Path, depth: int, width: int, files: int):
+    root.mkdir()
+    for i in range(files):
+        (root / f"f{i}.bin").write_bytes(b"x" * 1024)
+    if depth:
+        for i in range(width):
+            make_tree(root / f"d{i}", depth - 1, width, files)
+
+
+def measure(fn, rounds: int) -> tuple[float, int]:
+    times = []
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        size = len(json.dumps(result))
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File browser listing benchmark")
+    parser.add_argument("--files", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    browser = FileBrowser()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'files':>7} {'mode':<8} {'ms':>9} {'KB':>10} {'entries':>8}")
+        for count in args.files:
+            root = Path(tmp) / f"flat_{count}"
+            make_flat(root, count)
+            path = str(root).lstrip("/")
+            for mode, fn in (
+                ("ls", lambda: ls_listing(root)),
+                ("scandir", lambda: browser.get_files(path, sort_by="date", direction="desc")),
+            ):
+                ms, size = measure(fn, args.rounds)
+                entries = len(fn()["entries"])
+                print(f"{count:>7} {mode:<8} {ms:>9.1f} {size / 1024:>10.1f} {entries:>8}")
+
+        tree = Path(tmp) / "tree"
+        make_tree(tree, depth=4, width=5, files=20)
+        path = str(tree).lstrip("/")
+        file_browser._dir_cache.clear()
+        start = time.perf_counter()
+        cold = browser.get_dir_size(path)
+        cold_ms = (time.perf_counter() - start) * 1000
+        warm_ms, _ = measure(lambda: browser.get_dir_size(path), args.rounds)
+        print(
+            f"\nfolder size of {cold['files']} files in {len(file_browser._dir_cache)} folders: "
+            f"{cold_ms:.1f} ms cold, {warm_ms:.1f} ms cached"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Static Asset Serving Benchmark
+
+Loads the web UI page twice, cold (empty browser cache) and warm (second
+visit), and reports requests and bytes transferred:
+
+- plain: webui files served as they are by Flask, revalidated on every visit
+- hashed: content hash URLs with immutable caching and brotli/gzip copies,
+  see python/helpers/static_assets.py
+
+The page is the index plus the scripts, styles and images it references and
+the JS modules they import. A small browser cache model keeps responses with
+their ETag and Cache-Control, so no network or browser is needed.
+
+Usage:
+    python tests/performance/static_assets_benchmark.py [--encoding br|gzip|identity]
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from flask import Flask, request
+
+from python.helpers import files, static_assets
+
+# approximate size of the response headers of one request
+HEADER_BYTES = 300
+
+_REF = re.compile(r"\s(?:src|href)=[\"']([^\"'{}]+)[\"']")
+_IMPORT = re.compile(r"(?:\bfrom\s*|\bimport\s*\(?\s*)[\"']([^\"']+\.js)[\"']")
+_IMPORTMAP = re.compile(r'<script type="importmap">(.*?)</script>', re.S)
+
+
+def plain_app() -> Flask:
+    # serving before hashed assets, Flask static files and the raw index
+    app = Flask("plain", static_folder=files.get_abs_path("webui"), static_url_path="/")
+
+    @app.route("/")
+    def index():
+        return files.read_file("webui/index.html")
+
+    return app
+
+
+def hashed_app() -> Flask:
+    app = Flask("hashed", static_folder=None)
+
+    @app.route("/")
+    def index():
+        html = static_assets.rewrite_html(files.read_file("webui/index.html"))
+        return static_assets.send_html(html, request)
+
+    @app.route("/<path:filename>")
+    def static(filename):
+        return static_assets.send_asset(filename, request)
+
+    return app
+
+
+def decode(data: bytes, encoding: str | None) -> bytes:
+    if encoding == "br":
+        import brotli
+
+        return brotli.decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class Browser:
+    """Cache of one browser profile, fetches the page like a first or repeated visit"""
+
+    def __init__(self, app: Flask, encoding: str):
+        self.client = app.test_client()
+        self.accept = {"br": "br, gzip", "gzip": "gzip", "identity": "identity"}[encoding]
+        self.cache: dict[str, dict] = {}
+
+    def load_page(self) -> dict:
+        stats = {"requests": 0, "not_modified": 0, "from_cache": 0, "bytes": 0}
+        html = self.fetch("/", stats).decode("utf-8")
+        importmap = {}
+        found = _IMPORTMAP.search(html)
+        if found:
+            importmap = json.loads(found.group(1))["imports"]
+
+        seen = set()
+        queue = ["/"]
+        bodies = {"/": html.encode()}
+        while queue:
+            url = queue.pop()
+            body = bodies[url].decode("utf-8", "replace")
+            refs = _REF.findall(body) if url == "/" else []
+            if url.endswith(".js") or ".js?" in url:
+                refs += _IMPORT.findall(body)
+            for ref in refs:
+                if ref.startswith(("http:", "https:", "//", "#", "data:")):
+                    continue
+                target = urljoin("http://localhost" + url, ref)
+                parts = urlsplit(target)
+                target = parts.path + (f"?{parts.query}" if parts.query else "")
+                # module imports resolve through the import map, like in the browser
+                target = importmap.get(target, target)
+                if target in seen:
+                    continue
+                seen.add(target)
+                bodies[target] = self.fetch(target, stats)
+                queue.append(target)
+        return stats
+
+    def fetch(self, url: str, stats: dict) -> bytes:
+        cached = self.cache.get(url)
+        if cached and "immutable" in cached["cache_control"]:
+            stats["from_cache"] += 1
+            return cached["body"]
+        headers = {"Accept-Encoding": self.accept}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        response = self.client.get(url, headers=headers)
+        stats["requests"] += 1
+        data = response.get_data()
+        stats["bytes"] += HEADER_BYTES + len(data)
+        if response.status_code == 304:
+            stats["not_modified"] += 1
+            return cached["body"]  # type: ignore
+        body = decode(data, response.headers.get("Content-Encoding"))
+        self.cache[url] = {
+            "etag": response.headers.get("ETag"),
+            "cache_control": response.headers.get("Cache-Control", ""),
+            "body": body,
+        }
+        return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static asset serving benchmark")
+    parser.add_argument("--encoding", choices=["br", "gzip", "identity"], default="br",
+                        help="Encodings the simulated browser accepts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    compressed = static_assets.precompress()
+    print(
+        f"precompress: {compressed['compressed']} new copies in "
+        f"{time.perf_counter() - start:.1f}s (cached by content hash afterwards)\n"
+    )
+
+    print(f"{'mode':<8} {'visit':<6} {'requests':>9} {'304':>6} {'cached':>7} {'KB':>10}")
+    for name, app in (("plain", plain_app()), ("hashed", hashed_app())):
+        browser = Browser(app, args.encoding)
+        for visit in ("cold", "warm"):
+            stats = browser.load_page()
+            print(
+                f"{name:<8} {visit:<6} {stats['requests']:>9} {stats['not_modified']:>6} "
+                f"{stats['from_cache']:>7} {stats['bytes'] / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
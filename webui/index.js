@@ -331,9 +331,10 @@ function setConnectionStatus(connected) {
 let lastLogVersion = 0;
 let lastLogGuid = "";
 let lastSpokenNo = 0;
+// server state seen with the last applied poll, unchanged state is answered with not_modified
+let lastStateVersion = 0;
 
 async function poll() {
-  let updated = false;
   try {
     // Get timezone from navigator
     const timezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
@@ -344,6 +345,7 @@ async function poll() {
       notifications_from: notificationStore.lastNotificationVersion || 0,
       context: context || null,
       timezone: timezone,
+      state_version: lastStateVersion,
     });
 
     // Check if the response is valid
@@ -352,165 +354,185 @@ async function poll() {
       return false;
     }
 
-    if (!context) setContext(response.context);
-    if (response.context != context) return; //skip late polls after context change
+    if (response.not_modified) {
+      setConnectionStatus(true);
+      return false;
+    }
 
+    const updated = applyPollResponse(response);
     // if the chat has been reset, restart this poll as it may have been called with incorrect log_from
-    if (lastLogGuid != response.log_guid) {
-      chatHistory.innerHTML = "";
-      lastLogVersion = 0;
-      lastLogGuid = response.log_guid;
+    if (updated === null) {
       await poll();
       return;
     }
+    return updated;
+  } catch (error) {
+    console.error("Error:", error);
+    setConnectionStatus(false);
+  }
 
-    if (lastLogVersion != response.log_version) {
-      updated = true;
-      for (const log of response.logs) {
-        const messageId = log.id || log.no; // Use log.id if available
-        setMessage(
-          messageId,
-          log.type,
-          log.heading,
-          log.content,
-          log.temp,
-          log.kvps
-        );
-      }
-      afterMessagesUpdate(response.logs);
-    }
+  return false;
+}
+
+// apply a /poll or /poll_stream payload
+// returns true when new log items arrived, null when the log has to be requested again
+function applyPollResponse(response) {
+  let updated = false;
+  if (!context) setContext(response.context);
+  if (response.context != context) return false; //skip late polls after context change
 
-    lastLogVersion = response.log_version;
+  if (lastLogGuid != response.log_guid) {
+    chatHistory.innerHTML = "";
+    lastLogVersion = 0;
     lastLogGuid = response.log_guid;
+    // pushed updates carry the whole log after a reset
+    if (!response.log_reset) return null;
+  }
 
-    updateProgress(response.log_progress, response.log_progress_active);
+  if (lastLogVersion != response.log_version) {
+    updated = true;
+    for (const log of response.logs) {
+      const messageId = log.id || log.no; // Use log.id if available
+      setMessage(
+        messageId,
+        log.type,
+        log.heading,
+        log.content,
+        log.temp,
+        log.kvps
+      );
+    }
+    afterMessagesUpdate(response.logs);
+  }
 
-    // Update notifications from response
-    notificationStore.updateFromPoll(response);
+  lastLogVersion = response.log_version;
+  lastLogGuid = response.log_guid;
 
-    //set ui model vars from backend
-    if (globalThis.Alpine && inputSection) {
-      const inputAD = Alpine.$data(inputSection);
-      if (inputAD) {
-        inputAD.paused = response.paused;
-      }
+  updateProgress(response.log_progress, response.log_progress_active);
+
+  // Update notifications from response
+  notificationStore.updateFromPoll(response);
+
+  //set ui model vars from backend
+  if (globalThis.Alpine && inputSection) {
+    const inputAD = Alpine.$data(inputSection);
+    if (inputAD) {
+      inputAD.paused = response.paused;
     }
+  }
 
-    // Update status icon state
-    setConnectionStatus(true);
+  // Update status icon state
+  setConnectionStatus(true);
+
+  // Update chats list and sort by created_at time (newer first)
+  let chatsAD = null;
+  let contexts = response.contexts || [];
+  if (globalThis.Alpine && chatsSection) {
+    chatsAD = Alpine.$data(chatsSection);
+    if (chatsAD) {
+      chatsAD.contexts = contexts.sort(
+        (a, b) => (b.created_at || 0) - (a.created_at || 0)
+      );
+    }
+  }
 
-    // Update chats list and sort by created_at time (newer first)
-    let chatsAD = null;
-    let contexts = response.contexts || [];
-    if (globalThis.Alpine && chatsSection) {
-      chatsAD = Alpine.$data(chatsSection);
-      if (chatsAD) {
-        chatsAD.contexts = contexts.sort(
+  // Update tasks list and sort by creation time (newer first)
+  const tasksSection = document.getElementById("tasks-section");
+  if (globalThis.Alpine && tasksSection) {
+    const tasksAD = Alpine.$data(tasksSection);
+    if (tasksAD) {
+      let tasks = response.tasks || [];
+
+      // Always update tasks to ensure state changes are reflected
+      if (tasks.length > 0) {
+        // Sort the tasks by creation time
+        const sortedTasks = [...tasks].sort(
           (a, b) => (b.created_at || 0) - (a.created_at || 0)
         );
+
+        // Assign the sorted tasks to the Alpine data
+        tasksAD.tasks = sortedTasks;
+      } else {
+        // Make sure to use a new empty array instance
+        tasksAD.tasks = [];
       }
     }
+  }
 
-    // Update tasks list and sort by creation time (newer first)
-    const tasksSection = document.getElementById("tasks-section");
-    if (globalThis.Alpine && tasksSection) {
-      const tasksAD = Alpine.$data(tasksSection);
-      if (tasksAD) {
-        let tasks = response.tasks || [];
-
-        // Always update tasks to ensure state changes are reflected
-        if (tasks.length > 0) {
-          // Sort the tasks by creation time
-          const sortedTasks = [...tasks].sort(
-            (a, b) => (b.created_at || 0) - (a.created_at || 0)
-          );
+  // Make sure the active context is properly selected in both lists
+  if (context) {
+    // Update selection in the active tab
+    const activeTab = localStorage.getItem("activeTab") || "chats";
 
-          // Assign the sorted tasks to the Alpine data
-          tasksAD.tasks = sortedTasks;
-        } else {
-          // Make sure to use a new empty array instance
-          tasksAD.tasks = [];
-        }
-      }
-    }
+    if (activeTab === "chats" && chatsAD) {
+      chatsAD.selected = context;
+      localStorage.setItem("lastSelectedChat", context);
 
-    // Make sure the active context is properly selected in both lists
-    if (context) {
-      // Update selection in the active tab
-      const activeTab = localStorage.getItem("activeTab") || "chats";
-
-      if (activeTab === "chats" && chatsAD) {
-        chatsAD.selected = context;
-        localStorage.setItem("lastSelectedChat", context);
-
-        // Check if this context exists in the chats list
-        const contextExists = contexts.some((ctx) => ctx.id === context);
-
-        // If it doesn't exist in the chats list but we're in chats tab, try to select the first chat
-        if (!contextExists && contexts.length > 0) {
-          // Check if the current context is empty before creating a new one
-          // If there's already a current context and we're just updating UI, don't automatically
-          // create a new context by calling setContext
-          const firstChatId = contexts[0].id;
-
-          // Only create a new context if we're not currently in an existing context
-          // This helps prevent duplicate contexts when switching tabs
-          setContext(firstChatId);
-          chatsAD.selected = firstChatId;
-          localStorage.setItem("lastSelectedChat", firstChatId);
-        }
-      } else if (activeTab === "tasks" && tasksSection) {
-        const tasksAD = Alpine.$data(tasksSection);
-        tasksAD.selected = context;
-        localStorage.setItem("lastSelectedTask", context);
-
-        // Check if this context exists in the tasks list
-        const taskExists = response.tasks?.some((task) => task.id === context);
-
-        // If it doesn't exist in the tasks list but we're in tasks tab, try to select the first task
-        if (!taskExists && response.tasks?.length > 0) {
-          const firstTaskId = response.tasks[0].id;
-          setContext(firstTaskId);
-          tasksAD.selected = firstTaskId;
-          localStorage.setItem("lastSelectedTask", firstTaskId);
-        }
-      }
-    } else if (
-      response.tasks &&
-      response.tasks.length > 0 &&
-      localStorage.getItem("activeTab") === "tasks"
-    ) {
-      // If we're in tasks tab with no selection but have tasks, select the first one
-      const firstTaskId = response.tasks[0].id;
-      setContext(firstTaskId);
-      if (tasksSection) {
-        const tasksAD = Alpine.$data(tasksSection);
-        tasksAD.selected = firstTaskId;
-        localStorage.setItem("lastSelectedTask", firstTaskId);
-      }
-    } else if (
-      contexts.length > 0 &&
-      localStorage.getItem("activeTab") === "chats" &&
-      chatsAD
-    ) {
-      // If we're in chats tab with no selection but have chats, select the first one
-      const firstChatId = contexts[0].id;
+      // Check if this context exists in the chats list
+      const contextExists = contexts.some((ctx) => ctx.id === context);
+
+      // If it doesn't exist in the chats list but we're in chats tab, try to select the first chat
+      if (!contextExists && contexts.length > 0) {
+        // Check if the current context is empty before creating a new one
+        // If there's already a current context and we're just updating UI, don't automatically
+        // create a new context by calling setContext
+        const firstChatId = contexts[0].id;
 
-      // Only set context if we don't already have one to avoid duplicates
-      if (!context) {
+        // Only create a new context if we're not currently in an existing context
+        // This helps prevent duplicate contexts when switching tabs
         setContext(firstChatId);
         chatsAD.selected = firstChatId;
         localStorage.setItem("lastSelectedChat", firstChatId);
       }
-    }
+    } else if (activeTab === "tasks" && tasksSection) {
+      const tasksAD = Alpine.$data(tasksSection);
+      tasksAD.selected = context;
+      localStorage.setItem("lastSelectedTask", context);
 
-    lastLogVersion = response.log_version;
-    lastLogGuid = response.log_guid;
-  } catch (error) {
-    console.error("Error:", error);
-    setConnectionStatus(false);
+      // Check if this context exists in the tasks list
+      const taskExists = response.tasks?.some((task) => task.id === context);
+
+      // If it doesn't exist in the tasks list but we're in tasks tab, try to select the first task
+      if (!taskExists && response.tasks?.length > 0) {
+        const firstTaskId = response.tasks[0].id;
+        setContext(firstTaskId);
+        tasksAD.selected = firstTaskId;
+        localStorage.setItem("lastSelectedTask", firstTaskId);
+      }
+    }
+  } else if (
+    response.tasks &&
+    response.tasks.length > 0 &&
+    localStorage.getItem("activeTab") === "tasks"
+  ) {
+    // If we're in tasks tab with no selection but have tasks, select the first one
+    const firstTaskId = response.tasks[0].id;
+    setContext(firstTaskId);
+    if (tasksSection) {
+      const tasksAD = Alpine.$data(tasksSection);
+      tasksAD.selected = firstTaskId;
+      localStorage.setItem("lastSelectedTask", firstTaskId);
+    }
+  } else if (
+    contexts.length > 0 &&
+    localStorage.getItem("activeTab") === "chats" &&
+    chatsAD
+  ) {
+    // If we're in chats tab with no selection but have chats, select the first one
+    const firstChatId = contexts[0].id;
+
+    // Only set context if we don't already have one to avoid duplicates
+    if (!context) {
+      setContext(firstChatId);
+      chatsAD.selected = firstChatId;
+      localStorage.setItem("lastSelectedChat", firstChatId);
+    }
   }
 
+  lastLogVersion = response.log_version;
+  lastLogGuid = response.log_guid;
+  lastStateVersion = response.state_version || 0;
+
   return updated;
 }
 
@@ -744,6 +766,7 @@ export const setContext = function (id) {
   lastLogGuid = "";
   lastLogVersion = 0;
   lastSpokenNo = 0;
+  lastStateVersion = 0;
 
   // Stop speech when switching chats
   speechStore.stopAudio();
@@ -765,6 +788,9 @@ export const setContext = function (id) {
 
   //skip one speech if enabled when switching context
   if (localStorage.getItem("speech") == "true") skipOneSpeech = true;
+
+  // pushed updates are bound to one context
+  if (pushSource) startPush();
 };
 
 export const getContext = function () {
@@ -874,114 +900,53 @@ document.addEventListener("DOMContentLoaded", () => {
 });
 
 globalThis.loadChats = async function () {
-  try {
-    const fileContents = await readJsonFiles();
-    const response = await sendJsonData("/chat_load", { chats: fileContents });
+  const input = document.createElement("input");
+  input.type = "file";
+  input.accept = ".json,.gz";
+  input.multiple = true;
 
-    if (!response) {
-      toast("No response returned.", "error");
-    }
-    // else if (!response.ok) {
-    //     if (response.message) {
-    //         toast(response.message, "error")
-    //     } else {
-    //         toast("Undefined error.", "error")
-    //     }
-    // }
-    else {
-      setContext(response.ctxids[0]);
-      toast("Chats loaded.", "success");
+  input.onchange = async () => {
+    if (!input.files.length) return;
+    try {
+      // files are uploaded as they are, the server parses them from the stream
+      const formData = new FormData();
+      for (let file of input.files) {
+        formData.append("chats[]", file);
+      }
+
+      const response = await api.fetchApi("/chat_load", {
+        method: "POST",
+        body: formData,
+      });
+
+      if (!response.ok) {
+        toast(await response.text(), "error");
+      } else {
+        const data = await response.json();
+        setContext(data.ctxids[0]);
+        toast("Chats loaded.", "success");
+      }
+    } catch (e) {
+      toastFetchError("Error loading chats", e);
     }
-  } catch (e) {
-    toastFetchError("Error loading chats", e);
-  }
+  };
+
+  input.click();
 };
 
 globalThis.saveChat = async function () {
   try {
-    const response = await sendJsonData("/chat_export", { ctxid: context });
-
-    if (!response) {
-      toast("No response returned.", "error");
-    }
-    //  else if (!response.ok) {
-    //     if (response.message) {
-    //         toast(response.message, "error")
-    //     } else {
-    //         toast("Undefined error.", "error")
-    //     }
-    // }
-    else {
-      downloadFile(response.ctxid + ".json", response.content);
-      toast("Chat file downloaded.", "success");
-    }
+    // compressed export streamed by the server straight into the download
+    const link = document.createElement("a");
+    link.href = "/chat_export?" + new URLSearchParams({ ctxid: context });
+    link.download = context + ".json.gz";
+    link.click();
+    toast("Chat file downloaded.", "success");
   } catch (e) {
     toastFetchError("Error saving chat", e);
   }
 };
 
-function downloadFile(filename, content) {
-  // Create a Blob with the content to save
-  const blob = new Blob([content], { type: "application/json" });
-
-  // Create a link element
-  const link = document.createElement("a");
-
-  // Create a URL for the Blob
-  const url = URL.createObjectURL(blob);
-  link.href = url;
-
-  // Set the file name for download
-  link.download = filename;
-
-  // Programmatically click the link to trigger the download
-  link.click();
-
-  // Clean up by revoking the object URL
-  setTimeout(() => {
-    URL.revokeObjectURL(url);
-  }, 0);
-}
-
-function readJsonFiles() {
-  return new Promise((resolve, reject) => {
-    // Create an input element of type 'file'
-    const input = document.createElement("input");
-    input.type = "file";
-    input.accept = ".json"; // Only accept JSON files
-    input.multiple = true; // Allow multiple file selection
-
-    // Trigger the file dialog
-    input.click();
-
-    // When files are selected
-    input.onchange = async () => {
-      const files = input.files;
-      if (!files.length) {
-        resolve([]); // Return an empty array if no files are selected
-        return;
-      }
-
-      // Read each file as a string and store in an array
-      const filePromises = Array.from(files).map((file) => {
-        return new Promise((fileResolve, fileReject) => {
-          const reader = new FileReader();
-          reader.onload = () => fileResolve(reader.result);
-          reader.onerror = fileReject;
-          reader.readAsText(file);
-        });
-      });
-
-      try {
-        const fileContents = await Promise.all(filePromises);
-        resolve(fileContents);
-      } catch (error) {
-        reject(error); // In case of any file reading error
-      }
-    };
-  });
-}
-
 function addClassToElement(element, className) {
   element.classList.add(className);
 }
@@ -1076,7 +1041,67 @@ async function startPolling() {
   _doPoll();
 }
 
-document.addEventListener("DOMContentLoaded", startPolling);
+// server pushed updates over /poll_stream, polling is the fallback
+let pushSource = null;
+let pushSupported = typeof EventSource !== "undefined";
+let pushReceived = false;
+
+function startPush() {
+  stopPush();
+  const params = new URLSearchParams({
+    context: context || "",
+    log_guid: lastLogGuid,
+    log_from: lastLogVersion,
+    notifications_from: notificationStore.lastNotificationVersion || 0,
+    timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
+  });
+  const source = new EventSource("/poll_stream?" + params.toString());
+
+  source.onmessage = (event) => {
+    pushReceived = true;
+    try {
+      applyPollResponse(JSON.parse(event.data));
+    } catch (error) {
+      console.error("Error:", error);
+    }
+  };
+
+  // server closes long connections, continue from the current versions
+  source.addEventListener("close", () => {
+    if (pushSource === source) startPush();
+  });
+
+  source.onerror = () => {
+    source.close();
+    if (pushSource !== source) return;
+    pushSource = null;
+    setConnectionStatus(false);
+    if (!pushReceived) {
+      // push not available (old server, proxy buffering), poll instead
+      pushSupported = false;
+      startPolling();
+    } else {
+      // server restarting or offline, retry with the current versions
+      setTimeout(() => {
+        if (!pushSource) startPush();
+      }, 1000);
+    }
+  };
+
+  pushSource = source;
+}
+
+function stopPush() {
+  if (pushSource) pushSource.close();
+  pushSource = null;
+}
+
+function startUpdates() {
+  if (pushSupported) startPush();
+  else startPolling();
+}
+
+document.addEventListener("DOMContentLoaded", startUpdates);
 
 // Setup event handlers once the DOM is fully loaded
 document.addEventListener("DOMContentLoaded", function () {
@@ -9,7 +9,13 @@ const fileBrowserModalProxy = {
     parentPath: "",
     sortBy: "name",
     sortDirection: "asc",
+    filter: "",
+    total: 0,
+    nextCursor: "",
+    truncated: false,
   },
+  isLoadingMore: false,
+  listingRequest: 0,
 
   // Initialize navigation history
   history: [],
@@ -36,18 +42,36 @@ const fileBrowserModalProxy = {
     return archiveExts.includes(ext);
   },
 
-  async fetchFiles(path = "") {
-    this.isLoading = true;
+  // sorting, filtering and paging are done by the server, a page at a time
+  listingUrl(path, cursor = "") {
+    const params = new URLSearchParams({
+      path,
+      sort: this.browser.sortBy,
+      direction: this.browser.sortDirection,
+      filter: this.browser.filter,
+    });
+    if (cursor) params.set("cursor", cursor);
+    return `/get_work_dir_files?${params}`;
+  },
+
+  async fetchFiles(path = "", showLoading = true) {
+    // re-sorting and filtering keep the list shown, the filter input keeps its focus
+    if (showLoading) this.isLoading = true;
+    // responses of older requests are dropped, typing in the filter sends several
+    const requestId = ++this.listingRequest;
     try {
-      const response = await fetchApi(
-        `/get_work_dir_files?path=${encodeURIComponent(path)}`
-      );
+      const response = await fetchApi(this.listingUrl(path));
+      if (requestId !== this.listingRequest) return;
 
       if (response.ok) {
-        const data = await response.json();
-        this.browser.entries = data.data.entries;
-        this.browser.currentPath = data.data.current_path;
-        this.browser.parentPath = data.data.parent_path;
+        const data = (await response.json()).data;
+        if (requestId !== this.listingRequest) return;
+        this.browser.entries = data.entries;
+        this.browser.currentPath = data.current_path;
+        this.browser.parentPath = data.parent_path;
+        this.browser.total = data.total;
+        this.browser.nextCursor = data.next_cursor;
+        this.browser.truncated = data.truncated;
       } else {
         console.error("Error fetching files:", await response.text());
         this.browser.entries = [];
@@ -60,11 +84,37 @@ const fileBrowserModalProxy = {
     }
   },
 
+  async loadMore() {
+    if (!this.browser.nextCursor || this.isLoadingMore) return;
+    this.isLoadingMore = true;
+    const requestId = this.listingRequest;
+    try {
+      const response = await fetchApi(
+        this.listingUrl(this.browser.currentPath, this.browser.nextCursor)
+      );
+      if (response.ok) {
+        const data = await response.json();
+        // the listing was reloaded meanwhile, the page belongs to the old one
+        if (requestId !== this.listingRequest) return;
+        this.browser.entries = [...this.browser.entries, ...data.data.entries];
+        this.browser.total = data.data.total;
+        this.browser.nextCursor = data.data.next_cursor;
+      } else {
+        console.error("Error fetching files:", await response.text());
+      }
+    } catch (error) {
+      window.toastFrontendError("Error fetching files: " + error.message, "File Browser Error");
+    } finally {
+      this.isLoadingMore = false;
+    }
+  },
+
   async navigateToFolder(path) {
     // Push current path to history before navigating
     if (this.browser.currentPath !== path) {
       this.history.push(this.browser.currentPath);
     }
+    this.browser.filter = "";
     await this.fetchFiles(path);
   },
 
@@ -72,32 +122,12 @@ const fileBrowserModalProxy = {
     if (this.browser.parentPath !== "") {
       // Push current path to history before navigating up
       this.history.push(this.browser.currentPath);
+      this.browser.filter = "";
       await this.fetchFiles(this.browser.parentPath);
     }
   },
 
-  sortFiles(entries) {
-    return [...entries].sort((a, b) => {
-      // Folders always come first
-      if (a.is_dir !== b.is_dir) {
-        return a.is_dir ? -1 : 1;
-      }
-
-      const direction = this.browser.sortDirection === "asc" ? 1 : -1;
-      switch (this.browser.sortBy) {
-        case "name":
-          return direction * a.name.localeCompare(b.name);
-        case "size":
-          return direction * (a.size - b.size);
-        case "date":
-          return direction * (new Date(a.modified) - new Date(b.modified));
-        default:
-          return 0;
-      }
-    });
-  },
-
-  toggleSort(column) {
+  async toggleSort(column) {
     if (this.browser.sortBy === column) {
       this.browser.sortDirection =
         this.browser.sortDirection === "asc" ? "desc" : "asc";
@@ -105,6 +135,34 @@ const fileBrowserModalProxy = {
       this.browser.sortBy = column;
       this.browser.sortDirection = "asc";
     }
+    await this.fetchFiles(this.browser.currentPath, false);
+  },
+
+  async applyFilter() {
+    await this.fetchFiles(this.browser.currentPath, false);
+  },
+
+  // folder sizes are calculated on request, the server caches them per folder
+  async calculateSize(file) {
+    if (file.sizeLoading) return;
+    file.sizeLoading = true;
+    try {
+      const response = await fetchApi(
+        `/get_work_dir_size?path=${encodeURIComponent(file.path)}`
+      );
+      if (response.ok) {
+        const data = await response.json();
+        file.size = data.data.size;
+        file.sizeComplete = data.data.complete;
+        file.sizeKnown = true;
+      } else {
+        window.toastFrontendError(await response.text(), "Folder Size Error");
+      }
+    } catch (error) {
+      window.toastFrontendError("Error calculating size: " + error.message, "Folder Size Error");
+    } finally {
+      file.sizeLoading = false;
+    }
   },
 
   async deleteFile(file) {
@@ -129,6 +187,7 @@ const fileBrowserModalProxy = {
         this.browser.entries = this.browser.entries.filter(
           (entry) => entry.path !== file.path
         );
+        this.browser.total = Math.max(0, this.browser.total - 1);
         alert("File deleted successfully.");
       } else {
         alert(`Error deleting file: ${await response.text()}`);
@@ -169,13 +228,12 @@ const fileBrowserModalProxy = {
 
       if (response.ok) {
         const data = await response.json();
-        // Update the file list with new data
-        this.browser.entries = data.data.entries.map((entry) => ({
+        // Update the file list, listed again with the current sorting and filter
+        await this.fetchFiles(data.data.current_path);
+        this.browser.entries = this.browser.entries.map((entry) => ({
           ...entry,
           uploadStatus: data.failed.includes(entry.name) ? "failed" : "success",
         }));
-        this.browser.currentPath = data.data.current_path;
-        this.browser.parentPath = data.data.parent_path;
 
         // Show success message
         if (data.failed && data.failed.length > 0) {